@@ -37,6 +37,7 @@
 
 import os
 import re
+import json
 
 from System.IO import *
 from System.Text.RegularExpressions import *
@@ -122,7 +123,7 @@ class GafferPlugin(DeadlinePlugin):
 
         script = RepositoryUtils.CheckPathMapping(self.GetPluginInfoEntryWithDefault("Script", "").strip())
         script = self.replaceSlashesByOS(script)
-        localScript = os.path.join(self.GetJobsDataDirectory(), script)
+        localScript = self.GetContentFile(script)
         if not os.path.isfile(localScript):
             self.FailRender("Could not find Gaffer script {}".format(localScript))
 
@@ -136,6 +137,10 @@ class GafferPlugin(DeadlinePlugin):
         
         self._gafferScript = tempSceneFilename
 
+        environmentProfile = self.GetPluginInfoEntryWithDefault("EnvironmentProfile", "")
+        if environmentProfile != "":
+            self.ApplyEnvironmentProfile(environmentProfile)
+
     def GetRenderExecutable(self):
         self.Version = self.GetPluginInfoEntry("Version")
         gafferExeList = self.GetConfigEntry("Executable" + str(self.Version).replace(".", "_"))
@@ -161,6 +166,13 @@ class GafferPlugin(DeadlinePlugin):
         frames = self.ReplacePaddedFrame(frames, "<(?i)ENDFRAME%([0-9]+)>", self.GetEndFrame())
         context = self.GetPluginInfoEntryWithDefault("Context", "")
 
+        contextTable = self.GetPluginInfoEntryWithDefault("ContextTable", "")
+        if contextTable != "":
+            # Tasks are submitted as frames numbered by their row in the context table
+            row = self.GetContextTableRow(contextTable, self.GetStartFrame())
+            frames = row["frames"]
+            context = row["context"]
+
         arguments = "execute"
 
         threads = self.GetIntegerPluginInfoEntryWithDefault("Threads", 0)
@@ -177,6 +189,39 @@ class GafferPlugin(DeadlinePlugin):
 
         return arguments
 
+    def GetContextTableRow(self, contextTable, row):
+        tableFile = os.path.join(self.GetJobsDataDirectory(), contextTable)
+        if not os.path.isfile(tableFile):
+            self.FailRender("Could not find context table {}".format(tableFile))
+
+        with open(tableFile, "r", encoding="utf-8") as inFile:
+            rows = json.load(inFile)["rows"]
+
+        if row < 0 or row >= len(rows):
+            self.FailRender("Context table {} has no row {}".format(tableFile, row))
+
+        return rows[row]
+
+    def GetContentFile(self, fileName):
+        # Files from a content store are read from the store rather than the job's auxiliary files
+        contentStore = self.GetPluginInfoEntryWithDefault("ContentStore", "").strip()
+        if contentStore == "":
+            return os.path.join(self.GetJobsDataDirectory(), fileName)
+
+        contentStore = self.replaceSlashesByOS(RepositoryUtils.CheckPathMapping(contentStore))
+        return os.path.join(contentStore, self.replaceSlashesByOS(fileName))
+
+    def ApplyEnvironmentProfile(self, environmentProfile):
+        profileFile = self.GetContentFile(environmentProfile)
+        if not os.path.isfile(profileFile):
+            self.FailRender("Could not find environment profile {}".format(profileFile))
+
+        with open(profileFile, "r", encoding="utf-8") as inFile:
+            environment = json.load(inFile)["environment"]
+
+        for name, value in environment.items():
+            self.SetProcessEnvironmentVariable(name, value)
+
     def ReplacePaddedFrame(self, arguments, pattern, frame):
         frameRegex = Regex(pattern)
         while True:
@@ -39,7 +39,11 @@ import re
 from Deadline.Scripting import *
 
 """ ExtraInfoKeyValue<xxx> denote dependecies in the form of
-<job frame>:<dependent job id>=><dependent job task number>
+<job task>:<dependent job id>=<dependent job task numbers>
+
+Dependent job task numbers are separated by commas. A dependent task of "*" waits for
+every task of the dependent job, and a job task of "*" applies the dependency to every
+task of the job.
 
 Deadline doesn't seem to include a logging facility for dependency scripts
 so just using print for informative info in case jobs aren't releasing
@@ -56,13 +60,14 @@ def __main__(jobID, taskIDs=None):
         def __init__(self, task, jobDep, depTask, isReleased):
             self.taskId = int(task)
             self.jobDependencyId = jobDep
-            self.dependencyTaskId = int(depTask)
+            # None stands for all tasks of the dependent job
+            self.dependencyTaskId = None if depTask == "*" else int(depTask)
             self.isReleased = isReleased
 
     taskIDs = [int(t) for t in taskIDs] # Deadline gives task IDs in string format
 
     if taskIDs:
-        re_dep = re.compile(r'^([0-9]+):([a-z0-9]+)')
+        re_dep = re.compile(r'^([0-9]+|\*):([a-z0-9]+)')
 
         job = RepositoryUtils.GetJob(jobID, False)
         if printDebug:
@@ -74,15 +79,19 @@ def __main__(jobID, taskIDs=None):
         # collect this job's dependencies
         for k in job.GetJobExtraInfoKeys():
             result = re_dep.match(k)
-            if len(result.groups()) == 2:
-                task, jobDep = result.groups()
-                if int(task) in taskIDs:
-                    taskDep = job.GetJobExtraInfoKeyValue(k)
-                    newDep = dependency(task, jobDep, taskDep, False)
-                    jobDependencyIds.append(jobDep)
-                    dependencies.append(newDep)
+            if result is None:
+                continue
+            task, jobDep = result.groups()
+            tasks = taskIDs if task == "*" else [t for t in taskIDs if t == int(task)]
+            if tasks:
+                taskDeps = job.GetJobExtraInfoKeyValue(k).split(",")
+                jobDependencyIds.append(jobDep)
+                for t in tasks:
+                    for taskDep in taskDeps:
+                        dependencies.append(dependency(t, jobDep, taskDep, False))
 
-        if printDebug: print("Found {} dependencies".format(len(dependencies)))
+        if printDebug:
+            print("Found {} dependencies".format(len(dependencies)))
 
         jobDependencyIds = list(set(jobDependencyIds))
         # if no dependencies, release all tasks
@@ -90,8 +99,9 @@ def __main__(jobID, taskIDs=None):
             return taskIDs
 
         for jobDepId in jobDependencyIds:
-            if printDebug: print "Scanning {} for released dependencies".format(jobDepId)
-            jobDepObj = RepositoryUtils.GetJob(jobDep, False)
+            if printDebug:
+                print("Scanning {} for released dependencies".format(jobDepId))
+            jobDepObj = RepositoryUtils.GetJob(jobDepId, False)
             # If the job can't be found, assume it is ok to release it's dependents
             if jobDepObj is None:
                 for d in dependencies:
@@ -99,27 +109,47 @@ def __main__(jobID, taskIDs=None):
                         d.isReleased = True
             else:
                 jobDepTaskList = RepositoryUtils.GetJobTasks(jobDepObj, False).TaskCollectionTasks
-                completedTasks = [t for t in jobDepTaskList if t.TaskStatus.lower() == "completed"]
-                if printDebug: print "{} has {} completed tasks of {} total tasks: {}".format(jobDepId, len(completedTasks), len(jobDepTaskList), [t.TaskId for t in completedTasks])
-                for completedTask in completedTasks:
-                    for d in dependencies:
-                        if d.jobDependencyId == jobDepId and d.dependencyTaskId == int(completedTask.TaskId):
-                            d.isReleased = True
-                            print("{}:{} released".format(d.jobDependencyId, d.dependencyTaskId))
+                completedTasks = set(
+                    int(t.TaskId) for t in jobDepTaskList if t.TaskStatus.lower() == "completed"
+                )
+                allCompleted = len(completedTasks) == len(jobDepTaskList)
+                if printDebug:
+                    print(
+                        "{} has {} completed tasks of {} total tasks: {}".format(
+                            jobDepId,
+                            len(completedTasks),
+                            len(jobDepTaskList),
+                            sorted(completedTasks)
+                        )
+                    )
+                for d in dependencies:
+                    if d.jobDependencyId != jobDepId:
+                        continue
+                    if d.dependencyTaskId is None:
+                        d.isReleased = allCompleted
+                    else:
+                        d.isReleased = d.dependencyTaskId in completedTasks
+                    if d.isReleased:
+                        print("{}:{} released".format(d.jobDependencyId, d.dependencyTaskId))
+
+        depsByTask = {}
+        for d in dependencies:
+            depsByTask.setdefault(d.taskId, []).append(d)
 
         releasedTasks = []
-        for task in dependencies:
-            if printDebug: print "Scanning task #{} for dependencies".format(task.taskId)
-            depsForThisTask = list(set([t for t in dependencies if t.taskId == task.taskId]))
-            # print "Task #{} has {} dependencies: {}".format(task.taskId, len(depsForThisTask), ",".join([d.dependencyTaskId for d in depsForThisTask]))
-            releasedDeps = list(set([d for d in depsForThisTask if d.isReleased]))
-            if printDebug: print "Task #{} has {} released dependencies".format(task.taskId, len(releasedDeps))
-            if(len(depsForThisTask) == len(releasedDeps)):
-                releasedTasks.append(str(task.taskId))
-                if printDebug: print "All dependencies for task #{} have been completed. Releasing task #{}".format(task.taskId, task.taskId)
-
-        if printDebug: print("Released tasks for {} = {}".format(jobID, releasedTasks))
-        return list(set(releasedTasks))
+        for taskId, depsForThisTask in depsByTask.items():
+            if all(d.isReleased for d in depsForThisTask):
+                releasedTasks.append(str(taskId))
+                if printDebug:
+                    print(
+                        "All dependencies for task #{0} completed. Releasing task #{0}".format(
+                            taskId
+                        )
+                    )
+
+        if printDebug:
+            print("Released tasks for {} = {}".format(jobID, releasedTasks))
+        return releasedTasks
 
     # not entirely sure what to do about a job that does not have frame dependencies enabled, that is considered an error state
     return False
@@ -0,0 +1,475 @@
+##########################################################################
+#
+#  Copyright (c) 2026, Hypothetical Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#      * Redistributions of source code must retain the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer.
+#
+#      * Redistributions in binary form must reproduce the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer in the documentation and/or other materials provided with
+#        the distribution.
+#
+#      * Neither the name of Hypothetical Inc. nor the names of
+#        any other contributors to this software may be used to endorse or
+#        promote products derived from this software without specific prior
+#        written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+##########################################################################
+
+""" Algorithms used when planning Deadline jobs. These operate on plain Python
+data rather than Gaffer objects so they can be tested and profiled in isolation.
+"""
+
+import collections
+
+
+def frameDependencyOffsetGroups(tasks):
+    """ Groups tasks into runs that can each be released by Deadline's native frame
+    dependencies, using a single start and end frame offset per run.
+
+    `tasks` is a list of `(startFrame, endFrame, upstreamFrameRanges)` tuples, where
+    `upstreamFrameRanges` is a list of `(startFrame, endFrame)` tuples for the upstream
+    tasks the task depends on.
+
+    Deadline releases a task covering frames `start-end` once all upstream frames in
+    `start + offsetStart` to `end + offsetEnd` are complete. Because upstream tasks
+    complete all of their frames together, that window is correct when it overlaps every
+    upstream task the task depends on, and it doesn't wait longer than needed when it
+    stays within the upstream frames. Each task therefore accepts a range of start and end
+    offsets, and consecutive tasks (in frame order) share a group for as long as those
+    ranges intersect. Constant offsets, piecewise constant offsets, differing batch sizes
+    and scaled frame mappings all reduce to a small number of groups. Tasks without
+    upstream tasks accept any offsets.
+
+    Returns a list of `(offsetStart, offsetEnd, taskIndices)` tuples in frame order, where
+    `taskIndices` index into `tasks`.
+    """
+
+    order = sorted(range(0, len(tasks)), key=lambda i: (tasks[i][0], tasks[i][1]))
+
+    groups = []
+
+    # Running intersection of accepted offsets for the current group, and the shortest
+    # task length in it. The offset window must not be shorter than any task.
+    startLow = startHigh = endLow = endHigh = minLength = None
+    currentIndices = []
+
+    for i in order:
+        startFrame, endFrame, upstreamFrameRanges = tasks[i]
+
+        if len(upstreamFrameRanges) == 0:
+            currentIndices.append(i)
+            continue
+
+        taskStartLow = min(u[0] for u in upstreamFrameRanges) - startFrame
+        taskStartHigh = min(u[1] for u in upstreamFrameRanges) - startFrame
+        taskEndLow = max(u[0] for u in upstreamFrameRanges) - endFrame
+        taskEndHigh = max(u[1] for u in upstreamFrameRanges) - endFrame
+        taskLength = endFrame - startFrame
+
+        if startLow is not None:
+            newStartLow = max(startLow, taskStartLow)
+            newStartHigh = min(startHigh, taskStartHigh)
+            newEndLow = max(endLow, taskEndLow)
+            newEndHigh = min(endHigh, taskEndHigh)
+            newMinLength = min(minLength, taskLength)
+
+            if (
+                newStartLow <= newStartHigh and
+                newEndLow <= newEndHigh and
+                newStartLow - newEndHigh <= newMinLength
+            ):
+                startLow, startHigh = newStartLow, newStartHigh
+                endLow, endHigh = newEndLow, newEndHigh
+                minLength = newMinLength
+                currentIndices.append(i)
+                continue
+
+            groups.append((startLow, endHigh, currentIndices))
+            currentIndices = []
+
+        startLow, startHigh = taskStartLow, taskStartHigh
+        endLow, endHigh = taskEndLow, taskEndHigh
+        minLength = taskLength
+        currentIndices.append(i)
+
+    if len(currentIndices) > 0:
+        if startLow is None:
+            groups.append((0, 0, currentIndices))
+        else:
+            groups.append((startLow, endHigh, currentIndices))
+
+    return groups
+
+
+def planDependencyType(graph, jobIndex):
+    """ Chooses how Deadline releases the tasks of a job in a `DispatchGraph`.
+    Dependencies should be as native to Deadline as possible, resorting to the
+    dependency script only where needed, as Deadline's dependency script triggering
+    is slower than native task dependencies.
+
+    There are three possible dependency types allowed by Deadline:
+    1) Job-Job:     All of the tasks for job A wait for all of the tasks for job B to
+                    finish before job A runs. This is relatively rare when coming from
+                    Gaffer and mostly is used by nodes upstream from a FrameMask node.
+                    In that case releasing tasks per-frame would trigger downstream jobs
+                    sooner than they should.
+    2) Frame-Frame: This is somewhat misleadingly named because Deadline only checks for
+                    frame dependency release after each task completes, so this is very
+                    similar to task-task dependencies. Deadline can only handle a start
+                    and end frame offset when comparing to the parent job so the task
+                    offsets must match across all parent jobs to enable this mode.
+    3) Task-Task:   A task for job A waits for a task for job B to finish before the task
+                    for job A runs. If the dependency start and end frame offsets don't
+                    match, this has to be handled by a dependency script.
+
+    Returns a tuple of the dependency type, which is one of "None", "JobToJob",
+    "FrameToFrame" or "Scripted", and the start and end frame offsets found for
+    frame dependencies, or None if they weren't computed.
+    """
+    job = graph.getJob(jobIndex)
+    dependencies = graph.getDependencies(jobIndex)
+    dependencyMode = job["dependencyMode"]
+
+    if len(dependencies) == 0 or dependencyMode == "None":
+        return ("None", None, None)
+    if dependencyMode == "Job":
+        return ("JobToJob", None, None)
+
+    # Tasks of context table jobs are submitted as row indices rather than
+    # frames, so frame dependencies can't be used to or from them.
+    if job["useContextTable"] or any(
+        graph.getJob(d[1])["useContextTable"] for d in dependencies
+    ):
+        return ("Scripted", None, None)
+
+    if dependencyMode == "Frame":
+        return ("FrameToFrame", None, None)
+    if dependencyMode != "Auto":
+        return ("Scripted", None, None)
+
+    tasks = job["tasks"]
+    if any(t[0] is None or t[1] is None for t in tasks):
+        return ("Scripted", None, None)
+
+    upstreamFrameRanges = [[] for t in tasks]
+    for taskIndex, upstreamJobIndex, upstreamTaskIndex in dependencies:
+        upstreamTask = graph.getJob(upstreamJobIndex)["tasks"][upstreamTaskIndex]
+        if upstreamTask[0] is None or upstreamTask[1] is None:
+            return ("Scripted", None, None)
+        upstreamFrameRanges[taskIndex].append((upstreamTask[0], upstreamTask[1]))
+
+    # Jobs needing more than one set of frame offsets are split before planning
+    # when possible, so only a single group can use frame dependencies here.
+    groups = frameDependencyOffsetGroups(
+        [(t[0], t[1], upstreamFrameRanges[i]) for i, t in enumerate(tasks)]
+    )
+    if len(groups) != 1:
+        return ("Scripted", None, None)
+
+    return ("FrameToFrame", groups[0][0], groups[0][1])
+
+
+def graphToDot(graph):
+    """ Formats a job graph as Graphviz DOT source. `graph` is a dictionary with
+    a "jobs" list of dictionaries holding "id", "name", "tasks", "dependencyType",
+    "scriptDependencyKeys" and "planningTime" (in seconds), and an "edges" list of
+    dictionaries holding "from" and "to" job ids and a "dependencies" count.
+    Edges point from upstream jobs to the jobs waiting on them.
+    """
+
+    def escape(s):
+        return str(s).replace("\\", "\\\\").replace("\"", "\\\"")
+
+    def quote(s):
+        return "\"{}\"".format(escape(s))
+
+    lines = ["digraph DeadlineJobs {", "    rankdir = LR;", "    node [shape = box];"]
+
+    for job in graph["jobs"]:
+        label = "{}\\nTasks : {}\\nDependencies : {}".format(
+            escape(job["name"]),
+            job["tasks"],
+            job["dependencyType"]
+        )
+        if job["scriptDependencyKeys"]:
+            label += " ({} keys)".format(job["scriptDependencyKeys"])
+        label += "\\nPlanning : {:.3f} ms".format(job["planningTime"] * 1000.0)
+
+        lines.append("    {} [label = \"{}\"];".format(quote(job["id"]), label))
+
+    for edge in graph["edges"]:
+        lines.append(
+            "    {} -> {} [label = \"{}\"];".format(
+                quote(edge["from"]),
+                quote(edge["to"]),
+                edge["dependencies"]
+            )
+        )
+
+    lines.append("}")
+
+    return "\n".join(lines) + "\n"
+
+
+def criticalPathSlack(costs, parents):
+    """ Finds how far each job of a graph is from its critical path. `costs` is a
+    list of estimated job costs and `parents` a list holding, for each job, the
+    indices of the jobs it waits on. Returns a tuple of the critical path length
+    and a list of the slack for each job, which is the amount the critical path
+    is longer than the longest path through that job. Jobs on the critical path
+    have no slack.
+    """
+    children = [[] for c in costs]
+    for i, jobParents in enumerate(parents):
+        for p in set(jobParents):
+            children[p].append(i)
+
+    # Topological order, upstream jobs first.
+    order = []
+    waiting = [len(set(p)) for p in parents]
+    ready = [i for i, w in enumerate(waiting) if w == 0]
+    while ready:
+        i = ready.pop()
+        order.append(i)
+        for c in children[i]:
+            waiting[c] -= 1
+            if waiting[c] == 0:
+                ready.append(c)
+
+    if len(order) != len(costs):
+        raise ValueError("Job graph has a cycle.")
+
+    # Longest paths finishing at and starting from each job.
+    head = [0.0] * len(costs)
+    for i in order:
+        head[i] = costs[i] + max([head[p] for p in parents[i]], default=0.0)
+
+    tail = [0.0] * len(costs)
+    for i in reversed(order):
+        tail[i] = costs[i] + max([tail[c] for c in children[i]], default=0.0)
+
+    length = max(head, default=0.0)
+
+    return length, [length - (head[i] + tail[i] - costs[i]) for i in range(0, len(costs))]
+
+
+def criticalPathPriorityOffsets(costs, parents, band):
+    """ Returns a priority offset between 0 and `band` for each job of a graph,
+    with `costs` and `parents` as for `criticalPathSlack()`. Jobs on the critical
+    path get the full band and jobs with more slack get proportionally less.
+    """
+    length, slack = criticalPathSlack(costs, parents)
+    if length <= 0:
+        return [0] * len(costs)
+
+    return [int(round(band * (1.0 - s / length))) for s in slack]
+
+
+def taskOrder(frameRanges, strategy):
+    """ Returns the order in which to submit tasks so that Deadline starts on the
+    most useful frames first. `frameRanges` is a list of `(startFrame, endFrame)`
+    tuples for each task, and the result is a list of indices into it. Strategies are :
+
+    - "Ascending" : In frame order.
+    - "FirstMiddleLast" : The first, middle and last tasks, then the rest in frame order.
+    - "Binary" : The first and last tasks, then the middle task of each remaining span,
+      subdividing the spans until every task is included.
+    - "LongestFirst" : Tasks with the most frames first, in frame order otherwise.
+    """
+    ascending = sorted(range(0, len(frameRanges)), key=lambda i: frameRanges[i])
+
+    if strategy == "Ascending":
+        return ascending
+    elif strategy == "LongestFirst":
+        return sorted(ascending, key=lambda i: frameRanges[i][0] - frameRanges[i][1])
+    elif strategy == "FirstMiddleLast":
+        first = [0, (len(ascending) - 1) // 2, len(ascending) - 1] if ascending else []
+    elif strategy == "Binary":
+        first = [0, len(ascending) - 1] if ascending else []
+        spans = collections.deque([(0, len(ascending) - 1)] if ascending else [])
+        while spans:
+            low, high = spans.popleft()
+            middle = (low + high) // 2
+            if middle == low:
+                continue
+            first.append(middle)
+            spans.append((low, middle))
+            spans.append((middle, high))
+    else:
+        raise ValueError("Unknown frame order \"{}\".".format(strategy))
+
+    positions = list(dict.fromkeys(first))
+    chosen = set(positions)
+    positions += [p for p in range(0, len(ascending)) if p not in chosen]
+
+    return [ascending[p] for p in positions]
+
+
+def autoChunkSize(frameCount, slots, taskStartupTime, frameTime):
+    """ Chooses the number of frames per task for a job of `frameCount` frames
+    rendered on `slots` concurrent task slots. Each task is estimated to take
+    `taskStartupTime` plus `frameTime` per frame, and tasks run in waves of `slots`
+    tasks. Returns the chunk size giving the shortest estimated job time, preferring
+    fewer tasks when several sizes are equally quick.
+    """
+    if frameCount <= 0:
+        return 1
+
+    slots = max(slots, 1)
+
+    # The quickest chunk size for a given number of waves is the smallest one
+    # needing no more than that many waves.
+    bestDuration = bestChunkSize = None
+    for waves in range(1, (frameCount + slots - 1) // slots + 1):
+        chunkSize = (frameCount + waves * slots - 1) // (waves * slots)
+        taskCount = (frameCount + chunkSize - 1) // chunkSize
+        duration = (
+            ((taskCount + slots - 1) // slots) * (taskStartupTime + chunkSize * frameTime)
+        )
+        if bestDuration is None or duration < bestDuration:
+            bestDuration, bestChunkSize = duration, chunkSize
+
+    return bestChunkSize
+
+
+def frameListString(frameRanges):
+    """ Encodes the frames of a job's tasks as a Deadline frame list, returning a
+    tuple of the frame list and the chunk size needed for Deadline to split it back
+    into the same tasks. `frameRanges` is a list of `(startFrame, endFrame)` tuples
+    for each task, in the order they should be queued.
+
+    The chunk size is the length of the longest task. Runs of consecutive tasks that
+    each have that length and follow on from one another are merged into a single
+    range, and runs of single frame tasks with a constant step use Deadline's stepped
+    range syntax, so that the list stays short for jobs with many tasks. The list is
+    built in a single pass.
+    """
+    chunkSize = max([e - s + 1 for s, e in frameRanges], default=1)
+
+    parts = []
+
+    # The current run, as its first and last frame, the step between frames and the
+    # number of tasks in it.
+    runStart = runEnd = runStep = None
+    runLength = 0
+
+    def rangeString(startFrame, endFrame):
+        return str(startFrame) if startFrame == endFrame else "{}-{}".format(startFrame, endFrame)
+
+    def appendRun():
+        if runLength == 0:
+            return
+        if chunkSize > 1 or runStep == 1:
+            parts.append(rangeString(runStart, runEnd))
+        elif runLength == 1:
+            parts.append(str(runStart))
+        elif runLength == 2:
+            parts.append("{},{}".format(runStart, runEnd))
+        else:
+            parts.append("{}-{}x{}".format(runStart, runEnd, runStep))
+
+    for startFrame, endFrame in frameRanges:
+        if endFrame - startFrame + 1 != chunkSize:
+            # Only the longest tasks can be merged, as Deadline would otherwise
+            # chunk the merged range differently.
+            appendRun()
+            runLength = 0
+            parts.append(rangeString(startFrame, endFrame))
+            continue
+
+        if runLength > 0:
+            step = startFrame - runEnd if chunkSize == 1 else startFrame - runEnd - 1
+            if chunkSize == 1 and step > 0 and (runLength == 1 or step == runStep):
+                runEnd, runStep = endFrame, step
+                runLength += 1
+                continue
+            elif chunkSize > 1 and step == 0:
+                runEnd = endFrame
+                runLength += 1
+                continue
+
+            appendRun()
+
+        runStart, runEnd, runStep = startFrame, endFrame, 1
+        runLength = 1
+
+    appendRun()
+
+    return ",".join(parts), chunkSize
+
+
+def scriptDependencyKeys(dependencies, taskCount, upstreamTaskCounts):
+    """ Encodes the task dependencies of a job for the Gaffer dependency script, as a
+    list of `(key, value)` tuples to be submitted as `ExtraInfoKeyValue` entries.
+
+    `dependencies` is a list of `(taskNumber, upstreamJob, upstreamTaskNumber)` tuples,
+    `taskCount` is the number of tasks in the job and `upstreamTaskCounts` is a
+    dictionary of the number of tasks in each upstream job. Upstream jobs are usually
+    identified by their Deadline job id.
+
+    Each task gets a `task:upstreamJob` key listing the upstream task numbers it waits
+    for, separated by commas. Dependencies on every task of an upstream job are
+    collapsed to `task:upstreamJob=*`, and when every task of the job waits for every
+    upstream task the whole edge is collapsed to a single `*:upstreamJob=*` key, so the
+    script only has to check that the upstream job is complete.
+    """
+    upstreamTasks = {}
+    for taskNumber, upstreamJob, upstreamTaskNumber in dependencies:
+        upstreamTasks.setdefault(upstreamJob, {}).setdefault(taskNumber, set()).add(
+            upstreamTaskNumber
+        )
+
+    keys = []
+    for upstreamJob in sorted(upstreamTasks.keys()):
+        tasks = upstreamTasks[upstreamJob]
+        upstreamTaskCount = upstreamTaskCounts[upstreamJob]
+
+        fullTasks = [t for t, u in tasks.items() if len(u) == upstreamTaskCount]
+        if len(fullTasks) == taskCount:
+            keys.append(("*:{}".format(upstreamJob), "*"))
+            continue
+
+        for taskNumber in sorted(tasks.keys()):
+            if len(tasks[taskNumber]) == upstreamTaskCount:
+                value = "*"
+            else:
+                value = ",".join(str(u) for u in sorted(tasks[taskNumber]))
+            keys.append(("{}:{}".format(taskNumber, upstreamJob), value))
+
+    return keys
+
+
+def tileCropWindows(tilesX, tilesY):
+    """ Divides an image into `tilesX` by `tilesY` tiles, returning the crop window
+    of each tile as a `((minX, minY), (maxX, maxY))` tuple in normalised coordinates,
+    with the origin at the top left of the image as used by Gaffer's `render:cropWindow`
+    option. Tile `i` is in column `i % tilesX` and row `i // tilesX`. Each tile starts
+    exactly where its neighbour ends, so the tiles cover the image without gaps.
+    """
+    if tilesX < 1 or tilesY < 1:
+        raise ValueError("Tile counts must be at least 1.")
+
+    return [
+        ((x / tilesX, y / tilesY), ((x + 1) / tilesX, (y + 1) / tilesY))
+        for y in range(0, tilesY)
+        for x in range(0, tilesX)
+    ]
@@ -35,11 +35,21 @@
 ##########################################################################
 
 import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import concurrent.futures
+
+import imath
 
 import IECore
 
 import Gaffer
 import GafferDispatch
+import GafferImage
+import GafferScene
 
 import GafferDeadline
 
@@ -48,7 +58,27 @@ class DeadlineDispatcher(GafferDispatch.Dispatcher):
 
     def __init__(self, name="DeadlineDispatcher"):
         GafferDispatch.Dispatcher.__init__(self, name)
-        self._deadlineJobs = []
+        self.__dispatchResult = None
+        self.__jobDirectoryLock = threading.Lock()
+        self.__threadState = threading.local()
+
+        self["frameDependencySplitLimit"] = Gaffer.IntPlug(defaultValue=4, minValue=1)
+        self["exportGraph"] = Gaffer.BoolPlug(defaultValue=False)
+        self["preflightChecks"] = Gaffer.BoolPlug(defaultValue=True)
+        self["fuseTaskChains"] = Gaffer.BoolPlug(defaultValue=False)
+        self["pruneScripts"] = Gaffer.BoolPlug(defaultValue=False)
+        self["sceneCacheDirectory"] = Gaffer.StringPlug()
+        self["taskStartupTime"] = Gaffer.FloatPlug(defaultValue=30.0, minValue=0.0)
+        self["environmentProfiles"] = Gaffer.BoolPlug(defaultValue=False)
+        self["farmDispatch"] = Gaffer.BoolPlug(defaultValue=False)
+        self["spoolDirectory"] = Gaffer.StringPlug()
+        self["contentStore"] = Gaffer.StringPlug()
+        self["criticalPathPriority"] = Gaffer.BoolPlug(defaultValue=False)
+        self["criticalPathPriorityBand"] = Gaffer.IntPlug(
+            defaultValue=20,
+            minValue=0,
+            maxValue=100
+        )
 
     # Emitted prior to submitting the Deadline job, to allow
     # custom modifications to be applied.
@@ -63,6 +93,59 @@ class DeadlineDispatcher(GafferDispatch.Dispatcher):
 
     __preSpoolSignal = Gaffer.Signal2()
 
+    # Emitted once before any Deadline jobs are submitted, to allow
+    # modifications to be applied to all jobs at once.
+    #
+    # Slots should have the signature `slot( dispatcher, jobs )`,
+    # where jobs is the list of GafferDeadlineJob instances about
+    # to be spooled. `preSpoolSignal()` is still emitted for each
+    # job as it is spooled.
+    @classmethod
+    def preSpoolBatchSignal(cls):
+        return cls.__preSpoolBatchSignal
+
+    __preSpoolBatchSignal = Gaffer.Signal2()
+
+    # Emitted once all Deadline jobs have been submitted.
+    #
+    # Slots should have the signature `slot( dispatcher, jobs, dispatchResult )`,
+    # where jobs is the list of submitted GafferDeadlineJob instances, which
+    # now have job IDs, and dispatchResult is the DispatchResult holding the
+    # timings of each phase of the dispatch up to and including submission.
+    @classmethod
+    def postSubmitSignal(cls):
+        return cls.__postSubmitSignal
+
+    __postSubmitSignal = Gaffer.Signal3()
+
+    # Emitted when dispatch has finished and the jobs used for planning
+    # have been released.
+    #
+    # Slots should have the signature `slot( dispatcher, dispatchResult )`,
+    # where dispatchResult is the DispatchResult for the dispatch, as
+    # returned by `dispatchResult()`.
+    @classmethod
+    def dispatchCompleteSignal(cls):
+        return cls.__dispatchCompleteSignal
+
+    __dispatchCompleteSignal = Gaffer.Signal2()
+
+    def dispatch(self, nodes):
+        # Gaffer keeps the job directory of the dispatch in progress on the dispatcher
+        # itself, so concurrent dispatches hold a lock from the start of dispatch until
+        # `_doDispatch()` has taken its own copy of the directory.
+        self.__jobDirectoryLock.acquire()
+        self.__threadState.holdsJobDirectoryLock = True
+        try:
+            return GafferDispatch.Dispatcher.dispatch(self, nodes)
+        finally:
+            self.__releaseJobDirectoryLock()
+
+    def __releaseJobDirectoryLock(self):
+        if getattr(self.__threadState, "holdsJobDirectoryLock", False):
+            self.__threadState.holdsJobDirectoryLock = False
+            self.__jobDirectoryLock.release()
+
     def _doDispatch(self, rootBatch):
         '''
         _doDispatch is called by Gaffer, the others (prefixed with __) are just helpers for
@@ -94,14 +177,24 @@ class DeadlineDispatcher(GafferDispatch.Dispatcher):
         jobs to set their dependencies correctly.
 
         To be compatible with Deadline's ExtraInfoKeyValue system, dependencies are reformatted at
-        submission as task:jobDependencyId=taskDependencyNumber
+        submission as task:jobDependencyId=taskDependencyNumbers, collapsing dependencies on
+        every task of a job as described in `DeadlineAlgo.scriptDependencyKeys()`
         '''
-        self._deadlineJobs = []
         IECore.Log.info("Beginning Deadline submission")
+        dispatchStartTime = time.perf_counter()
+
+        # All planning state is held by `dispatchData`, so that dispatches running
+        # concurrently in several threads don't interfere with each other. The job
+        # directory is only read from the dispatcher here.
         dispatchData = {}
+        dispatchData["jobDirectory"] = self.jobDirectory()
+        self.__releaseJobDirectoryLock()
+        dispatchData["deadlineJobs"] = []
+
+        dispatchResult = GafferDeadline.DispatchResult(dispatchData["jobDirectory"])
         dispatchData["scriptNode"] = rootBatch.preTasks()[0].node().scriptNode()
         dispatchData["scriptFile"] = os.path.join(
-            self.jobDirectory(),
+            dispatchData["jobDirectory"],
             os.path.basename(
                 dispatchData["scriptNode"]["fileName"].getValue()
             ) or "untitled.gfr"
@@ -111,24 +204,224 @@ class DeadlineDispatcher(GafferDispatch.Dispatcher):
             os.sep
         )
 
-        dispatchData["scriptNode"].serialiseToFile(dispatchData["scriptFile"])
-
         with Gaffer.Context.current() as c:
             dispatchData["dispatchJobName"] = self["jobName"].getValue()
+            dispatchData["contentStore"] = self["contentStore"].getValue()
+            spoolDirectory = self["spoolDirectory"].getValue()
+            environmentProfiles = self["environmentProfiles"].getValue()
+
+        # Environment profiles are only shared by jobs when they are read from the content
+        # store. Included with each job, they would be copied to Deadline for every job.
+        dispatchData["useEnvironmentProfiles"] = (
+            environmentProfiles and bool(dispatchData["contentStore"])
+        )
+        if environmentProfiles and not dispatchData["contentStore"]:
+            IECore.msg(
+                IECore.Msg.Level.Warning,
+                "DeadlineDispatcher",
+                "Environment profiles require a content store. The environment "
+                "of each job is stored in its job record instead."
+            )
+
+        # The script is serialised before dispatch returns control to the user, but
+        # is written to the job directory, which is often on slow network storage, in
+        # the background while the jobs are planned. With a content store, a script
+        # unchanged since an earlier dispatch is already there and isn't written again.
+        dispatchData["scriptSerialisation"] = dispatchData["scriptNode"].serialise()
+        scriptWriter = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        if dispatchData["contentStore"]:
+            dispatchData["scriptFile"] = self.__contentStoreFile(
+                dispatchData["scriptSerialisation"],
+                os.path.basename(dispatchData["scriptFile"]),
+                dispatchData
+            )
+            scriptWrite = scriptWriter.submit(
+                self.__writeContentFile,
+                dispatchData["scriptFile"],
+                dispatchData["scriptSerialisation"]
+            )
+        else:
+            scriptWrite = scriptWriter.submit(
+                self.__writeFile,
+                dispatchData["scriptFile"],
+                dispatchData["scriptSerialisation"]
+            )
 
-        rootDeadlineJob = GafferDeadline.GafferDeadlineJob(rootBatch.node())
-        rootDeadlineJob.setAuxFiles([dispatchData["scriptFile"]])
-        self.__addGafferDeadlineJob(rootDeadlineJob)
-        rootJobs = []
-        for upstreamBatch in rootBatch.preTasks():
-            rootJob = self.__buildDeadlineJobWalk(upstreamBatch, dispatchData)
-            if rootJob is not None:
-                rootJobs.append(rootJob)
+        dispatchResult.setTiming("serialise", time.perf_counter() - dispatchStartTime)
+
+        # The planning graph holds references to every batch, context and task of the
+        # dispatch, so it is released as soon as submission finishes, leaving only the
+        # compact `DispatchResult`.
+        try:
+            phaseStartTime = time.perf_counter()
+
+            # The job and plugin files are only needed until each job is submitted,
+            # so they are written to a private directory on local storage rather
+            # than the job directory, and removed with it once dispatch is done.
+            if spoolDirectory:
+                os.makedirs(spoolDirectory, exist_ok=True)
+            dispatchData["spoolDirectory"] = tempfile.mkdtemp(
+                prefix="gafferDeadlineSpool",
+                dir=spoolDirectory or None
+            )
 
-        rootJobs = list(set(rootJobs))
+            dispatchData["scriptSuffixes"] = {}
 
-        for rootJob in rootJobs:
-            self.__submitDeadlineJob(rootJob, dispatchData)
+            rootDeadlineJob = GafferDeadline.GafferDeadlineJob(rootBatch.node())
+            rootDeadlineJob.setAuxFiles([dispatchData["scriptFile"]])
+            self.__addGafferDeadlineJob(rootDeadlineJob, dispatchData)
+            rootJobs = []
+            if self["farmDispatch"].getValue():
+                rootJobs.append(self.__bootstrapJob(rootBatch, dispatchData))
+            else:
+                for upstreamBatch in rootBatch.preTasks():
+                    rootJob = self.__buildDeadlineJobWalk(upstreamBatch, dispatchData)
+                    if rootJob is not None:
+                        rootJobs.append(rootJob)
+
+            rootJobs = list(dict.fromkeys(rootJobs))
+
+            dispatchResult.setTiming("build", time.perf_counter() - phaseStartTime)
+            phaseStartTime = time.perf_counter()
+
+            # Local jobs are taken out of the graph before planning, but only executed
+            # once the pre-flight checks have passed.
+            rootJobs, localJobGroups = self.__removeLocalJobs(rootJobs, dispatchData)
+
+            rootJobs = self.__fuseTaskChains(rootJobs, dispatchData)
+
+            self.__autoChunkTasks(dispatchData)
+
+            rootJobs = self.__splitFrameDependentJobs(rootJobs, dispatchData)
+
+            dispatchData["tileCropWindows"] = {}
+            self.__tileJobs(dispatchData)
+            self.__insertSceneCaches(dispatchData)
+
+            # Dependency planning works on a plain description of the jobs, built
+            # once the structure of the jobs is settled.
+            plannedJobs = self.__plannedJobs(dispatchData)
+            dispatchGraph = self.__buildDispatchGraph(plannedJobs)
+            dispatchData["dispatchGraph"] = dispatchGraph
+            dispatchData["jobIndices"] = {id(j): i for i, j in enumerate(plannedJobs)}
+            self.__planDependencies(dispatchGraph, plannedJobs)
+
+            # Tasks are kept in frame order while planning and only reordered once
+            # dependency types are chosen. Dependencies refer to tasks rather than
+            # their numbers, so they follow the tasks to their new numbers.
+            for jobIndex, deadlineJob in enumerate(plannedJobs):
+                taskOrder = self.__orderTasks(deadlineJob)
+                if taskOrder is not None:
+                    dispatchGraph.setTaskOrder(jobIndex, taskOrder)
+
+            dispatchData["jobScripts"] = {}
+            dispatchData["environmentProfiles"] = set()
+            if self["criticalPathPriority"].getValue():
+                self.__setCriticalPathPriorityOffsets(dispatchGraph)
+
+            if self["exportGraph"].getValue():
+                self.__exportGraph(dispatchData)
+
+            dispatchResult.setTiming("plan", time.perf_counter() - phaseStartTime)
+            phaseStartTime = time.perf_counter()
+
+            # Everything from here on needs the script file. The overlap is the time
+            # spent writing it that planning hid.
+            scriptWriteTime = scriptWrite.result()
+            scriptWaitTime = time.perf_counter() - phaseStartTime
+            dispatchResult.setTiming("scriptWrite", scriptWriteTime)
+            dispatchResult.setTiming("scriptWait", scriptWaitTime)
+            dispatchResult.setTiming("scriptOverlap", max(0.0, scriptWriteTime - scriptWaitTime))
+            phaseStartTime = time.perf_counter()
+
+            # Before the pre-flight checks, so that they include any auxiliary
+            # files added by slots.
+            self.preSpoolBatchSignal()(self, plannedJobs)
+
+            dispatchResult.setTiming("preSpool", time.perf_counter() - phaseStartTime)
+            phaseStartTime = time.perf_counter()
+
+            dispatchData["preflightChecked"] = False
+            if self["preflightChecks"].getValue():
+                self.__preflightChecks(dispatchData)
+                dispatchData["preflightChecked"] = True
+
+            dispatchResult.setTiming("preflight", time.perf_counter() - phaseStartTime)
+            phaseStartTime = time.perf_counter()
+
+            self.__executeLocalJobs(localJobGroups)
+
+            dispatchResult.setTiming("local", time.perf_counter() - phaseStartTime)
+            phaseStartTime = time.perf_counter()
+
+            # Jobs are spooled, writing their scripts and context tables, on this thread
+            # while a single submission thread sends each one to Deadline as soon as it
+            # is ready. Submissions run in the order jobs are spooled, which puts parent
+            # jobs first, so upstream jobs reach the farm while the rest are still being
+            # spooled.
+            dispatchData["dispatchStartTime"] = dispatchStartTime
+            dispatchData["submittedJobIDs"] = {}
+            dispatchData["submissionFailed"] = threading.Event()
+            submissions = []
+            submitter = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            try:
+                for deadlineJob, dependencies in self.__spoolDeadlineJobs(
+                    rootJobs,
+                    dispatchData
+                ):
+                    if dispatchData["submissionFailed"].is_set():
+                        break
+                    submissions.append(
+                        submitter.submit(
+                            self.__submitSpooledJob,
+                            deadlineJob,
+                            dependencies,
+                            dispatchData
+                        )
+                    )
+                for submission in submissions:
+                    submission.result()
+            except Exception:
+                # Nothing more is sent to Deadline once spooling or a submission fails.
+                dispatchData["submissionFailed"].set()
+                raise
+            finally:
+                submitter.shutdown()
+
+            dispatchResult.setTiming("submit", time.perf_counter() - phaseStartTime)
+            if "firstSubmitTime" in dispatchData:
+                dispatchResult.setTiming("firstSubmit", dispatchData["firstSubmitTime"])
+
+            for deadlineJob in self.__plannedJobs(dispatchData):
+                dispatchResult.addJob(
+                    deadlineJob.getJobProperties().get("Name", ""),
+                    deadlineJob.getJobID(),
+                    len(deadlineJob.getTasks()),
+                    self.__dependencyTypeName(deadlineJob.getDependencyType()),
+                    deadlineJob.getPlanningTime()
+                )
+
+            phaseStartTime = time.perf_counter()
+            self.postSubmitSignal()(self, plannedJobs, dispatchResult)
+            dispatchResult.setTiming("postSubmit", time.perf_counter() - phaseStartTime)
+        finally:
+            scriptWriter.shutdown()
+            dispatchData["deadlineJobs"] = []
+            if "spoolDirectory" in dispatchData:
+                shutil.rmtree(dispatchData["spoolDirectory"], ignore_errors=True)
+
+        dispatchResult.setTiming("total", time.perf_counter() - dispatchStartTime)
+        self.__dispatchResult = dispatchResult
+
+        self.dispatchCompleteSignal()(self, dispatchResult)
+
+        return dispatchResult
+
+    def dispatchResult(self):
+        """ Returns the `DispatchResult` summarising the last dispatch to finish, or
+        None if there hasn't been a successful dispatch.
+        """
+        return self.__dispatchResult
 
     def __buildDeadlineJobWalk(self, batch, dispatchData):
         IECore.msg(
@@ -151,17 +444,26 @@ class DeadlineDispatcher(GafferDispatch.Dispatcher):
                 )
             )
 
+        startTime = time.perf_counter()
+
+        # Jobs using a context table hold the batches for all contexts of their node,
+        # so they are looked up by node alone.
+        jobContext = None if self.__useContextTable(batch) else batch.context()
+
         if batch.blindData().get("deadlineDispatcher:visited"):
-            return self.__getGafferDeadlineJob(batch.node(), batch.context())
+            return self.__getGafferDeadlineJob(batch.node(), jobContext, dispatchData)
 
-        deadlineJob = self.__getGafferDeadlineJob(batch.node(), batch.context())
+        deadlineJob = self.__getGafferDeadlineJob(batch.node(), jobContext, dispatchData)
         if not deadlineJob:
             deadlineJob = GafferDeadline.GafferDeadlineJob(batch.node())
             deadlineJob.setContext(batch.context())
+            deadlineJob.setUseContextTable(jobContext is None)
             deadlineJob.setAuxFiles([dispatchData["scriptFile"]])
-            self.__addGafferDeadlineJob(deadlineJob)
+            self.__addGafferDeadlineJob(deadlineJob, dispatchData)
 
         deadlineJob.addBatch(batch, batch.frames())
+        deadlineJob.addPlanningTime(time.perf_counter() - startTime)
+
         for upstreamBatch in batch.preTasks():
             parentDeadlineJob = self.__buildDeadlineJobWalk(upstreamBatch, dispatchData)
             if parentDeadlineJob is not None:
@@ -171,320 +473,1573 @@ class DeadlineDispatcher(GafferDispatch.Dispatcher):
 
         return deadlineJob
 
-    def __getGafferDeadlineJob(self, node, context):
-        for j in self._deadlineJobs:
-            if j.getGafferNode() == node and j.getContext() == context:
-                return j
+    def __bootstrapJob(self, rootBatch, dispatchData):
+        """ Returns a job dispatching the nodes of `rootBatch` from the farm, used in
+        place of planning and submitting their jobs from this session. The job runs a
+        `PythonCommand` added to its script, which dispatches the same nodes with a
+        `DeadlineDispatcher` holding our settings.
+        """
+        scriptNode = dispatchData["scriptNode"]
+        nodeNames = []
+        for batch in rootBatch.preTasks():
+            nodeName = self.__nodeName(batch.node())
+            if nodeName not in nodeNames:
+                nodeNames.append(nodeName)
+
+        # Settings are evaluated here, so the farm dispatch uses the same job name,
+        # jobs directory and frames. The spool directory is local to this machine,
+        # so the Worker uses its own default.
+        settings = []
+        for plug in self.children(Gaffer.ValuePlug):
+            if (
+                plug.getName() in ["farmDispatch", "spoolDirectory"] or
+                not hasattr(plug, "getValue")
+            ):
+                continue
+            settings.append(
+                "dispatcher[{!r}].setValue( {!r} )".format(plug.getName(), plug.getValue())
+            )
 
-    def __addGafferDeadlineJob(self, newDeadlineJob):
-        self._deadlineJobs.append(newDeadlineJob)
-        self._deadlineJobs = list(set(self._deadlineJobs))
+        command = "\n".join(
+            [
+                "import GafferDeadline",
+                "dispatcher = GafferDeadline.DeadlineDispatcher()",
+            ] + settings + [
+                "nodes = [ self.scriptNode().descendant( n ) for n in {!r} ]".format(nodeNames),
+                "dispatcher.dispatch( nodes )",
+            ]
+        )
 
-    def __submitDeadlineJob(self, deadlineJob, dispatchData):
-        # submit jobs depth first so parent job IDs will be populated
-        for parentJob in deadlineJob.getParentJobs():
-            self.__submitDeadlineJob(parentJob, dispatchData)
+        IECore.msg(
+            IECore.Msg.Level.Debug,
+            "DeadlineDispatcher",
+            "Dispatching {} from the farm".format(", ".join(nodeNames))
+        )
 
-        gafferNode = deadlineJob.getGafferNode()
+        dispatchData["bootstrapScript"] = Gaffer.ScriptNode()
+        bootstrapNode = GafferDispatch.PythonCommand()
+        dispatchData["bootstrapScript"]["__deadlineBootstrap"] = bootstrapNode
+
+        rootNode = rootBatch.preTasks()[0].node()
+        if rootNode["dispatcher"].getChild("deadline") is not None:
+            rootJob = GafferDeadline.GafferDeadlineJob(rootNode)
+            rootJob.setContext(Gaffer.Context.current())
+            self.__copyGeneratedJobSettings(rootJob, bootstrapNode, [])
+
+        bootstrapJob = GafferDeadline.GafferDeadlineJob(bootstrapNode)
+        bootstrapJob.setContext(Gaffer.Context.current())
+        bootstrapJob.setAuxFiles([dispatchData["scriptFile"]])
+        bootstrapJob.addBatch(None, [int(scriptNode.context().getFrame())])
+        self.__addGafferDeadlineJob(bootstrapJob, dispatchData)
+
+        dispatchData["scriptSuffixes"][id(bootstrapJob)] = "\n".join(
+            [
+                "",
+                "import GafferDispatch",
+                "parent.addChild( GafferDispatch.PythonCommand( \"__deadlineBootstrap\" ) )",
+                "parent[\"__deadlineBootstrap\"][\"command\"].setValue( {!r} )".format(command),
+                "",
+            ]
+        )
 
-        # Don't submit command tasks, they pollute the Deadline Monitor and cause
-        # potentially lengthy delays in dequeuing tasks that do nothing.
-        if GafferDeadline.GafferDeadlineJob.isControlTask(deadlineJob.getGafferNode()):
+        return bootstrapJob
+
+    def __removeLocalJobs(self, rootJobs, dispatchData):
+        """ Removes the jobs for nodes with `runLocally` enabled from the jobs to submit,
+        so jobs downstream of them have no dependencies on them. Jobs waiting on a job
+        submitted to Deadline can't run before it, so are submitted as usual. Returns the
+        remaining root jobs, and the removed jobs for `__executeLocalJobs()` as a list of
+        groups, each of which only depends on earlier groups.
+        """
+        localJobs = []
+        for deadlineJob in self.__plannedJobs(dispatchData):
+            gafferNode = deadlineJob.getGafferNode()
+            deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(gafferNode)
+            if deadlinePlug is None or isinstance(gafferNode, GafferDeadline.DeadlineTask):
+                continue
+            with Gaffer.Context(deadlineJob.getContext()):
+                if deadlinePlug["runLocally"].getValue():
+                    localJobs.append(deadlineJob)
+
+        removed = True
+        while removed:
+            removed = False
+            for deadlineJob in list(localJobs):
+                if any(p not in localJobs for p in deadlineJob.getEffectiveParentJobs()):
+                    IECore.msg(
+                        IECore.Msg.Level.Warning,
+                        "DeadlineDispatcher",
+                        "{} depends on jobs submitted to Deadline, so can't run locally.".format(
+                            deadlineJob.getGafferNode().getName()
+                        )
+                    )
+                    localJobs.remove(deadlineJob)
+                    removed = True
+
+        if len(localJobs) == 0:
+            return rootJobs, []
+
+        # Execution order is found before the jobs are removed, as that also removes
+        # the dependencies between them.
+        localJobGroups = []
+        orderedJobs = []
+        while len(orderedJobs) < len(localJobs):
+            readyJobs = [
+                j for j in localJobs if j not in orderedJobs and all(
+                    p in orderedJobs for p in j.getEffectiveParentJobs()
+                )
+            ]
+            localJobGroups.append(readyJobs)
+            orderedJobs += readyJobs
+
+        for deadlineJob in dispatchData["deadlineJobs"]:
+            for localJob in localJobs:
+                deadlineJob.removeParentJob(localJob)
+        dispatchData["deadlineJobs"] = [
+            j for j in dispatchData["deadlineJobs"] if j not in localJobs
+        ]
+
+        return [j for j in rootJobs if j not in localJobs], localJobGroups
+
+    def __executeLocalJobs(self, localJobGroups):
+        """ Executes the jobs removed by `__removeLocalJobs()` during dispatch instead of
+        submitting them to Deadline. Jobs that don't depend on each other are executed
+        concurrently.
+        """
+        if len(localJobGroups) == 0:
+            return
+
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            for readyJobs in localJobGroups:
+                for future in [executor.submit(self.__executeLocalJob, j) for j in readyJobs]:
+                    future.result()
+
+    @staticmethod
+    def __executeLocalJob(deadlineJob):
+        IECore.msg(
+            IECore.Msg.Level.Info,
+            "DeadlineDispatcher",
+            "Executing {} locally".format(deadlineJob.getGafferNode().getName())
+        )
+        for task in deadlineJob.getTasks():
+            for batch in task.getGafferBatches():
+                batch.execute()
+
+    def __fuseTaskChains(self, rootJobs, dispatchData):
+        """ Fuses jobs into their parent job when they form a linear chain with the same
+        tasks and Deadline settings, so that each task executes the nodes of both jobs.
+        This saves the dependency release and the Gaffer startup of the second job.
+        """
+        if not self["fuseTaskChains"].getValue():
+            return rootJobs
+
+        fused = True
+        while fused:
+            fused = False
+            for deadlineJob in self.__plannedJobs(dispatchData):
+                if deadlineJob not in dispatchData["deadlineJobs"]:
+                    continue
+
+                parentJob = self.__fusableParentJob(deadlineJob, dispatchData)
+                if parentJob is None:
+                    continue
+
+                IECore.msg(
+                    IECore.Msg.Level.Debug,
+                    "DeadlineDispatcher",
+                    "Fusing {} into {}".format(
+                        parentJob.getGafferNode().getName(),
+                        deadlineJob.getGafferNode().getName()
+                    )
+                )
+
+                deadlineJob.fuseParentJob(parentJob)
+                dispatchData["deadlineJobs"].remove(parentJob)
+                if parentJob in rootJobs:
+                    rootJobs.remove(parentJob)
+                    if deadlineJob not in rootJobs:
+                        rootJobs.append(deadlineJob)
+                fused = True
+
+        return rootJobs
+
+    def __fusableParentJob(self, deadlineJob, dispatchData):
+        # Returns the parent job `deadlineJob` can be fused with, or None.
+        parentJobs = deadlineJob.getParentJobs()
+        if len(parentJobs) != 1:
+            return None
+        parentJob = parentJobs[0]
+
+        for j in [deadlineJob, parentJob]:
+            gafferNode = j.getGafferNode()
+            if (
+                gafferNode is None or
+                GafferDeadline.GafferDeadlineJob.isControlTask(gafferNode) or
+                isinstance(gafferNode, GafferDeadline.DeadlineTask) or
+                gafferNode["dispatcher"].getChild("deadline") is None or
+                j.getUseContextTable()
+            ):
+                return None
+
+        if any(
+            parentJob in j.getParentJobs()
+            for j in dispatchData["deadlineJobs"] if j is not deadlineJob
+        ):
             return None
 
-        # this job is already submitted if it has an ID
-        if deadlineJob.getJobID() is not None:
-            return deadlineJob.getJobID()
+        if deadlineJob.getContext() != parentJob.getContext():
+            return None
 
-        self.preSpoolSignal()(self, deadlineJob)
+        tasks = deadlineJob.getTasks()
+        parentTasks = parentJob.getTasks()
+        if len(tasks) != len(parentTasks):
+            return None
+        for task, parentTask in zip(tasks, parentTasks):
+            if (
+                task.getStartFrame() != parentTask.getStartFrame() or
+                task.getEndFrame() != parentTask.getEndFrame()
+            ):
+                return None
+            preTasks = task.getGafferBatch().preTasks()
+            if len(preTasks) != 1 or preTasks[0] != parentTask.getGafferBatch():
+                return None
+
+        with Gaffer.Context(deadlineJob.getContext()):
+            settingsHashes = [
+                [
+                    p.hash() for p in
+                    GafferDeadline.DeadlineSettings.taskSettings(j.getGafferNode()).plugs()
+                ]
+                for j in [deadlineJob, parentJob]
+            ]
+        if settingsHashes[0] != settingsHashes[1]:
+            return None
+
+        return parentJob
+
+    def __autoChunkTasks(self, dispatchData):
+        """ Merges the tasks of jobs using `autoChunk` into chunks sized for the number
+        of Workers available to the job, balancing the startup time of each task against
+        rendering frames in parallel. Jobs whose Workers can't be queried keep their
+        tasks, without affecting jobs in other pools and groups.
+        """
+        failedQueries = set()
+        for deadlineJob in self.__plannedJobs(dispatchData):
+            deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(
+                deadlineJob.getGafferNode()
+            )
+            if deadlinePlug is None or deadlineJob.getUseContextTable():
+                continue
+
+            with Gaffer.Context(deadlineJob.getContext()):
+                if not deadlinePlug["autoChunk"].getValue():
+                    continue
+                pool = deadlinePlug["pool"].getValue()
+                group = deadlinePlug["group"].getValue()
+                machineLimit = deadlinePlug["machineLimit"].getValue()
+                concurrentTasks = deadlinePlug["concurrentTasks"].getValue()
+                frameTime = deadlinePlug["frameTime"].getValue()
+
+            tasks = deadlineJob.getTasks()
+            if any(t.getStartFrame() is None for t in tasks) or (pool, group) in failedQueries:
+                continue
+
+            try:
+                workerCount = GafferDeadline.DeadlineTools.getWorkerCount(pool, group)
+            except RuntimeError as e:
+                IECore.msg(
+                    IECore.Msg.Level.Warning,
+                    "DeadlineDispatcher",
+                    "Unable to query Workers for automatic chunking : {}".format(e)
+                )
+                failedQueries.add((pool, group))
+                continue
 
-        deadlinePlug = gafferNode["dispatcher"].getChild("deadline")
+            if machineLimit > 0:
+                workerCount = min(workerCount, machineLimit)
 
-        if deadlinePlug is not None:
-            initialStatus = (
-                "Suspended" if deadlinePlug["submitSuspended"].getValue() else "Active"
+            chunkSize = GafferDeadline.DeadlineAlgo.autoChunkSize(
+                sum(t.getEndFrame() - t.getStartFrame() + 1 for t in tasks),
+                workerCount * concurrentTasks,
+                self["taskStartupTime"].getValue(),
+                frameTime
             )
-            machineListType = (
-                "Blacklist" if deadlinePlug["isBlackList"].getValue() else "Whitelist"
+
+            IECore.msg(
+                IECore.Msg.Level.Debug,
+                "DeadlineDispatcher",
+                "Chunking {} into tasks of {} frames for {} Workers".format(
+                    deadlineJob.getGafferNode().getName(),
+                    chunkSize,
+                    workerCount
+                )
             )
 
-            # to prevent Deadline from splitting up our tasks (since we've already done that based
-            # on batches), set the chunk size to the largest frame range
-            chunkSize = (
-                deadlineJob.getTasks()[0].getEndFrame() -
-                deadlineJob.getTasks()[0].getStartFrame() + 1
+            deadlineJob.chunkTasks(chunkSize)
+
+    def __splitFrameDependentJobs(self, rootJobs, dispatchData):
+        """ Splits jobs that can't be released by a single set of Deadline frame
+        dependency offsets into jobs that can, as long as that doesn't need more jobs
+        than the `frameDependencySplitLimit` plug allows. The alternative is the much
+        slower dependency script.
+        """
+        splitLimit = self["frameDependencySplitLimit"].getValue()
+        if splitLimit < 2:
+            return rootJobs
+
+        for deadlineJob in list(dispatchData["deadlineJobs"]):
+            gafferNode = deadlineJob.getGafferNode()
+            if gafferNode is None or GafferDeadline.GafferDeadlineJob.isControlTask(gafferNode):
+                continue
+
+            deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(gafferNode)
+            if deadlinePlug is None:
+                continue
+
+            with Gaffer.Context(deadlineJob.getContext()):
+                if deadlinePlug["dependencyMode"].getValue() != "Auto":
+                    continue
+
+            frameDependencyGroups = deadlineJob.getFrameDependencyGroups()
+            if frameDependencyGroups is None or not (
+                1 < len(frameDependencyGroups) <= splitLimit
+            ):
+                continue
+
+            IECore.msg(
+                IECore.Msg.Level.Debug,
+                "DeadlineDispatcher",
+                "Splitting {} into {} jobs to use frame dependencies".format(
+                    gafferNode.getName(),
+                    len(frameDependencyGroups)
+                )
             )
-            frameString = ""
-            for t in deadlineJob.getTasks():
-                chunkSize = max(t.getEndFrame() - t.getStartFrame() + 1, chunkSize)
-                if t.getStartFrame() == t.getEndFrame():
-                    frameString += ",{}".format(t.getStartFrame())
-                else:
-                    frameString += ",{}-{}".format(t.getStartFrame(), t.getEndFrame())
 
-            with Gaffer.Context(deadlineJob.getContext()) as c:
-                jobInfo = {
-                    "Name": (
-                        "{}{}{}".format(
-                            dispatchData["dispatchJobName"],
-                            "." if dispatchData["dispatchJobName"] else "",
-                            gafferNode.relativeName(dispatchData["scriptNode"]),
-                        )
-                    ),
-                    "Frames": frameString,
-                    "ChunkSize": chunkSize,
-                    "Plugin": "Gaffer" if not isinstance(
-                        gafferNode,
-                        GafferDeadline.DeadlineTask
-                    ) else gafferNode["plugin"].getValue(),
-                    "BatchName": deadlinePlug["batchName"].getValue(),
-                    "Comment": deadlinePlug["comment"].getValue(),
-                    "Department": deadlinePlug["department"].getValue(),
-                    "Pool": deadlinePlug["pool"].getValue(),
-                    "SecondaryPool": deadlinePlug["secondaryPool"].getValue(),
-                    "Group": deadlinePlug["group"].getValue(),
-                    "Priority": deadlinePlug["priority"].getValue(),
-                    "TaskTimeoutMinutes": int(deadlinePlug["taskTimeout"].getValue()),
-                    "EnableAutoTimeout": deadlinePlug["enableAutoTimeout"].getValue(),
-                    "ConcurrentTasks": deadlinePlug["concurrentTasks"].getValue(),
-                    "MachineLimit": deadlinePlug["machineLimit"].getValue(),
-                    machineListType: deadlinePlug["machineList"].getValue(),
-                    "LimitGroups": deadlinePlug["limits"].getValue(),
-                    "OnJobComplete": deadlinePlug["onJobComplete"].getValue(),
-                    "InitialStatus": initialStatus,
-                }
+            newJobs = deadlineJob.splitTasks([g[2] for g in frameDependencyGroups])
+            for j in dispatchData["deadlineJobs"]:
+                if deadlineJob in j.getParentJobs():
+                    for newJob in newJobs:
+                        j.addParentJob(newJob)
+            for newJob in newJobs:
+                self.__addGafferDeadlineJob(newJob, dispatchData)
+            if deadlineJob in rootJobs:
+                rootJobs += newJobs
+
+        return rootJobs
+
+    def __insertSceneCaches(self, dispatchData):
+        """ Finds jobs for nodes with `sceneCache` enabled whose input scenes come from the
+        same upstream plug. When more than one task needs the same frame of that scene, a
+        job is added to write the scene to a cache once per frame. The downstream jobs read
+        the cache in place of the upstream scene, and their tasks wait for the cache tasks
+        with the same frames. The cache is computed in the context of the first downstream
+        job, so the upstream scene must not depend on context variables that differ between
+        the downstream jobs.
+        """
+        groups = {}
+        for deadlineJob in self.__plannedJobs(dispatchData):
+            gafferNode = deadlineJob.getGafferNode()
+            deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(gafferNode)
+            if deadlinePlug is None or isinstance(gafferNode, GafferDeadline.DeadlineTask):
+                continue
+
+            with Gaffer.Context(deadlineJob.getContext()):
+                if not deadlinePlug["sceneCache"].getValue():
+                    continue
+
+            scenePlug = gafferNode.getChild("in")
+            if not isinstance(scenePlug, GafferScene.ScenePlug) or scenePlug.getInput() is None:
+                continue
+
+            source = scenePlug.source()
+            groups.setdefault(source.fullName(), (source, []))[1].append(deadlineJob)
+
+        cacheDirectory = self["sceneCacheDirectory"].getValue() or os.path.join(
+            dispatchData["jobDirectory"],
+            "sceneCaches"
+        )
 
-                auxFiles = deadlineJob.getAuxFiles()   # this will already have substitutions included
-                auxFiles += [f for f in deadlinePlug["auxFiles"].getValue()]
-                deadlineJob.setAuxFiles(auxFiles)
+        cacheIndex = 0
+        for source, deadlineJobs in [groups[k] for k in sorted(groups.keys())]:
+            frameTaskCounts = {}
+            for deadlineJob in deadlineJobs:
+                for task in deadlineJob.getTasks():
+                    if task.getStartFrame() is None:
+                        continue
+                    for frame in range(task.getStartFrame(), task.getEndFrame() + 1):
+                        frameTaskCounts[frame] = frameTaskCounts.get(frame, 0) + 1
 
-                for output in deadlinePlug["outputs"].getValue():
-                    deadlineJob.addOutput(output, c)
-
-                environmentVariables = IECore.CompoundData()
-
-                deadlinePlug["environmentVariables"].fillCompoundData(environmentVariables)
-                extraEnvironmentVariables = deadlinePlug["extraEnvironmentVariables"].getValue()
-                for name, value in extraEnvironmentVariables.items():
-                    environmentVariables[name] = value
-                for name, value in environmentVariables.items():
-                    deadlineJob.appendEnvironmentVariable(name, str(value))
-
-                deadlineSettings = IECore.CompoundData()
-                deadlinePlug["deadlineSettings"].fillCompoundData(deadlineSettings)
-                extraDeadlineSettings = deadlinePlug["extraDeadlineSettings"].getValue()
-                for name, value in extraDeadlineSettings.items():
-                    deadlineSettings[name] = value
-                for name, value in deadlineSettings.items():
-                    deadlineJob.appendDeadlineSetting(name, str(value))
-
-            """ Dependencies are stored with a reference to the Deadline job since job IDs weren't
-            assigned when the task tree was walked. Now that parent jobs have been submitted and
-            have IDs, we can substitute that in for the dependency script to pick up.
-
-            We also want to dependencies to be as native to Deadline as possible, resorting to the
-            dependency script only in cases where it is needed (Deadline's dependency script
-            triggering seems to be slower than native task dependencies)
-
-            There are three possible dependency types allowed by Deadline:
-            1) Job-Job:     All of the tasks for job A wait for all of the tasks for job B to
-                            finish before job A runs. This is relatively rare when coming from
-                            Deadline and mostly is used by nodes upstream from a FrameMask node.
-                            In that case releasing tasks per-frame would trigger downstream jobs
-                            sooner than they should.
-            2) Frame-Frame: This is somewhat misleadingly named because Deadline only checks for
-                            frame dependency release after each task completes, so this is very
-                            similar to task-task dependencies. Deadline can only handle a start
-                            and end frame offset when comparing to the parent job so the task
-                            offsets must match across all parent jobs to enable this mode.
-            3) Task-Task:   A task for job A waits for a task for job B to finish before the task
-                            for job A runs. If the dependency start and end frame offsets don't
-                            match, this has to be handled by a dependency script.
-            """
-            dependencies = deadlineJob.getDependencies().values()
-
-            if len(dependencies) > 0 and deadlinePlug["dependencyMode"].getValue() != "None":
-                jobDependent = False
-                frameDependent = False
-                simpleFrameOffset = True
-                if deadlinePlug["dependencyMode"].getValue() == "Job":
-                    jobDependent = True
-                elif deadlinePlug["dependencyMode"].getValue() == "Frame":
-                    frameDependent = True
-                elif deadlinePlug["dependencyMode"].getValue() == "Auto":
-                    jobDependent = False
-                    dependencyJobs = [i.getDeadlineJob() for i in dependencies]
-                    dependencyJobs = list(set(dependencyJobs))
-
-                    frameDependent = True
-                    simpleFrameOffset = True
-                    if (len(dependencies) > 0):
-                        deadlineJob._frameDependencyOffsetStart = (
-                            list(dependencies)[0].getUpstreamDeadlineTask().getStartFrame() -
-                            list(dependencies)[0].getDeadlineTask().getStartFrame()
-                        )
-                        deadlineJob._frameDependencyOffsetEnd = (
-                            list(dependencies)[0].getUpstreamDeadlineTask().getEndFrame() -
-                            list(dependencies)[0].getDeadlineTask().getEndFrame()
-                        )
+            if len(frameTaskCounts) == 0 or max(frameTaskCounts.values()) < 2:
+                continue
+
+            if "sceneCacheScript" not in dispatchData:
+                dispatchData["sceneCacheScript"] = Gaffer.ScriptNode()
+            cacheScript = dispatchData["sceneCacheScript"]
+
+            cacheName = "__deadlineSceneCache{}".format(cacheIndex)
+            readerName = "__deadlineSceneCacheReader{}".format(cacheIndex)
+            cacheIndex += 1
+            cacheFile = os.path.join(cacheDirectory, "{}.####.scc".format(cacheName))
+
+            IECore.msg(
+                IECore.Msg.Level.Debug,
+                "DeadlineDispatcher",
+                "Caching {} for {} jobs to {}".format(
+                    source.relativeName(dispatchData["scriptNode"]),
+                    len(deadlineJobs),
+                    cacheFile
+                )
+            )
+
+            cacheScript[cacheName] = GafferScene.SceneWriter()
+            cacheNode = cacheScript[cacheName]
+            self.__copyGeneratedJobSettings(deadlineJobs[0], cacheNode, [cacheFile])
+
+            cacheJob = GafferDeadline.GafferDeadlineJob(cacheNode)
+            cacheJob.setContext(deadlineJobs[0].getContext())
+            cacheJob.setAuxFiles([dispatchData["scriptFile"]])
+            for frame in sorted(frameTaskCounts.keys()):
+                cacheJob.addBatch(None, [frame])
+            self.__addGafferDeadlineJob(cacheJob, dispatchData)
+
+            dispatchData["scriptSuffixes"][id(cacheJob)] = "\n".join(
+                [
+                    "",
+                    "import GafferScene",
+                    "parent.addChild( GafferScene.SceneWriter( {!r} ) )".format(cacheName),
+                    "parent[{!r}][\"in\"].setInput( parent.descendant( {!r} ) )".format(
+                        cacheName,
+                        source.relativeName(dispatchData["scriptNode"])
+                    ),
+                    "parent[{!r}][\"fileName\"].setValue( {!r} )".format(cacheName, cacheFile),
+                    "",
+                ]
+            )
 
-                        for d in dependencies:
-                            newFrameOffsetStart = (
-                                d.getUpstreamDeadlineTask().getStartFrame() -
-                                d.getDeadlineTask().getStartFrame()
-                            )
-                            newFrameOffsetEnd = (
-                                d.getUpstreamDeadlineTask().getEndFrame() -
-                                d.getDeadlineTask().getEndFrame()
-                            )
-
-                            if (
-                                newFrameOffsetStart != deadlineJob._frameDependencyOffsetStart or
-                                newFrameOffsetEnd != deadlineJob._frameDependencyOffsetEnd
-                            ):
-                                simpleFrameOffset = False
-
-                        # If we can't just shift the frame start and end, we might still be able to
-                        # use frame dependency with tasks of different frame lengths
-                        if not simpleFrameOffset:
-                            for j in dependencyJobs:
-                                dependencyTasks = [
-                                    t.getUpstreamDeadlineTask() for t in dependencies if (
-                                        t.getDeadlineJob() == j
-                                    )
-                                ]
-                                dependencyFrames = []
-                                for t in dependencyTasks:
-                                    dependencyFrames += range(
-                                        t.getStartFrame(),
-                                        t.getEndFrame() + 1
-                                    )
-                                currentFrames = []
-                                for t in deadlineJob.getTasks():
-                                    currentFrames += range(
-                                        t.getStartFrame(),
-                                        t.getEndFrame() + 1
-                                    )
-                                for f in currentFrames:
-                                    if f not in dependencyFrames:
-                                        frameDependent = False
-
-                    else:
-                        frameDependent = False
-
-                if jobDependent or frameDependent:
-                    jobInfo.update(
-                        {
-                            "JobDependencies": ",".join(
-                                list(set([
-                                    d.getDeadlineJob().getJobID() for d in dependencies
-                                ]))
+            for deadlineJob in deadlineJobs:
+                # The cache must wait for anything the downstream jobs wait for, in case
+                # the upstream scene reads files written by those jobs. Jobs that are
+                # themselves downstream of the cache are skipped to avoid a cycle.
+                for parentJob in deadlineJob.getEffectiveParentJobs():
+                    if not self.__isDownstreamOf(parentJob, deadlineJobs):
+                        cacheJob.addFrameParentJob(parentJob)
+                deadlineJob.addFrameParentJob(cacheJob)
+
+                # The cache reader goes before any additions made when tiling, so that
+                # a tile crop window is still applied to the cached scene.
+                dispatchData["scriptSuffixes"][id(deadlineJob)] = (
+                    "\n".join(
+                        [
+                            "",
+                            "import GafferScene",
+                            "if {!r} not in parent :".format(readerName),
+                            "\tparent.addChild( GafferScene.SceneReader( {!r} ) )".format(
+                                readerName
+                            ),
+                            "\tparent[{!r}][\"fileName\"].setValue( {!r} )".format(
+                                readerName,
+                                cacheFile
                             ),
-                            "ResumeOnDeletedDependencies": True,
-                        }
+                            "parent.descendant( {!r} )[\"in\"].setInput( {} )".format(
+                                self.__nodeName(deadlineJob.getGafferNode()),
+                                "parent[{!r}][\"out\"]".format(readerName)
+                            ),
+                            "",
+                        ]
+                    ) + dispatchData["scriptSuffixes"].get(id(deadlineJob), "")
+                )
+
+    def __tileJobs(self, dispatchData):
+        """ Splits each task of jobs whose node has more than one tile into a task per
+        tile. Each tile task renders with the `deadline:tile` context variable set to
+        its tile index and `deadline:tileCropWindow` set to its crop window. When the
+        node names the files written for each tile and the assembled image, a job is
+        added to merge the tiles of each frame once they have all been rendered, and
+        jobs downstream of the tiled job wait for it.
+
+        The crop window is applied to the scene rendered by `GafferScene.Render` nodes
+        automatically. Other nodes must read `deadline:tileCropWindow` themselves, or
+        every tile would render the whole image, so they fail the dispatch if they don't.
+        """
+        assemblyIndex = 0
+        cropIndex = 0
+        for deadlineJob in self.__plannedJobs(dispatchData):
+            gafferNode = deadlineJob.getGafferNode()
+            deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(gafferNode)
+            if deadlinePlug is None or isinstance(gafferNode, GafferDeadline.DeadlineTask):
+                continue
+
+            with Gaffer.Context(deadlineJob.getContext()):
+                tiles = deadlinePlug["tiles"].getValue()
+                tileFileName = deadlinePlug["tileFileName"].getValue()
+                tileAssemblyFileName = deadlinePlug["tileAssemblyFileName"].getValue()
+
+            tileCount = tiles.x * tiles.y
+            tasks = deadlineJob.getTasks()
+            if tileCount < 2 or any(t.getStartFrame() is None for t in tasks):
+                continue
+
+            if isinstance(gafferNode, GafferScene.Render):
+                self.__addTileCrop(
+                    deadlineJob,
+                    "__deadlineTileCrop{}".format(cropIndex),
+                    dispatchData
+                )
+                cropIndex += 1
+            elif not self.__readsTileCropWindow(gafferNode, dispatchData):
+                raise RuntimeError(
+                    "{} is rendered in tiles, but doesn't read the `deadline:tileCropWindow` "
+                    "context variable to crop its render to each tile.".format(
+                        gafferNode.relativeName(dispatchData["scriptNode"])
                     )
-                    if simpleFrameOffset:
-                        jobInfo.update(
-                            {
-                                "FrameDependencyOffsetStart": (
-                                    deadlineJob._frameDependencyOffsetStart
-                                ),
-                                "FrameDependencyOffsetEnd": deadlineJob._frameDependencyOffsetEnd,
-                            }
-                        )
-                    if frameDependent:
-                        jobInfo.update({"IsFrameDependent": True})
-                        deadlineJob.setDependencyType(
-                            GafferDeadline.GafferDeadlineJob.DeadlineDependencyType.FrameToFrame
-                        )
-                    else:
-                        deadlineJob.setDependencyType(
-                            GafferDeadline.GafferDeadlineJob.DeadlineDependencyType.JobToJob
+                )
+
+            deadlineJob.tileTasks(tileCount)
+            dispatchData["tileCropWindows"][id(deadlineJob)] = [
+                imath.Box2f(imath.V2f(*minimum), imath.V2f(*maximum))
+                for minimum, maximum in GafferDeadline.DeadlineAlgo.tileCropWindows(
+                    tiles.x,
+                    tiles.y
+                )
+            ]
+
+            if not tileFileName or not tileAssemblyFileName:
+                IECore.msg(
+                    IECore.Msg.Level.Warning,
+                    "DeadlineDispatcher",
+                    "{} is rendered in tiles, but no tile assembly job was added because "
+                    "its tile file name or tile assembly file name is not set.".format(
+                        gafferNode.relativeName(dispatchData["scriptNode"])
+                    )
+                )
+                continue
+
+            if "tileAssemblyScript" not in dispatchData:
+                dispatchData["tileAssemblyScript"] = Gaffer.ScriptNode()
+            assemblyScript = dispatchData["tileAssemblyScript"]
+
+            assemblyName = "__deadlineTileAssembly{}".format(assemblyIndex)
+            readerName = "__deadlineTileReader{}".format(assemblyIndex)
+            mergeName = "__deadlineTileMerge{}".format(assemblyIndex)
+            tilePrefix = "__deadlineTile{}_".format(assemblyIndex)
+            assemblyIndex += 1
+
+            assemblyScript[assemblyName] = GafferImage.ImageWriter()
+            assemblyNode = assemblyScript[assemblyName]
+            self.__copyGeneratedJobSettings(deadlineJob, assemblyNode, [])
+
+            assemblyJob = GafferDeadline.GafferDeadlineJob(assemblyNode)
+            assemblyJob.setContext(deadlineJob.getContext())
+            assemblyJob.setAuxFiles([dispatchData["scriptFile"]])
+            for frame in sorted(
+                set(f for t in tasks for f in range(t.getStartFrame(), t.getEndFrame() + 1))
+            ):
+                assemblyJob.addBatch(None, [frame])
+            self.__addGafferDeadlineJob(assemblyJob, dispatchData)
+
+            # Jobs downstream of the tiled job need the assembled image.
+            for j in self.__plannedJobs(dispatchData):
+                if deadlineJob in j.getEffectiveParentJobs():
+                    j.addFrameParentJob(assemblyJob)
+            assemblyJob.addFrameParentJob(deadlineJob)
+
+            # The file names are connected rather than copied, so that they are
+            # evaluated for each frame and tile as the assembly job runs. They are
+            # connected to the plugs holding them, which may belong to a profile.
+            tileFileNamePath, tileAssemblyFileNamePath = [
+                "parent.descendant( {!r} )".format(
+                    deadlinePlug[name].relativeName(dispatchData["scriptNode"])
+                )
+                for name in ["tileFileName", "tileAssemblyFileName"]
+            ]
+            dispatchData["scriptSuffixes"][id(assemblyJob)] = "\n".join(
+                [
+                    "",
+                    "import IECore",
+                    "import Gaffer",
+                    "import GafferImage",
+                    "parent.addChild( GafferImage.ImageReader( {!r} ) )".format(readerName),
+                    "parent[{!r}][\"fileName\"].setInput( {} )".format(
+                        readerName,
+                        tileFileNamePath
+                    ),
+                    "parent.addChild( GafferImage.Merge( {!r} ) )".format(mergeName),
+                    "for tile in range( {} ) :".format(tileCount),
+                    "\ttileVariables = Gaffer.ContextVariables( {!r} + str( tile ) )".format(
+                        tilePrefix
+                    ),
+                    "\tparent.addChild( tileVariables )",
+                    "\ttileVariables.setup( GafferImage.ImagePlug() )",
+                    "\ttileVariables[\"variables\"].addChild(",
+                    "\t\tGaffer.NameValuePlug( \"deadline:tile\", IECore.IntData( tile ) )",
+                    "\t)",
+                    "\ttileVariables[\"in\"].setInput( parent[{!r}][\"out\"] )".format(
+                        readerName
+                    ),
+                    "\tparent[{!r}][\"in\"][tile].setInput( tileVariables[\"out\"] )".format(
+                        mergeName
+                    ),
+                    "parent.addChild( GafferImage.ImageWriter( {!r} ) )".format(assemblyName),
+                    "parent[{!r}][\"in\"].setInput( parent[{!r}][\"out\"] )".format(
+                        assemblyName,
+                        mergeName
+                    ),
+                    "parent[{!r}][\"fileName\"].setInput( {} )".format(
+                        assemblyName,
+                        tileAssemblyFileNamePath
+                    ),
+                    "",
+                ]
+            )
+
+    def __addTileCrop(self, deadlineJob, cropName, dispatchData):
+        # Inserts a `StandardOptions` node setting the crop window of each tile
+        # from the context, in front of the scene rendered by the job's node.
+        nodeName = self.__nodeName(deadlineJob.getGafferNode())
+        cropWindowPlug = "parent[{!r}][\"options\"][\"renderCropWindow\"]".format(cropName)
+        dispatchData["scriptSuffixes"][id(deadlineJob)] = (
+            dispatchData["scriptSuffixes"].get(id(deadlineJob), "") + "\n".join(
+                [
+                    "",
+                    "import Gaffer",
+                    "import GafferScene",
+                    "parent.addChild( GafferScene.StandardOptions( {!r} ) )".format(cropName),
+                    "{}[\"enabled\"].setValue( True )".format(cropWindowPlug),
+                    "parent[{!r}][\"in\"].setInput( {} )".format(
+                        cropName,
+                        "parent.descendant( {!r} )[\"in\"].getInput()".format(nodeName)
+                    ),
+                    "parent.descendant( {!r} )[\"in\"].setInput( parent[{!r}][\"out\"] )".format(
+                        nodeName,
+                        cropName
+                    ),
+                    "parent.addChild( Gaffer.Expression( {!r} ) )".format(cropName + "Expression"),
+                    "parent[{!r}].setExpression( {!r}, \"python\" )".format(
+                        cropName + "Expression",
+                        "{}[\"value\"] = context[\"deadline:tileCropWindow\"]".format(
+                            cropWindowPlug
                         )
+                    ),
+                    "",
+                ]
+            )
+        )
+
+    def __readsTileCropWindow(self, node, dispatchData):
+        # Returns True if `node` or a node it takes values from refers to the
+        # `deadline:tileCropWindow` context variable.
+        scriptNode = dispatchData["scriptNode"]
+        serialisationFilter = Gaffer.StandardSet(
+            list(scriptNode.children(Gaffer.Plug)) + self.__upstreamNodes(node, scriptNode)
+        )
+        return "deadline:tileCropWindow" in scriptNode.serialise(scriptNode, serialisationFilter)
+
+    @staticmethod
+    def __isDownstreamOf(deadlineJob, upstreamJobs):
+        # Returns True if `deadlineJob` is one of `upstreamJobs` or depends on one of them.
+        toVisit = [deadlineJob]
+        visited = []
+        while len(toVisit) > 0:
+            j = toVisit.pop()
+            if any(j is u for u in upstreamJobs):
+                return True
+            if j in visited:
+                continue
+            visited.append(j)
+            toVisit += j.getParentJobs()
+
+        return False
+
+    @staticmethod
+    def __copyGeneratedJobSettings(deadlineJob, generatedNode, outputs):
+        # Jobs generated by the dispatcher, such as scene caches and tile assemblies,
+        # take their Deadline settings from a job they serve, apart from those specific
+        # to that job's node.
+        deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(deadlineJob.getGafferNode())
+        generatedDeadlinePlug = generatedNode["dispatcher"]["deadline"]
+        with Gaffer.Context(deadlineJob.getContext()):
+            for name in [
+                "batchName",
+                "comment",
+                "department",
+                "pool",
+                "secondaryPool",
+                "group",
+                "priority",
+                "machineList",
+                "isBlackList",
+                "limits",
+                "submitSuspended",
+                "threads",
+                "logLevel",
+            ]:
+                generatedDeadlinePlug[name].setValue(deadlinePlug[name].getValue())
+
+            environmentVariables = IECore.CompoundData()
+            deadlinePlug["environmentVariables"].fillCompoundData(environmentVariables)
+            environmentVariables.update(deadlinePlug["extraEnvironmentVariables"].getValue())
+            generatedDeadlinePlug["extraEnvironmentVariables"].setValue(environmentVariables)
+
+        generatedDeadlinePlug["outputs"].setValue(IECore.StringVectorData(outputs))
+
+    def __buildDispatchGraph(self, deadlineJobs):
+        """ Describes `deadlineJobs` as a `DispatchGraph`, evaluating the settings
+        used for planning in the context of each job.
+        """
+        dispatchGraph = GafferDeadline.DispatchGraph()
+        jobIndices = {id(j): i for i, j in enumerate(deadlineJobs)}
+
+        for deadlineJob in deadlineJobs:
+            dependencyMode = "Auto"
+            costHint = 1.0
+            deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(
+                deadlineJob.getGafferNode()
+            )
+            if deadlinePlug is not None:
+                with Gaffer.Context(deadlineJob.getContext()):
+                    dependencyMode = deadlinePlug["dependencyMode"].getValue()
+                    costHint = deadlinePlug["costHint"].getValue()
+
+            dispatchGraph.addJob(
+                self.__nodeName(deadlineJob.getGafferNode()),
+                [(t.getStartFrame(), t.getEndFrame()) for t in deadlineJob.getTasks()],
+                dependencyMode=dependencyMode,
+                useContextTable=deadlineJob.getUseContextTable(),
+                costHint=costHint
+            )
+
+        taskIndices = {id(t): i for j in deadlineJobs for i, t in enumerate(j.getTasks())}
+
+        for jobIndex, deadlineJob in enumerate(deadlineJobs):
+            startTime = time.perf_counter()
+            for d in deadlineJob.getDependencies().values():
+                upstreamJobIndex = jobIndices.get(id(d.getDeadlineJob()))
+                if upstreamJobIndex is None:
+                    continue
+                dispatchGraph.addDependency(
+                    jobIndex,
+                    taskIndices[id(d.getDeadlineTask())],
+                    upstreamJobIndex,
+                    taskIndices[id(d.getUpstreamDeadlineTask())]
+                )
+            deadlineJob.addPlanningTime(time.perf_counter() - startTime)
+
+        return dispatchGraph
+
+    @staticmethod
+    def __planDependencies(dispatchGraph, deadlineJobs):
+        """ Chooses the Deadline dependency type of each job using
+        `DeadlineAlgo.planDependencyType()`, and stores it on the job for use at
+        submission.
+        """
+        dependencyTypes = GafferDeadline.GafferDeadlineJob.DeadlineDependencyType
+
+        for jobIndex, deadlineJob in enumerate(deadlineJobs):
+            startTime = time.perf_counter()
+
+            dependencyType, offsetStart, offsetEnd = (
+                GafferDeadline.DeadlineAlgo.planDependencyType(dispatchGraph, jobIndex)
+            )
+            dispatchGraph.setDependencyType(jobIndex, dependencyType)
+
+            deadlineJob.setDependencyType(
+                getattr(dependencyTypes, "_None" if dependencyType == "None" else dependencyType)
+            )
+            if offsetStart is not None:
+                deadlineJob._frameDependencyOffsetStart = offsetStart
+                deadlineJob._frameDependencyOffsetEnd = offsetEnd
+
+            deadlineJob.addPlanningTime(time.perf_counter() - startTime)
+
+    @staticmethod
+    def __orderTasks(deadlineJob):
+        # Returns the order the tasks were put in, or None if they were left in frame order.
+        deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(deadlineJob.getGafferNode())
+        if deadlinePlug is None:
+            return None
+
+        with Gaffer.Context(deadlineJob.getContext()):
+            frameOrder = deadlinePlug["frameOrder"].getValue()
+
+        tasks = deadlineJob.getTasks()
+        if frameOrder == "Ascending" or any(t.getStartFrame() is None for t in tasks):
+            return None
+
+        taskOrder = GafferDeadline.DeadlineAlgo.taskOrder(
+            [(t.getStartFrame(), t.getEndFrame()) for t in tasks],
+            frameOrder
+        )
+        deadlineJob.reorderTasks(taskOrder)
+
+        return taskOrder
+
+    @staticmethod
+    def __plannedJobs(dispatchData):
+        # The jobs that will be submitted to Deadline, in creation order.
+        return [
+            j for j in dispatchData["deadlineJobs"]
+            if j.getGafferNode() is not None and
+            not GafferDeadline.GafferDeadlineJob.isControlTask(j.getGafferNode())
+        ]
+
+    def __setCriticalPathPriorityOffsets(self, dispatchGraph):
+        """ Estimates the cost of each job as its frame count multiplied by the
+        `costHint` of its node and sets the priority offsets of the jobs in
+        `dispatchGraph`, boosting jobs on or near the critical path of the job graph.
+        """
+        costs = []
+        parents = []
+        for jobIndex, job in enumerate(dispatchGraph.getJobs()):
+            frameCount = 0
+            for startFrame, endFrame in job["tasks"]:
+                if startFrame is None or endFrame is None:
+                    frameCount += 1
                 else:
-                    jobInfo.update(
-                        {
-                            "ScriptDependencies": os.environ["DEADLINE_DEPENDENCY_SCRIPT_PATH"],
-                            "IsFrameDependent": True,
-                        }
+                    frameCount += endFrame - startFrame + 1
+
+            costs.append(frameCount * job["costHint"])
+            parents.append(dispatchGraph.getParentJobs(jobIndex))
+
+        offsets = GafferDeadline.DeadlineAlgo.criticalPathPriorityOffsets(
+            costs,
+            parents,
+            self["criticalPathPriorityBand"].getValue()
+        )
+
+        for jobIndex, offset in enumerate(offsets):
+            dispatchGraph.setPriorityOffset(jobIndex, offset)
+
+    def __preflightChecks(self, dispatchData):
+        """ Checks the files and settings needed by all jobs before any are submitted,
+        rather than failing part way through submission. Plugs are evaluated up front
+        and the file system checks, which may be slow on network storage, are run
+        concurrently with each path checked only once. Problems that will stop the
+        jobs running raise an exception listing all of them, while those which may
+        only affect submission from this machine are reported as warnings.
+        """
+        auxFiles = set()
+        outputDirectories = set()
+        needsDependencyScript = False
+        needsGafferPlugin = False
+        for deadlineJob in self.__plannedJobs(dispatchData):
+            deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(
+                deadlineJob.getGafferNode()
+            )
+            if deadlinePlug is None:
+                continue
+
+            if deadlineJob.getDependencyType() == (
+                GafferDeadline.GafferDeadlineJob.DeadlineDependencyType.Scripted
+            ):
+                needsDependencyScript = True
+            if not isinstance(deadlineJob.getGafferNode(), GafferDeadline.DeadlineTask):
+                needsGafferPlugin = True
+
+            auxFiles.update(deadlineJob.getAuxFiles())
+            with Gaffer.Context(deadlineJob.getContext()) as c:
+                auxFiles.update(deadlinePlug["auxFiles"].getValue())
+                for output in deadlinePlug["outputs"].getValue():
+                    outputDirectories.add(os.path.dirname(c.substitute(output)))
+
+        errors = []
+        warnings = []
+
+        dependencyScript = os.environ.get("DEADLINE_DEPENDENCY_SCRIPT_PATH")
+        if needsDependencyScript and dependencyScript is None:
+            errors.append("DEADLINE_DEPENDENCY_SCRIPT_PATH must be set to use dependency scripts")
+
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            auxFileResults = {f: executor.submit(os.path.isfile, f) for f in sorted(auxFiles)}
+            outputResults = {
+                d: executor.submit(self.__isWritableDirectory, d)
+                for d in sorted(outputDirectories) if d
+            }
+            dependencyScriptResult = None
+            if needsDependencyScript and dependencyScript is not None:
+                dependencyScriptResult = executor.submit(os.path.isfile, dependencyScript)
+            versionsResult = None
+            if needsGafferPlugin:
+                versionsResult = executor.submit(GafferDeadline.DeadlineTools.getGafferVersions)
+
+            for auxFile, result in auxFileResults.items():
+                if not result.result():
+                    errors.append("Auxiliary file {} does not exist".format(auxFile))
+
+            for directory, result in outputResults.items():
+                if not result.result():
+                    warnings.append("Output directory {} is not writable".format(directory))
+
+            if dependencyScriptResult is not None and not dependencyScriptResult.result():
+                warnings.append("Dependency script {} does not exist".format(dependencyScript))
+
+            if versionsResult is not None:
+                try:
+                    versions = versionsResult.result()
+                except (RuntimeError, OSError) as e:
+                    versions = None
+                    IECore.msg(
+                        IECore.Msg.Level.Debug,
+                        "DeadlineDispatcher",
+                        "Unable to query registered Gaffer versions : {}".format(e)
+                    )
+                if versions and Gaffer.About.versionString() not in versions:
+                    errors.append(
+                        "Gaffer {} has no executable registered with the Deadline "
+                        "Gaffer plugin".format(Gaffer.About.versionString())
                     )
-                    i = 0
-                    for d in dependencies:
-                        jobInfo["ExtraInfoKeyValue{}".format(i)] = "{}:{}={}".format(
-                            int(d.getDeadlineTask().getTaskNumber()),
-                            d.getDeadlineJob().getJobID(),
-                            d.getUpstreamDeadlineTask().getTaskNumber()
-                        )
 
-                        i += 1
+        for warning in warnings:
+            IECore.msg(IECore.Msg.Level.Warning, "DeadlineDispatcher", warning)
 
-                    deadlineJob.setDependencyType(
-                        GafferDeadline.GafferDeadlineJob.DeadlineDependencyType.Scripted
+        if len(errors) > 0:
+            raise RuntimeError(
+                "Deadline pre-flight checks failed :\n{}".format("\n".join(errors))
+            )
+
+    @staticmethod
+    def __isWritableDirectory(directory):
+        # Directories that don't exist yet are writable if we could create them.
+        while not os.path.isdir(directory):
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return False
+            directory = parent
+
+        return os.access(directory, os.W_OK)
+
+    def __exportGraph(self, dispatchData):
+        """ Writes the planned job graph to the job directory as JSON and as
+        Graphviz DOT, to help find graph shapes that need large numbers of
+        scripted dependencies before they reach the farm.
+        """
+        dispatchGraph = dispatchData["dispatchGraph"]
+        deadlineJobs = self.__plannedJobs(dispatchData)
+
+        graph = {"jobs": [], "edges": []}
+        for i, job in enumerate(dispatchGraph.getJobs()):
+            dependencies = dispatchGraph.getDependencies(i)
+
+            scriptDependencyKeys = 0
+            if job["dependencyType"] == "Scripted":
+                scriptDependencyKeys = len(
+                    GafferDeadline.DeadlineAlgo.scriptDependencyKeys(
+                        dependencies,
+                        len(job["tasks"]),
+                        {d[1]: len(dispatchGraph.getJob(d[1])["tasks"]) for d in dependencies}
                     )
-            else:
-                deadlineJob.setDependencyType(
-                    GafferDeadline.GafferDeadlineJob.DeadlineDependencyType._None
                 )
 
-            pluginInfo = {}
-            if not isinstance(gafferNode, GafferDeadline.DeadlineTask):
-                pluginInfo = {
-                    "Script": os.path.split(dispatchData["scriptFile"])[-1],
-                    "Version": Gaffer.About.versionString(),
-                    "IgnoreScriptLoadErrors": False,
-                    "Nodes": gafferNode.relativeName(dispatchData["scriptNode"]),
-                    "Frames": "<STARTFRAME>-<ENDFRAME>",
-                    "Threads": deadlinePlug["threads"].getValue(),
+            graph["jobs"].append(
+                {
+                    "id": i,
+                    "name": job["name"],
+                    "tasks": len(job["tasks"]),
+                    "dependencyType": job["dependencyType"],
+                    "scriptDependencyKeys": scriptDependencyKeys,
+                    "planningTime": deadlineJobs[i].getPlanningTime(),
                 }
-            else:
-                data = IECore.CompoundData()
-                gafferNode["parameters"].fillCompoundData(data)
-                pluginInfo = dict(data)
-
-            scriptContext = dispatchData["scriptNode"].context()
-            contextArgs = []
-            for entry in [
-                k for k in deadlineJob.getContext().keys() if (
-                    k != "frame" and
-                    not k.startswith("ui:")
+            )
+
+            edgeCounts = {}
+            for d in dependencies:
+                edgeCounts[d[1]] = edgeCounts.get(d[1], 0) + 1
+            for parentId in sorted(edgeCounts.keys()):
+                graph["edges"].append(
+                    {"from": parentId, "to": i, "dependencies": edgeCounts[parentId]}
                 )
-            ]:
-                if (
-                    entry not in scriptContext.keys() or
-                    deadlineJob.getContext()[entry] != scriptContext[entry]
-                ):
-                    contextArgs.extend(
-                        [
-                            "\"-{}\"".format(entry),
-                            "\"{}\"".format(repr(deadlineJob.getContext()[entry]))
-                        ]
-                    )
-            if contextArgs and not isinstance(gafferNode, GafferDeadline.DeadlineTask):
-                pluginInfo["Context"] = " ".join(contextArgs)
 
-            deadlineJob.setJobProperties(jobInfo)
-            deadlineJob.setPluginProperties(pluginInfo)
+        with open(os.path.join(dispatchData["jobDirectory"], "deadlineGraph.json"), "w") as f:
+            json.dump(graph, f, indent=4)
+        with open(os.path.join(dispatchData["jobDirectory"], "deadlineGraph.dot"), "w") as f:
+            f.write(GafferDeadline.DeadlineAlgo.graphToDot(graph))
 
-            deadlineJob.setLogLevel(deadlinePlug["logLevel"].getValue())
+    @staticmethod
+    def __nodeName(node):
+        # The name used to execute a node, relative to the script holding it. This is
+        # usually the dispatched script, but nodes generated for the farm have their own.
+        return node.relativeName(node.scriptNode())
 
-            jobId, output = deadlineJob.submitJob(self.jobDirectory())
-            if jobId is None:
-                IECore.Log.error(jobInfo["Name"], "failed to submit to Deadline.", output)
-            else:
-                IECore.Log.info(jobInfo["Name"], "submission succeeded.", output)
+    @staticmethod
+    def __dependencyTypeName(dependencyType):
+        dependencyTypes = GafferDeadline.GafferDeadlineJob.DeadlineDependencyType
+        return {
+            dependencyTypes.JobToJob: "JobToJob",
+            dependencyTypes.FrameToFrame: "FrameToFrame",
+            dependencyTypes.Scripted: "Scripted",
+        }.get(dependencyType, "None")
 
-            return deadlineJob.getJobID()
+    @staticmethod
+    def __getGafferDeadlineJob(node, context, dispatchData):
+        # A `context` of `None` looks for the context table job for `node`.
+        for j in dispatchData["deadlineJobs"]:
+            if j.getGafferNode() != node:
+                continue
+            if context is None and j.getUseContextTable():
+                return j
+            if context is not None and not j.getUseContextTable() and j.getContext() == context:
+                return j
+
+    @staticmethod
+    def __useContextTable(batch):
+        if batch.node() is None or GafferDeadline.GafferDeadlineJob.isControlTask(batch.node()):
+            return False
+
+        deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(batch.node())
+        if deadlinePlug is None or isinstance(batch.node(), GafferDeadline.DeadlineTask):
+            return False
+
+        with batch.context():
+            return deadlinePlug["contextTable"].getValue()
+
+    @staticmethod
+    def __contextArgs(context, scriptContext):
+        # Gaffer command line arguments for the entries of `context` that differ
+        # from those of the script.
+        contextArgs = []
+        for entry in [
+            k for k in context.keys() if (
+                k != "frame" and
+                not k.startswith("ui:")
+            )
+        ]:
+            if (
+                entry not in scriptContext.keys() or
+                context[entry] != scriptContext[entry]
+            ):
+                contextArgs.extend(
+                    [
+                        "\"-{}\"".format(entry),
+                        "\"{}\"".format(repr(context[entry]))
+                    ]
+                )
+
+        return contextArgs
+
+    def __writeContextTable(self, deadlineJob, dispatchData):
+        """ Writes the context table for a job using one, returning the file name.
+        Row `i` of the table holds the frames and context arguments for task `i`,
+        and the task is submitted to Deadline as frame `i`.
+        """
+        scriptContext = dispatchData["scriptNode"].context()
+        tileCropWindows = dispatchData["tileCropWindows"].get(id(deadlineJob))
+        rows = []
+        for t in deadlineJob.getTasks():
+            context = t.getGafferBatch().context()
+            if t.getTile() is not None:
+                context = Gaffer.Context(context)
+                context["deadline:tile"] = t.getTile()
+                context["deadline:tileCropWindow"] = tileCropWindows[t.getTile()]
+            rows.append(
+                {
+                    "frames": "{}-{}".format(t.getStartFrame(), t.getEndFrame()),
+                    "context": " ".join(self.__contextArgs(context, scriptContext)),
+                }
+            )
+
+        # Tiled jobs for a node dispatched in several contexts each have a table.
+        tableName = self.__nodeName(deadlineJob.getGafferNode())
+        tableNames = dispatchData.setdefault("contextTableNames", set())
+        tableIndex = 1
+        while tableName in tableNames:
+            tableName = "{}.{}".format(self.__nodeName(deadlineJob.getGafferNode()), tableIndex)
+            tableIndex += 1
+        tableNames.add(tableName)
+
+        tableFile = os.path.join(
+            dispatchData["jobDirectory"],
+            "{}.contextTable.json".format(tableName)
+        )
+        with open(tableFile, "w", encoding="utf-8") as f:
+            json.dump({"rows": rows}, f)
+
+        return tableFile
+
+    def __jobScriptFile(self, deadlineJob, dispatchData):
+        """ Returns the script file to submit with a job. This is the full script unless
+        the script is pruned to the nodes needed by the job, or the job has additions to
+        the script such as scene caches. Other scripts are stored in a directory named by
+        the hash of their contents so identical scripts are shared, and keep the name of
+        the full script so that `${script:name}` is unchanged. They are stored in the
+        content store when one is set, and in the job directory otherwise.
+        """
+        scriptNode = dispatchData["scriptNode"]
+        scriptSuffix = dispatchData["scriptSuffixes"].get(id(deadlineJob), "")
+        prune = self["pruneScripts"].getValue() and all(
+            n.scriptNode() == scriptNode for n in deadlineJob.getGafferNodes()
+        )
+        if not prune and not scriptSuffix:
+            return dispatchData["scriptFile"]
+
+        nodeNames = tuple(n.fullName() for n in deadlineJob.getGafferNodes()) if prune else None
+        if (nodeNames, scriptSuffix) in dispatchData["jobScripts"]:
+            return dispatchData["jobScripts"][(nodeNames, scriptSuffix)]
+
+        if prune:
+            nodes = []
+            for node in deadlineJob.getGafferNodes():
+                nodes += [n for n in self.__upstreamNodes(node, scriptNode) if n not in nodes]
+
+            serialisationFilter = Gaffer.StandardSet(
+                list(scriptNode.children(Gaffer.Plug)) + nodes
+            )
+            serialisation = scriptNode.serialise(scriptNode, serialisationFilter)
         else:
+            serialisation = dispatchData["scriptSerialisation"]
+
+        serialisation += scriptSuffix
+
+        if dispatchData["contentStore"]:
+            scriptFile = self.__contentStoreFile(
+                serialisation,
+                os.path.basename(dispatchData["scriptFile"]),
+                dispatchData
+            )
+            self.__writeContentFile(scriptFile, serialisation)
+            dispatchData["jobScripts"][(nodeNames, scriptSuffix)] = scriptFile
+
+            return scriptFile
+
+        h = IECore.MurmurHash()
+        h.append(serialisation)
+
+        scriptFile = os.path.join(
+            dispatchData["jobDirectory"],
+            "scripts",
+            h.toString(),
+            os.path.basename(dispatchData["scriptFile"])
+        )
+        if not os.path.isfile(scriptFile):
+            os.makedirs(os.path.dirname(scriptFile), exist_ok=True)
+            with open(scriptFile, "w", encoding="utf-8") as f:
+                f.write(serialisation)
+
+        dispatchData["jobScripts"][(nodeNames, scriptSuffix)] = scriptFile
+
+        return scriptFile
+
+    @staticmethod
+    def __writeFile(fileName, contents):
+        # Returns the seconds taken, as this may run in the background.
+        startTime = time.perf_counter()
+        with open(fileName, "w", encoding="utf-8") as f:
+            f.write(contents)
+
+        return time.perf_counter() - startTime
+
+    @staticmethod
+    def __contentStoreFile(contents, name, dispatchData):
+        """ Returns the file `contents` are stored in within the content store. Files
+        are stored in a directory named by the hash of their contents, so identical
+        files from any dispatch share a single copy, and keep `name` so that the
+        plugin and `${script:name}` see the same file name.
+        """
+        h = IECore.MurmurHash()
+        h.append(contents)
+
+        return os.path.join(dispatchData["contentStore"], h.toString(), name)
+
+    @staticmethod
+    def __writeContentFile(fileName, contents):
+        # Returns the seconds taken, as this may run in the background. Files already
+        # in the store hold the same contents, so they are left alone. Others are
+        # written under a temporary name and renamed, so that concurrent dispatches
+        # never see a partly written file.
+        startTime = time.perf_counter()
+        if not os.path.isfile(fileName):
+            os.makedirs(os.path.dirname(fileName), exist_ok=True)
+            tempFileName = "{}.{}.tmp".format(fileName, os.getpid())
+            with open(tempFileName, "w", encoding="utf-8") as f:
+                f.write(contents)
+            os.replace(tempFileName, fileName)
+
+        return time.perf_counter() - startTime
+
+    @staticmethod
+    def __contentFileName(fileName, dispatchData):
+        # The name the Gaffer plugin finds a file by, relative to the content store
+        # or to the auxiliary files of the job.
+        if dispatchData["contentStore"]:
+            return os.path.relpath(fileName, dispatchData["contentStore"])
+
+        return os.path.basename(fileName)
+
+    @staticmethod
+    def __upstreamNodes(node, scriptNode):
+        """ Returns the children of `scriptNode` needed to compute the plugs of `node`,
+        including the one holding `node` itself. Task plugs aren't followed since
+        upstream tasks are executed by their own jobs.
+        """
+        def topLevelNode(n):
+            while n.parent() is not None and n.parent() != scriptNode:
+                n = n.parent()
+            return n
+
+        result = []
+        toVisit = [topLevelNode(node)]
+        while len(toVisit) > 0:
+            n = toVisit.pop()
+            if n in result:
+                continue
+            result.append(n)
+
+            for descendant in [n] + list(Gaffer.Node.RecursiveRange(n)):
+                for plug in Gaffer.Plug.RecursiveRange(descendant):
+                    if isinstance(plug, GafferDispatch.TaskNode.TaskPlug):
+                        continue
+                    source = plug.getInput()
+                    if source is None or source.node() is None:
+                        continue
+                    sourceNode = topLevelNode(source.node())
+                    if sourceNode != n and sourceNode.parent() == scriptNode:
+                        toVisit.append(sourceNode)
+
+        return result
+
+    def __writeEnvironmentProfile(self, deadlineJob, dispatchData):
+        """ Writes the environment variables of a job to a profile file in the content
+        store, returning the file name. Jobs with identical environments share a single
+        profile, which is only written once.
+        """
+        contents = json.dumps(
+            {"environment": deadlineJob.getEnvironmentVariables()},
+            sort_keys=True
+        )
+        profileFile = self.__contentStoreFile(contents, "environment.json", dispatchData)
+        if profileFile not in dispatchData["environmentProfiles"]:
+            self.__writeContentFile(profileFile, contents)
+            dispatchData["environmentProfiles"].add(profileFile)
+
+        return profileFile
+
+    @staticmethod
+    def __addGafferDeadlineJob(newDeadlineJob, dispatchData):
+        # Jobs are kept in creation order, which the names of generated nodes rely on
+        # to be the same each time a script is dispatched.
+        if newDeadlineJob not in dispatchData["deadlineJobs"]:
+            dispatchData["deadlineJobs"].append(newDeadlineJob)
+
+    def __spoolDeadlineJobs(self, rootJobs, dispatchData):
+        """ Spools the jobs upstream of `rootJobs`, yielding each one as soon as it
+        is ready to be submitted, along with its dependencies as returned by
+        `__spooledDependencies()`. Jobs are spooled depth first, so parent jobs are
+        always yielded before their children.
+        """
+        visited = set()
+
+        def walk(deadlineJob):
+            if id(deadlineJob) in visited:
+                return
+            visited.add(id(deadlineJob))
+
+            for parentJob in deadlineJob.getParentJobs():
+                yield from walk(parentJob)
+
+            # Don't submit command tasks, they pollute the Deadline Monitor and cause
+            # potentially lengthy delays in dequeuing tasks that do nothing.
+            if GafferDeadline.GafferDeadlineJob.isControlTask(deadlineJob.getGafferNode()):
+                return
+
+            # this job is already submitted if it has an ID
+            if deadlineJob.getJobID() is not None:
+                dispatchData["submittedJobIDs"][id(deadlineJob)] = deadlineJob.getJobID()
+                return
+
+            if self.__spoolDeadlineJob(deadlineJob, dispatchData):
+                yield deadlineJob, self.__spooledDependencies(deadlineJob)
+
+        for rootJob in rootJobs:
+            yield from walk(rootJob)
+
+    def __spoolDeadlineJob(self, deadlineJob, dispatchData):
+        """ Writes the files needed by `deadlineJob`, evaluates the settings used to
+        encode it into the `DispatchGraph` and sets its job and plugin properties from
+        the graph, apart from its dependencies on the jobs of parent jobs, which aren't
+        known until they are submitted. Returns False if the job has no Deadline settings.
+        """
+        gafferNode = deadlineJob.getGafferNode()
+
+        self.preSpoolSignal()(self, deadlineJob)
+
+        deadlinePlug = GafferDeadline.DeadlineSettings.taskSettings(gafferNode)
+        if deadlinePlug is None:
             IECore.Log.error("GafferDeadline", "Failed to acquire Deadline plug")
+            return False
+
+        isDeadlineTask = isinstance(gafferNode, GafferDeadline.DeadlineTask)
+
+        contextTableFile = None
+        if deadlineJob.getUseContextTable():
+            contextTableFile = self.__writeContextTable(deadlineJob, dispatchData)
+
+        with Gaffer.Context(deadlineJob.getContext()) as c:
+            settings = {
+                name: deadlinePlug[name].getValue() for name in [
+                    "batchName",
+                    "comment",
+                    "department",
+                    "pool",
+                    "secondaryPool",
+                    "group",
+                    "priority",
+                    "taskTimeout",
+                    "enableAutoTimeout",
+                    "concurrentTasks",
+                    "machineLimit",
+                    "machineList",
+                    "isBlackList",
+                    "limits",
+                    "onJobComplete",
+                    "submitSuspended",
+                    "threads",
+                ]
+            }
+            settings["jobName"] = "{}{}{}".format(
+                dispatchData["dispatchJobName"],
+                "." if dispatchData["dispatchJobName"] else "",
+                self.__nodeName(gafferNode),
+            )
+            settings["plugin"] = (
+                gafferNode["plugin"].getValue() if isDeadlineTask else "Gaffer"
+            )
+
+            auxFiles = deadlineJob.getAuxFiles()   # this will already have substitutions included
+            auxFiles += [f for f in deadlinePlug["auxFiles"].getValue()]
+            if contextTableFile is not None:
+                auxFiles.append(contextTableFile)
+            if not isDeadlineTask:
+                # Scripts in the content store are read from there by the plugin,
+                # rather than being copied to Deadline with each job.
+                jobScriptFile = self.__jobScriptFile(deadlineJob, dispatchData)
+                if dispatchData["contentStore"]:
+                    auxFiles = [f for f in auxFiles if f != dispatchData["scriptFile"]]
+                else:
+                    auxFiles = [
+                        jobScriptFile if f == dispatchData["scriptFile"] else f
+                        for f in auxFiles
+                    ]
+            deadlineJob.setAuxFiles(auxFiles)
+
+            for output in deadlinePlug["outputs"].getValue():
+                deadlineJob.addOutput(output, c)
+
+            environmentVariables = IECore.CompoundData()
+
+            deadlinePlug["environmentVariables"].fillCompoundData(environmentVariables)
+            extraEnvironmentVariables = deadlinePlug["extraEnvironmentVariables"].getValue()
+            for name, value in extraEnvironmentVariables.items():
+                environmentVariables[name] = value
+            for name, value in environmentVariables.items():
+                deadlineJob.appendEnvironmentVariable(name, str(value))
+
+            deadlineSettings = IECore.CompoundData()
+            deadlinePlug["deadlineSettings"].fillCompoundData(deadlineSettings)
+            extraDeadlineSettings = deadlinePlug["extraDeadlineSettings"].getValue()
+            for name, value in extraDeadlineSettings.items():
+                deadlineSettings[name] = value
+            for name, value in deadlineSettings.items():
+                deadlineJob.appendDeadlineSetting(name, str(value))
+
+            # The log level is an environment variable, so it must be set before the
+            # environment is written to a profile.
+            deadlineJob.setLogLevel(deadlinePlug["logLevel"].getValue())
+
+        settings["pluginParameters"] = None
+        settings["script"] = ""
+        settings["nodes"] = ""
+        settings["context"] = ""
+        if isDeadlineTask:
+            data = IECore.CompoundData()
+            gafferNode["parameters"].fillCompoundData(data)
+            settings["pluginParameters"] = {name: str(value) for name, value in data.items()}
+        else:
+            settings["script"] = self.__contentFileName(jobScriptFile, dispatchData)
+            settings["nodes"] = " ".join(
+                self.__nodeName(n) for n in deadlineJob.getGafferNodes()
+            )
+            if contextTableFile is None:
+                settings["context"] = " ".join(
+                    self.__contextArgs(
+                        deadlineJob.getContext(),
+                        dispatchData["scriptNode"].context()
+                    )
+                )
+        settings["version"] = Gaffer.About.versionString()
+        settings["contextTable"] = (
+            os.path.basename(contextTableFile) if contextTableFile is not None else ""
+        )
+
+        settings["environmentProfile"] = ""
+        if (
+            dispatchData["useEnvironmentProfiles"] and
+            not isDeadlineTask and
+            len(deadlineJob.getEnvironmentVariables()) > 0
+        ):
+            profileFile = self.__writeEnvironmentProfile(deadlineJob, dispatchData)
+            deadlineJob.setEnvironmentProfile(profileFile)
+            settings["environmentProfile"] = self.__contentFileName(profileFile, dispatchData)
+
+        settings["contentStore"] = "" if isDeadlineTask else dispatchData["contentStore"]
+
+        # The job and plugin info are encoded from the plain values in the graph.
+        dispatchGraph = dispatchData["dispatchGraph"]
+        jobIndex = dispatchData["jobIndices"][id(deadlineJob)]
+        dispatchGraph.setJobSettings(jobIndex, settings)
+        deadlineJob.setJobProperties(dispatchGraph.jobInfo(jobIndex))
+        deadlineJob.setPluginProperties(dispatchGraph.pluginInfo(jobIndex))
+
+        return True
+
+    @staticmethod
+    def __spooledDependencies(deadlineJob):
+        """ Returns the dependencies of `deadlineJob` as a list of plain
+        `(taskNumber, upstreamJobKey, upstreamTaskNumber, upstreamTaskCount)` tuples,
+        where jobs are keyed by their `id()`. Finding dependencies walks the Gaffer
+        batches, so this is done while spooling rather than on the submission thread.
+        """
+        return [
+            (
+                int(d.getDeadlineTask().getTaskNumber()),
+                id(d.getDeadlineJob()),
+                d.getUpstreamDeadlineTask().getTaskNumber(),
+                len(d.getDeadlineJob().getTasks())
+            )
+            for d in deadlineJob.getDependencies().values()
+        ]
+
+    @staticmethod
+    def __submitSpooledJob(deadlineJob, dependencies, dispatchData):
+        # Called on the submission thread, so this only uses the dependencies found
+        # while spooling and the IDs of the jobs submitted before it.
+        jobInfo = deadlineJob.getJobProperties()
+
+        if dispatchData["submissionFailed"].is_set():
             return None
 
+        try:
+            return DeadlineDispatcher.__submitJobWithDependencies(
+                deadlineJob,
+                jobInfo,
+                dependencies,
+                dispatchData
+            )
+        except Exception:
+            dispatchData["submissionFailed"].set()
+            raise
+
     @staticmethod
-    def _setupPlugs(parentPlug):
+    def __submitJobWithDependencies(deadlineJob, jobInfo, dependencies, dispatchData):
+        # Dependencies are stored with a key for the Deadline job since job IDs weren't
+        # assigned when the task tree was walked. Parent jobs are submitted before their
+        # children on this thread, so they have IDs now and we can substitute that in for
+        # Deadline and the dependency script. A job is never submitted without the jobs
+        # it depends on, as Deadline would start it straight away.
+        upstreamJobIDs = {}
+        for taskNumber, upstreamJobKey, upstreamTaskNumber, upstreamTaskCount in dependencies:
+            upstreamJobID = dispatchData["submittedJobIDs"].get(upstreamJobKey)
+            if upstreamJobID is None:
+                raise RuntimeError(
+                    "{} was not submitted because a job it depends on was not submitted".format(
+                        jobInfo["Name"]
+                    )
+                )
+            upstreamJobIDs[upstreamJobKey] = upstreamJobID
+
+        dependencyTypes = GafferDeadline.GafferDeadlineJob.DeadlineDependencyType
+        dependencyType = deadlineJob.getDependencyType()
+        if dependencyType in [dependencyTypes.JobToJob, dependencyTypes.FrameToFrame]:
+            jobInfo.update(
+                {
+                    "JobDependencies": ",".join(sorted(set(upstreamJobIDs.values()))),
+                    "ResumeOnDeletedDependencies": True,
+                    "FrameDependencyOffsetStart": deadlineJob._frameDependencyOffsetStart,
+                    "FrameDependencyOffsetEnd": deadlineJob._frameDependencyOffsetEnd,
+                }
+            )
+            if dependencyType == dependencyTypes.FrameToFrame:
+                jobInfo.update({"IsFrameDependent": True})
+        elif dependencyType == dependencyTypes.Scripted:
+            jobInfo.update(
+                {
+                    "ScriptDependencies": os.environ["DEADLINE_DEPENDENCY_SCRIPT_PATH"],
+                    "IsFrameDependent": True,
+                }
+            )
+            taskDependencies = []
+            upstreamTaskCounts = {}
+            for taskNumber, upstreamJobKey, upstreamTaskNumber, upstreamTaskCount in dependencies:
+                upstreamJobID = upstreamJobIDs[upstreamJobKey]
+                taskDependencies.append((taskNumber, upstreamJobID, upstreamTaskNumber))
+                upstreamTaskCounts[upstreamJobID] = upstreamTaskCount
+
+            scriptDependencyKeys = GafferDeadline.DeadlineAlgo.scriptDependencyKeys(
+                taskDependencies,
+                len(deadlineJob.getTasks()),
+                upstreamTaskCounts
+            )
+            for i, (key, value) in enumerate(scriptDependencyKeys):
+                jobInfo["ExtraInfoKeyValue{}".format(i)] = "{}={}".format(key, value)
+
+        deadlineJob.setJobProperties(jobInfo)
+
+        jobId, output = deadlineJob.submitJob(
+            dispatchData["spoolDirectory"],
+            checkAuxFiles=not dispatchData["preflightChecked"]
+        )
+        dispatchData.setdefault(
+            "firstSubmitTime",
+            time.perf_counter() - dispatchData["dispatchStartTime"]
+        )
+        if jobId is None:
+            IECore.Log.error(jobInfo["Name"], "failed to submit to Deadline.", output)
+        else:
+            IECore.Log.info(jobInfo["Name"], "submission succeeded.", output)
+            dispatchData["submittedJobIDs"][id(deadlineJob)] = jobId
+
+        return deadlineJob.getJobID()
+
+    # Settings that most task nodes leave at their defaults, as `(name, plugType, kwargs)`.
+    # Task nodes only hold those they override, so that the `dispatcher.deadline` plug
+    # of every task node stays small. `DeadlineSettings` nodes hold them all.
+    _optionalSettings = [
+        (
+            "profileOverrides",
+            Gaffer.StringVectorDataPlug,
+            {"defaultValue": IECore.StringVectorData()}
+        ),
+        ("costHint", Gaffer.FloatPlug, {"defaultValue": 1.0, "minValue": 0.0}),
+        ("autoChunk", Gaffer.BoolPlug, {"defaultValue": False}),
+        ("frameTime", Gaffer.FloatPlug, {"defaultValue": 60.0, "minValue": 0.0}),
+        ("runLocally", Gaffer.BoolPlug, {"defaultValue": False}),
+        ("frameOrder", Gaffer.StringPlug, {"defaultValue": "Ascending"}),
+        ("contextTable", Gaffer.BoolPlug, {"defaultValue": False}),
+        ("sceneCache", Gaffer.BoolPlug, {"defaultValue": False}),
+        (
+            "tiles",
+            Gaffer.V2iPlug,
+            {"defaultValue": imath.V2i(1, 1), "minValue": imath.V2i(1, 1)}
+        ),
+        ("tileFileName", Gaffer.StringPlug, {}),
+        ("tileAssemblyFileName", Gaffer.StringPlug, {}),
+    ]
+
+    @staticmethod
+    def _setupOptionalPlug(deadlinePlug, name, flags=Gaffer.Plug.Flags.Default):
+        """ Adds the plug for optional setting `name` to `deadlinePlug` and returns it. """
+        for settingName, plugType, kwargs in DeadlineDispatcher._optionalSettings:
+            if settingName == name:
+                deadlinePlug[name] = plugType(name, flags=flags, **kwargs)
+                return deadlinePlug[name]
+
+        raise KeyError("\"{}\" is not an optional Deadline setting".format(name))
+
+    @staticmethod
+    def _setupPlugs(parentPlug, optionalSettings=False):
 
         if "deadline" in parentPlug:
             return
 
         parentPlug["deadline"] = Gaffer.Plug()
+        parentPlug["deadline"]["profile"] = Gaffer.Plug()
         parentPlug["deadline"]["batchName"] = Gaffer.StringPlug(defaultValue="${script:name}")
         parentPlug["deadline"]["comment"] = Gaffer.StringPlug()
         parentPlug["deadline"]["department"] = Gaffer.StringPlug()
@@ -523,6 +2078,10 @@ class DeadlineDispatcher(GafferDispatch.Dispatcher):
         parentPlug["deadline"]["extraDeadlineSettings"] = Gaffer.AtomicCompoundDataPlug()
         parentPlug["deadline"]["extraEnvironmentVariables"] = Gaffer.AtomicCompoundDataPlug()
 
+        if optionalSettings:
+            for setting in DeadlineDispatcher._optionalSettings:
+                DeadlineDispatcher._setupOptionalPlug(parentPlug["deadline"], setting[0])
+
 
 IECore.registerRunTimeTyped(DeadlineDispatcher, typeName="GafferDeadline::DeadlineDispatcher")
 
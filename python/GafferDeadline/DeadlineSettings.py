@@ -0,0 +1,154 @@
+##########################################################################
+#
+#  Copyright (c) 2026, Hypothetical Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#      * Redistributions of source code must retain the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer.
+#
+#      * Redistributions in binary form must reproduce the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer in the documentation and/or other materials provided with
+#        the distribution.
+#
+#      * Neither the name of Hypothetical Inc. nor the names of
+#        any other contributors to this software may be used to endorse or
+#        promote products derived from this software without specific prior
+#        written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+##########################################################################
+
+import threading
+
+import IECore
+
+import Gaffer
+
+import GafferDeadline
+
+
+class DeadlineSettings(Gaffer.Node):
+    """ Holds a profile of Deadline settings shared by many task nodes. A task node
+    takes each setting it leaves at its default value from the `DeadlineSettings` node
+    connected to its `dispatcher.deadline.profile` plug, so settings common to many
+    nodes are set and stored once. Settings named by `profileOverrides` always use the
+    node's own value, so that a node may override the profile with a default value.
+    Profiles may take settings from another profile in the same way.
+
+    Rarely used settings are only held by task nodes once they are overridden with
+    `overrideSetting()`. Until then they are taken from the profile.
+    """
+    def __init__(self, name="DeadlineSettings"):
+        Gaffer.Node.__init__(self, name)
+
+        GafferDeadline.DeadlineDispatcher._setupPlugs(self, optionalSettings=True)
+        self["out"] = Gaffer.Plug(direction=Gaffer.Plug.Direction.Out)
+
+    @staticmethod
+    def taskSettings(node):
+        """ Returns the Deadline settings of task node `node`, or None if it has none.
+        Settings are accessed by name, as for the `dispatcher.deadline` plug, and
+        give the plug holding the value to use, which may belong to a profile.
+        """
+        deadlinePlug = node["dispatcher"].getChild("deadline")
+        if deadlinePlug is None:
+            return None
+
+        return _Settings(deadlinePlug)
+
+    @staticmethod
+    def overrideSetting(node, name):
+        """ Returns the plug for setting `name` on task node `node`, adding it as a
+        dynamic plug if it is a rarely used setting the node doesn't hold yet.
+        """
+        deadlinePlug = node["dispatcher"]["deadline"]
+        if name not in deadlinePlug:
+            GafferDeadline.DeadlineDispatcher._setupOptionalPlug(
+                deadlinePlug,
+                name,
+                flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+            )
+
+        return deadlinePlug[name]
+
+    @staticmethod
+    def profile(deadlinePlug):
+        """ Returns the `DeadlineSettings` node connected to the `profile` plug of
+        `deadlinePlug`, or None.
+        """
+        profilePlug = deadlinePlug.getChild("profile")
+        if profilePlug is None or profilePlug.getInput() is None:
+            return None
+
+        node = profilePlug.source().node()
+        return node if isinstance(node, DeadlineSettings) else None
+
+
+class _Settings(object):
+
+    __defaults = None
+    __defaultsMutex = threading.Lock()
+
+    def __init__(self, deadlinePlug):
+        self.__deadlinePlug = deadlinePlug
+
+    def __getitem__(self, name):
+        deadlinePlug = self.__deadlinePlug
+        plug = deadlinePlug.getChild(name)
+
+        # Profiles connected in a cycle are followed once around it.
+        visited = [deadlinePlug.node()]
+        while plug is None or (
+            plug.getInput() is None and plug.isSetToDefault() and
+            not self.__isOverride(deadlinePlug, name)
+        ):
+            profile = DeadlineSettings.profile(deadlinePlug)
+            if profile is None or any(profile.isSame(n) for n in visited):
+                break
+            visited.append(profile)
+            deadlinePlug = profile["deadline"]
+            plug = deadlinePlug[name]
+
+        if plug is None:
+            # An optional setting held by neither the node nor its profiles.
+            plug = self.__defaultSettings()[name]
+
+        return plug
+
+    @staticmethod
+    def __isOverride(deadlinePlug, name):
+        overrides = deadlinePlug.getChild("profileOverrides")
+        return overrides is not None and name in overrides.getValue()
+
+    def plugs(self):
+        """ Returns the plug holding the value of each setting. """
+        return [self[p.getName()] for p in self.__defaultSettings().children(Gaffer.ValuePlug)]
+
+    @classmethod
+    def __defaultSettings(cls):
+        # The `deadline` plug of a `DeadlineSettings` node left at its defaults,
+        # created the first time a setting isn't found on a node or its profiles.
+        with cls.__defaultsMutex:
+            if cls.__defaults is None:
+                cls.__defaults = DeadlineSettings("defaultDeadlineSettings")
+
+        return cls.__defaults["deadline"]
+
+
+IECore.registerRunTimeTyped(DeadlineSettings, typeName="GafferDeadline::DeadlineSettings")
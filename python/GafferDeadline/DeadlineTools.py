@@ -37,6 +37,7 @@
 import os
 import subprocess
 import re
+import time
 
 import IECore
 
@@ -86,6 +87,32 @@ def getMachineList():
     return [i.decode() for i in output.split()]
 
 
+# Worker counts are cached by pool and group, as `(queryTime, count)` tuples.
+_workerCounts = {}
+
+
+def getWorkerCount(pool="", group="", maxAge=300.0):
+    """ Returns the number of Workers able to render jobs submitted to `pool` and
+    `group`, where an empty string stands for any pool or group. Counts are cached
+    for `maxAge` seconds so that dispatching many jobs queries Deadline only once.
+    """
+    cached = _workerCounts.get((pool, group))
+    if cached is not None and time.monotonic() - cached[0] < maxAge:
+        return cached[1]
+
+    workers = set(getMachineList())
+    if pool:
+        output = runDeadlineCommand(["GetSlaveNamesInPool", pool])
+        workers &= set(i.decode() for i in output.split())
+    if group:
+        output = runDeadlineCommand(["GetSlaveNamesInGroup", group])
+        workers &= set(i.decode() for i in output.split())
+
+    _workerCounts[(pool, group)] = (time.monotonic(), len(workers))
+
+    return len(workers)
+
+
 def getLimitGroups():
     output = runDeadlineCommand(["GetLimitGroups"])
     return re.findall(r'Name=(.*)', output.decode())
@@ -99,3 +126,20 @@ def getGroups():
 def getPools():
     output = runDeadlineCommand(["GetSubmissionInfo", "pools"])
     return [i.decode() for i in output.split()[1:]]    # remove [Groups] header
+
+
+def getGafferVersions():
+    """ Returns the Gaffer versions with executables registered in the repository's
+    Gaffer plugin, or None if the plugin parameters can't be found.
+    """
+    output = runDeadlineCommand(
+        ["GetRepositoryFilePath", "custom/plugins/Gaffer/Gaffer.param"]
+    )
+    paramFile = output.decode().strip()
+    if not os.path.isfile(paramFile):
+        return None
+
+    with open(paramFile, encoding="utf-8") as f:
+        return [
+            v.replace("_", ".") for v in re.findall(r"^\[Executable(.+)\]", f.read(), re.MULTILINE)
+        ]
@@ -0,0 +1,217 @@
+##########################################################################
+#
+#  Copyright (c) 2026, Hypothetical Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#      * Redistributions of source code must retain the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer.
+#
+#      * Redistributions in binary form must reproduce the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer in the documentation and/or other materials provided with
+#        the distribution.
+#
+#      * Neither the name of Hypothetical Inc. nor the names of
+#        any other contributors to this software may be used to endorse or
+#        promote products derived from this software without specific prior
+#        written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+##########################################################################
+
+from . import DeadlineAlgo
+
+
+class DispatchGraph(object):
+    """ A plain Python description of the Deadline jobs planned for a dispatch, with
+    their tasks and the dependencies between tasks. It is built once the structure of
+    the jobs is settled, and holds no Gaffer objects, so that dependency planning and
+    the encoding of Deadline job and plugin info can run on it away from the main
+    thread, in another process, or without Gaffer at all.
+
+    Each job is a dictionary holding its "name", "dependencyMode", "useContextTable",
+    "costHint", "dependencyType", "priorityOffset", "settings" and "tasks", which is
+    a list of `[startFrame, endFrame]` lists in frame order, and "taskOrder", the order
+    the tasks are submitted in as a list of task indices. Tasks without frames have
+    frames of None. Dependencies are held for each job as
+    `(taskIndex, upstreamJobIndex, upstreamTaskIndex)` tuples.
+    """
+
+    def __init__(self, jobs=[], dependencies=[]):
+        self._jobs = [dict(j, tasks=[list(t) for t in j["tasks"]]) for j in jobs]
+        self._dependencies = [[tuple(d) for d in j] for j in dependencies]
+
+    def addJob(self, name, tasks, dependencyMode="Auto", useContextTable=False, costHint=1.0):
+        """ Adds a job, returning its index. """
+        self._jobs.append(
+            {
+                "name": name,
+                "dependencyMode": dependencyMode,
+                "useContextTable": useContextTable,
+                "costHint": costHint,
+                "dependencyType": "None",
+                "priorityOffset": 0,
+                "settings": None,
+                "tasks": [list(t) for t in tasks],
+                "taskOrder": list(range(0, len(tasks))),
+            }
+        )
+        self._dependencies.append([])
+
+        return len(self._jobs) - 1
+
+    def getJob(self, jobIndex):
+        return self._jobs[jobIndex]
+
+    def getJobs(self):
+        return self._jobs
+
+    def setDependencyType(self, jobIndex, dependencyType):
+        self._jobs[jobIndex]["dependencyType"] = dependencyType
+
+    def getDependencyType(self, jobIndex):
+        return self._jobs[jobIndex]["dependencyType"]
+
+    def setPriorityOffset(self, jobIndex, priorityOffset):
+        self._jobs[jobIndex]["priorityOffset"] = priorityOffset
+
+    def getPriorityOffset(self, jobIndex):
+        return self._jobs[jobIndex]["priorityOffset"]
+
+    def setTaskOrder(self, jobIndex, taskOrder):
+        """ Sets the order the tasks of a job are submitted in, so that task `i` is
+        submitted as the task at index `taskOrder[i]`.
+        """
+        if sorted(taskOrder) != list(range(0, len(self._jobs[jobIndex]["tasks"]))):
+            raise ValueError("Task order must include each task once.")
+
+        self._jobs[jobIndex]["taskOrder"] = list(taskOrder)
+
+    def getTaskOrder(self, jobIndex):
+        return self._jobs[jobIndex]["taskOrder"]
+
+    def setJobSettings(self, jobIndex, settings):
+        """ Sets the values used to encode the job and plugin info of a job, as a
+        dictionary of plain values. It holds the values of the job's Deadline settings,
+        keyed by the names of their plugs, and :
+
+        - "jobName" : the name of the Deadline job.
+        - "plugin" : the Deadline plugin to run.
+        - "pluginParameters" : the plugin info of jobs for plugins other than Gaffer's,
+          or None for Gaffer jobs.
+        - "script", "nodes" and "version" : the script and the names of the nodes
+          executed by Gaffer jobs, and the Gaffer version to run them with.
+        - "context" : the context arguments of jobs without a context table.
+        - "contextTable" : the file name of the job's context table, if it has one.
+        - "environmentProfile" : the file name of the job's environment profile, if
+          it has one.
+        - "contentStore" : the content store the plugin reads files from, if any.
+        """
+        self._jobs[jobIndex]["settings"] = dict(settings)
+
+    def getJobSettings(self, jobIndex):
+        return self._jobs[jobIndex]["settings"]
+
+    def jobInfo(self, jobIndex):
+        """ Returns the Deadline job info of a job with settings, apart from its
+        dependencies, which need the IDs of the submitted upstream jobs.
+        """
+        job = self._jobs[jobIndex]
+        settings = job["settings"]
+
+        if job["useContextTable"]:
+            # Tasks are numbered by their row in the context table.
+            frames, chunkSize = "0-{}".format(len(job["tasks"]) - 1), 1
+        else:
+            # To prevent Deadline from splitting up our tasks (since we've already done
+            # that based on batches), the chunk size is set to the largest frame range.
+            frames, chunkSize = DeadlineAlgo.frameListString(
+                [job["tasks"][i] for i in job["taskOrder"]]
+            )
+
+        return {
+            "Name": settings["jobName"],
+            "Frames": frames,
+            "ChunkSize": chunkSize,
+            "Plugin": settings["plugin"],
+            "BatchName": settings["batchName"],
+            "Comment": settings["comment"],
+            "Department": settings["department"],
+            "Pool": settings["pool"],
+            "SecondaryPool": settings["secondaryPool"],
+            "Group": settings["group"],
+            "Priority": min(100, settings["priority"] + job["priorityOffset"]),
+            "TaskTimeoutMinutes": int(settings["taskTimeout"]),
+            "EnableAutoTimeout": settings["enableAutoTimeout"],
+            "ConcurrentTasks": settings["concurrentTasks"],
+            "MachineLimit": settings["machineLimit"],
+            "Blacklist" if settings["isBlackList"] else "Whitelist": settings["machineList"],
+            "LimitGroups": settings["limits"],
+            "OnJobComplete": settings["onJobComplete"],
+            "InitialStatus": "Suspended" if settings["submitSuspended"] else "Active",
+        }
+
+    def pluginInfo(self, jobIndex):
+        """ Returns the Deadline plugin info of a job with settings. """
+        settings = self._jobs[jobIndex]["settings"]
+
+        if settings["pluginParameters"] is not None:
+            pluginInfo = dict(settings["pluginParameters"])
+            if settings["contextTable"]:
+                pluginInfo["ContextTable"] = settings["contextTable"]
+
+            return pluginInfo
+
+        pluginInfo = {
+            "Script": settings["script"],
+            "Version": settings["version"],
+            "IgnoreScriptLoadErrors": False,
+            "Nodes": settings["nodes"],
+            "Frames": "<STARTFRAME>-<ENDFRAME>",
+            "Threads": settings["threads"],
+        }
+        if settings["contextTable"]:
+            pluginInfo["ContextTable"] = settings["contextTable"]
+        elif settings["context"]:
+            pluginInfo["Context"] = settings["context"]
+        if settings["environmentProfile"]:
+            pluginInfo["EnvironmentProfile"] = settings["environmentProfile"]
+        if settings["contentStore"]:
+            pluginInfo["ContentStore"] = settings["contentStore"]
+
+        return pluginInfo
+
+    def addDependency(self, jobIndex, taskIndex, upstreamJobIndex, upstreamTaskIndex):
+        self._dependencies[jobIndex].append((taskIndex, upstreamJobIndex, upstreamTaskIndex))
+
+    def getDependencies(self, jobIndex):
+        return self._dependencies[jobIndex]
+
+    def getParentJobs(self, jobIndex):
+        """ Returns the indices of the jobs with tasks the job depends on. """
+        return sorted(set(d[1] for d in self._dependencies[jobIndex]))
+
+    def toDict(self):
+        return {
+            "jobs": [dict(j) for j in self._jobs],
+            "dependencies": [[list(d) for d in j] for j in self._dependencies],
+        }
+
+    @classmethod
+    def fromDict(cls, data):
+        return cls(data["jobs"], data["dependencies"])
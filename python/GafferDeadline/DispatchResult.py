@@ -0,0 +1,88 @@
+##########################################################################
+#
+#  Copyright (c) 2026, Hypothetical Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#      * Redistributions of source code must retain the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer.
+#
+#      * Redistributions in binary form must reproduce the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer in the documentation and/or other materials provided with
+#        the distribution.
+#
+#      * Neither the name of Hypothetical Inc. nor the names of
+#        any other contributors to this software may be used to endorse or
+#        promote products derived from this software without specific prior
+#        written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+##########################################################################
+
+
+class DispatchResult(object):
+    """ A lightweight summary of a Deadline dispatch, kept after the jobs used to
+    plan it have been released. It holds only plain Python data so it can be
+    serialised with `toDict()` and restored with `fromDict()`.
+
+    Each job is summarised by a dictionary holding its "name", "jobId", "tasks"
+    count, "dependencyType" and "planningTime" in seconds. Timings hold the
+    seconds spent in each phase of the dispatch.
+    """
+
+    def __init__(self, jobDirectory="", jobs=[], timings={}):
+        self._jobDirectory = jobDirectory
+        self._jobs = [dict(j) for j in jobs]
+        self._timings = dict(timings)
+
+    def getJobDirectory(self):
+        return self._jobDirectory
+
+    def addJob(self, name, jobId, tasks, dependencyType, planningTime):
+        self._jobs.append(
+            {
+                "name": name,
+                "jobId": jobId,
+                "tasks": tasks,
+                "dependencyType": dependencyType,
+                "planningTime": planningTime,
+            }
+        )
+
+    def getJobs(self):
+        return [dict(j) for j in self._jobs]
+
+    def getJobIds(self):
+        return [j["jobId"] for j in self._jobs]
+
+    def setTiming(self, phase, seconds):
+        self._timings[phase] = seconds
+
+    def getTimings(self):
+        return dict(self._timings)
+
+    def toDict(self):
+        return {
+            "jobDirectory": self._jobDirectory,
+            "jobs": self.getJobs(),
+            "timings": self.getTimings(),
+        }
+
+    @classmethod
+    def fromDict(cls, data):
+        return cls(data["jobDirectory"], data["jobs"], data["timings"])
@@ -44,6 +44,7 @@ import GafferDispatch
 import GafferScene
 
 from . import DeadlineTools
+from . import DeadlineAlgo
 from .GafferDeadlineTask import GafferDeadlineTask
 from .GafferDeadlineDependency import GafferDeadlineDependency
 
@@ -61,6 +62,23 @@ class GafferDeadlineJob(object):
         FrameToFrame = 2
         Scripted = 3
 
+    # Job properties Deadline assumes when they are left out of the job file.
+    # Properties with these values, or with empty values, aren't written.
+    _defaultJobProperties = {
+        "Priority": 50,
+        "ChunkSize": 1,
+        "TaskTimeoutMinutes": 0,
+        "EnableAutoTimeout": False,
+        "ConcurrentTasks": 1,
+        "MachineLimit": 0,
+        "OnJobComplete": "Nothing",
+        "InitialStatus": "Active",
+        "ResumeOnDeletedDependencies": False,
+        "IsFrameDependent": False,
+        "FrameDependencyOffsetStart": 0,
+        "FrameDependencyOffsetEnd": 0,
+    }
+
     def __init__(
         self,
         gafferNode,
@@ -79,6 +97,11 @@ class GafferDeadlineJob(object):
         self._deadlineSettings = deadlineSettings.copy()
         self._environmentVariables = environmentVariables.copy()
         self._jobId = None
+        self._useContextTable = False
+        self._environmentProfile = None
+        self._fusedNodes = []
+        self._frameParentJobs = []
+        self._planningTime = 0.0
         self._parentJobs = []
         self._tasks = []
         self._outputs = []
@@ -171,6 +194,25 @@ class GafferDeadlineJob(object):
     def getContext(self):
         return self._context
 
+    def setUseContextTable(self, useContextTable):
+        """ When enabled, the job holds batches from any number of contexts. Each task
+        is submitted to Deadline as a single frame numbered by its task number, which
+        indexes a table of frames and contexts read by the Gaffer plugin.
+        """
+        self._useContextTable = useContextTable
+
+    def getUseContextTable(self):
+        return self._useContextTable
+
+    def addPlanningTime(self, seconds):
+        """ Accumulates the time the dispatcher spent planning this job, excluding
+        the time spent on its upstream jobs.
+        """
+        self._planningTime += seconds
+
+    def getPlanningTime(self):
+        return self._planningTime
+
     def addOutput(self, output, context=Gaffer.Context()):
         self._outputs.append(
            context.substitute(
@@ -196,13 +238,33 @@ class GafferDeadlineJob(object):
     def getParentJobs(self):
         return self._parentJobs
 
+    def removeParentJob(self, parentJob):
+        """ Removes `parentJob` from the parent jobs, such as when it has already been
+        executed, so that none of our tasks depend on it.
+        """
+        self._parentJobs = [j for j in self._parentJobs if j is not parentJob]
+        self._frameParentJobs = [j for j in self._frameParentJobs if j is not parentJob]
+
+    def addFrameParentJob(self, parentJob):
+        """ Adds a parent job whose tasks aren't linked to ours through Gaffer batches,
+        such as one generated by the dispatcher. Each of our tasks depends on the tasks
+        of `parentJob` with frames in common.
+        """
+        self.addParentJob(parentJob)
+        if parentJob not in self._frameParentJobs:
+            self._frameParentJobs.append(parentJob)
+
+    def getFrameParentJobs(self):
+        return list(self._frameParentJobs)
+
     def getEffectiveParentJobs(self):
         jobs = []
         for j in self.getParentJobs():
             if not GafferDeadlineJob.isControlTask(j.getGafferNode()):
-                jobs.append(j)
+                newJobs = [j]
             else:
-                jobs += j.getEffectiveParentJobs()
+                newJobs = j.getEffectiveParentJobs()
+            jobs += [n for n in newJobs if n not in jobs]
 
         return jobs
 
@@ -219,6 +281,16 @@ class GafferDeadlineJob(object):
     def getEnvironmentVariables(self):
         return self._environmentVariables
 
+    def setEnvironmentProfile(self, profileFile):
+        """ When set, the environment variables are applied by the Gaffer plugin from
+        the shared `profileFile` instead of being written to the job file. The profile
+        file must also be included in the auxiliary files.
+        """
+        self._environmentProfile = profileFile
+
+    def getEnvironmentProfile(self):
+        return self._environmentProfile
+
     def appendDeadlineSetting(self, name, value):
         self._deadlineSettings[name] = value
 
@@ -262,27 +334,139 @@ class GafferDeadlineJob(object):
             self._tasks.append(GafferDeadlineTask(newBatch, 0))
 
     def getTasksForBatch(self, batch):
-        taskList = [t for t in self.getTasks() if t.getGafferBatch() == batch]
+        taskList = [t for t in self.getTasks() if batch in t.getGafferBatches()]
         return taskList
 
     def getTasks(self):
         return self._tasks
 
+    def fuseParentJob(self, parentJob):
+        """ Takes over the work of `parentJob`, which must be this job's only parent,
+        have the same tasks and have no other child jobs. Each task then executes the
+        nodes of the parent job before our own node, and the parents of `parentJob`
+        become our parents.
+        """
+        self._fusedNodes = (
+            parentJob.getFusedNodes() + [parentJob.getGafferNode()] + self._fusedNodes
+        )
+        self._parentJobs = list(parentJob.getParentJobs())
+        self._frameParentJobs = parentJob.getFrameParentJobs()
+        self.addPlanningTime(parentJob.getPlanningTime())
+
+    def getFusedNodes(self):
+        return list(self._fusedNodes)
+
+    def getGafferNodes(self):
+        """ Returns the nodes executed by each task of the job, in order. """
+        return self.getFusedNodes() + [self.getGafferNode()]
+
+    def splitTasks(self, taskGroups):
+        """ Keeps the first list of tasks in `taskGroups` and moves each of the others
+        to a new job for the same node and context, returning the new jobs. Tasks
+        are renumbered within their new job.
+        """
+        newJobs = []
+        for tasks in taskGroups[1:]:
+            newJob = GafferDeadlineJob(
+                self.getGafferNode(),
+                auxFiles=list(self.getAuxFiles()),
+                jobContext=self.getContext()
+            )
+            newJob.setUseContextTable(self.getUseContextTable())
+            newJob._fusedNodes = list(self._fusedNodes)
+            newJob._frameParentJobs = list(self._frameParentJobs)
+            for parentJob in self.getParentJobs():
+                newJob.addParentJob(parentJob)
+            newJob._tasks = list(tasks)
+            newJobs.append(newJob)
+
+        self._tasks = list(taskGroups[0])
+
+        for job in [self] + newJobs:
+            for i, task in enumerate(job.getTasks()):
+                task.setTaskNumber(i)
+
+        return newJobs
+
+    def chunkTasks(self, chunkSize):
+        """ Merges runs of tasks with consecutive frames into tasks of up to `chunkSize`
+        frames, and renumbers them. Tasks already longer than `chunkSize` are kept as
+        they are. Merged tasks render the frames of all their batches, and keep the
+        dependencies of each.
+        """
+        chunks = []
+        for task in self._tasks:
+            if len(chunks) > 0:
+                chunk = chunks[-1]
+                if (
+                    task.getStartFrame() is not None and
+                    chunk.getEndFrame() is not None and
+                    task.getStartFrame() == chunk.getEndFrame() + 1 and
+                    task.getEndFrame() - chunk.getStartFrame() + 1 <= chunkSize
+                ):
+                    chunk.setEndFrame(task.getEndFrame())
+                    for batch in task.getGafferBatches():
+                        chunk.addGafferBatch(batch)
+                    continue
+
+            chunks.append(task)
+
+        self._tasks = chunks
+        for i, task in enumerate(self._tasks):
+            task.setTaskNumber(i)
+
+    def tileTasks(self, tileCount):
+        """ Replaces each task with `tileCount` tasks rendering the same frames, one
+        for each tile of the image, and renumbers them. The tiles of a task are
+        consecutive, and each keeps the batches and so the dependencies of the task.
+        Tiles are identified by a context table row rather than by their frames, so
+        the job is switched to use a context table.
+        """
+        tiles = []
+        for task in self._tasks:
+            for tile in range(0, tileCount):
+                tiledTask = GafferDeadlineTask(
+                    task.getGafferBatch(),
+                    len(tiles),
+                    startFrame=task.getStartFrame(),
+                    endFrame=task.getEndFrame()
+                )
+                for batch in task.getGafferBatches():
+                    tiledTask.addGafferBatch(batch)
+                tiledTask.setTile(tile)
+                tiles.append(tiledTask)
+
+        self._tasks = tiles
+        self.setUseContextTable(True)
+
+    def reorderTasks(self, order):
+        """ Reorders the tasks of the job so that task `i` becomes the task at index
+        `order[i]`, and renumbers them. Deadline queues tasks by their number, so this
+        sets the order in which frames are rendered.
+        """
+        if sorted(order) != list(range(0, len(self._tasks))):
+            raise ValueError("Task order must include each task once.")
+
+        self._tasks = [self._tasks[i] for i in order]
+        for i, task in enumerate(self._tasks):
+            task.setTaskNumber(i)
+
     def __getParentBatches(self, batch):
         # Return the dependencies from a specific node, passing through the upstream nodes
-        # if this is a control node.
+        # if this is a control node or a node fused into this job.
         batches = []
+        if batch is None:
+            return batches
 
         effectiveParentJobs = self.getEffectiveParentJobs()
 
         for b in batch.preTasks():
-            if not GafferDeadlineJob.isControlTask(b.node()):
-                job = None
+            if not GafferDeadlineJob.isControlTask(b.node()) and b.node() not in self._fusedNodes:
+                # There may be more than one job for a node when it is dispatched
+                # in several contexts or its job has been split.
                 for j in effectiveParentJobs:
                     if j.getGafferNode() == b.node():
-                        job = j
-                if job is not None:
-                    batches.append((job, b))
+                        batches.append((j, b))
             else:
                 batches += self.__getParentBatches(b)
 
@@ -294,13 +478,18 @@ class GafferDeadlineJob(object):
 
         If any of our parents are control tasks, we inherit their dependencies because they
         will not be submitted to Deadline.
+
+        Tasks of frame parent jobs are linked by their frames instead.
         """
 
         effectiveParentJobs = []
 
         deps = {}
         for task in self.getTasks():
-            for parentJob, parentBatch in self.__getParentBatches(task.getGafferBatch()):
+            parentBatches = []
+            for batch in task.getGafferBatches():
+                parentBatches += self.__getParentBatches(batch)
+            for parentJob, parentBatch in parentBatches:
                 upstreamTasks = parentJob.getTasksForBatch(parentBatch)
                 for dep in upstreamTasks:
                     deps[hash(task) + hash(dep) + hash(self)] = GafferDeadlineDependency(
@@ -309,8 +498,63 @@ class GafferDeadlineJob(object):
                         dep
                     )
 
+            if task.getStartFrame() is None:
+                continue
+            for parentJob in self._frameParentJobs:
+                for dep in parentJob.getTasks():
+                    if (
+                        dep.getStartFrame() is not None and
+                        dep.getStartFrame() <= task.getEndFrame() and
+                        dep.getEndFrame() >= task.getStartFrame()
+                    ):
+                        deps[hash(task) + hash(dep) + hash(self)] = GafferDeadlineDependency(
+                            parentJob,
+                            task,
+                            dep
+                        )
+
         return deps
 
+    def getFrameDependencyGroups(self):
+        """ Returns the groups of tasks that can each use Deadline's native frame
+        dependencies, as a list of `(frameOffsetStart, frameOffsetEnd, tasks)` tuples
+        in frame order. Returns None if frame dependencies can't be used for this job.
+        See `DeadlineAlgo.frameDependencyOffsetGroups()` for details.
+        """
+        if self.getUseContextTable():
+            return None
+
+        tasks = self.getTasks()
+        if any(t.getStartFrame() is None or t.getEndFrame() is None for t in tasks):
+            return None
+
+        taskIndices = {id(t): i for i, t in enumerate(tasks)}
+        upstreamFrameRanges = [[] for t in tasks]
+
+        for d in self.getDependencies().values():
+            upstreamTask = d.getUpstreamDeadlineTask()
+            if (
+                d.getDeadlineJob().getUseContextTable() or
+                upstreamTask.getStartFrame() is None or
+                upstreamTask.getEndFrame() is None
+            ):
+                return None
+            upstreamFrameRanges[taskIndices[id(d.getDeadlineTask())]].append(
+                (upstreamTask.getStartFrame(), upstreamTask.getEndFrame())
+            )
+
+        groups = DeadlineAlgo.frameDependencyOffsetGroups(
+            [
+                (t.getStartFrame(), t.getEndFrame(), upstreamFrameRanges[i])
+                for i, t in enumerate(tasks)
+            ]
+        )
+
+        return [
+            (offsetStart, offsetEnd, [tasks[i] for i in indices])
+            for offsetStart, offsetEnd, indices in groups
+        ]
+
     @staticmethod
     def isControlTask(node):
         return type(node) in [
@@ -322,40 +566,47 @@ class GafferDeadlineJob(object):
             GafferScene.RenderPassWedge,
         ]
 
-    def submitJob(self, jobDirectory):
+    def submitJob(self, jobDirectory, checkAuxFiles=True):
         """ Submit the job to Deadline.
         Returns a tuple of (submittedJobId, deadlineStatusOutput). submittedJobId
         will be None if submission failed. deadlineStatusOutput can be used to help figure out
         why it failed.
 
         Check to make sure that all auxiliary files exist, otherwise submission will fail.
-        Job and plugin information are stored in temporary files that are deleted after submission.
-        Windows has a problem with allowing Python to hide the temp file from the OS,
-        so the delete=False argument must be passed.
+        Callers that have already checked them may pass `checkAuxFiles=False`.
+        Job and plugin information are stored in temporary files in `jobDirectory`, which are
+        left for the caller to remove after submission, as `DeadlineDispatcher` does with its
+        spool directory. Windows has a problem with allowing Python to hide the temp file from
+        the OS, so the delete=False argument must be passed.
 
         Job and plugin files are just serializations of their respective dictionaries in the
-        form of key=value separated by newlines.
+        form of key=value separated by newlines. Job properties Deadline would assume anyway
+        are left out to keep the job record small.
         """
-        for auxFile in self._auxFiles:
-            if not os.path.isfile(auxFile):
-                raise IOError("{} does not exist".format(auxFile))
+        if checkAuxFiles:
+            for auxFile in self._auxFiles:
+                if not os.path.isfile(auxFile):
+                    raise IOError("{} does not exist".format(auxFile))
 
         jobFile = tempfile.NamedTemporaryFile(mode="w", suffix=".job", delete=False, dir=jobDirectory)
 
         self._jobProperties.update(self._deadlineSettings)
         jobLines = [
-            "{}={}".format(k, self._jobProperties[k]) for k in self._jobProperties.keys()
+            "{}={}".format(k, v) for k, v in self._jobProperties.items()
+            if not self.__isDefaultJobProperty(k, v)
         ]
-        environmentVariableCounter = 0
-        for v in self._environmentVariables.keys():
-            jobLines.append(
-                "EnvironmentKeyValue{}={}={}".format(
-                    environmentVariableCounter,
-                    v,
-                    self._environmentVariables[v]
+        # Variables in a shared environment profile are applied by the Gaffer plugin.
+        if self._environmentProfile is None:
+            environmentVariableCounter = 0
+            for v in self._environmentVariables.keys():
+                jobLines.append(
+                    "EnvironmentKeyValue{}={}={}".format(
+                        environmentVariableCounter,
+                        v,
+                        self._environmentVariables[v]
+                    )
                 )
-            )
-            environmentVariableCounter += 1
+                environmentVariableCounter += 1
 
         outputCounter = 0
         for o in self.getOutputs():
@@ -387,3 +638,15 @@ class GafferDeadlineJob(object):
         self._jobId = result[0]
 
         return (self._jobId, result[1])
+
+    @staticmethod
+    def __isDefaultJobProperty(name, value):
+        if name == "Plugin":
+            return False
+        if str(value) == "":
+            return True
+
+        return (
+            name in GafferDeadlineJob._defaultJobProperties and
+            str(value).lower() == str(GafferDeadlineJob._defaultJobProperties[name]).lower()
+        )
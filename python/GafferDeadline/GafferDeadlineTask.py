@@ -44,10 +44,14 @@ class GafferDeadlineTask(object):
     """ Mimic the Deadline representation of a task:
     - tasks are a sequential range of frames indicated by the start frame and end frame
     - tasks can only be associated with one job and therefore one batch / Gaffer Task Node
+    - tasks merged by automatic chunking cover the frames of several consecutive batches
+      of that node
+    - tiled tasks render one tile of the frames of their batch
     """
     def __init__(self, gafferBatch, taskNumber, startFrame=None, endFrame=None):
         self._startFrame = None
         self._endFrame = None
+        self._tile = None
 
         self.setGafferBatch(gafferBatch)
         self.setStartFrame(startFrame)
@@ -67,15 +71,18 @@ class GafferDeadlineTask(object):
         h = IECore.MurmurHash()
 
         # hash the batch without the frame number as Gaffer does in Dispatcher::Batcher::batchHash
+        # Tasks generated by the dispatcher have no batch.
         b = self.getGafferBatch()
-        h.append(hash(b.plug()))
-        c = Gaffer.Context(b.context())
-        c.remove("frame")
-        h.append(c.hash())
+        if b is not None:
+            h.append(hash(b.plug()))
+            c = Gaffer.Context(b.context())
+            c.remove("frame")
+            h.append(c.hash())
 
         h.append(self.getStartFrame() if self.getStartFrame() is not None else 1)
         h.append(self.getEndFrame() if self.getEndFrame() is not None else 1)
         h.append(self.getTaskNumber())
+        h.append(self.getTile() if self.getTile() is not None else -1)
 
         return hash(h)
 
@@ -89,10 +96,33 @@ class GafferDeadlineTask(object):
     def setGafferBatch(self, gafferBatch):
         assert gafferBatch is None or type(gafferBatch) == GafferDispatch.Dispatcher._TaskBatch
         self._gafferBatch = gafferBatch
+        self._extraGafferBatches = []
 
     def getGafferBatch(self):
         return self._gafferBatch
 
+    def addGafferBatch(self, gafferBatch):
+        """ Adds a batch whose frames are also rendered by this task. """
+        assert type(gafferBatch) == GafferDispatch.Dispatcher._TaskBatch
+        if gafferBatch != self._gafferBatch and gafferBatch not in self._extraGafferBatches:
+            self._extraGafferBatches.append(gafferBatch)
+
+    def getGafferBatches(self):
+        """ Returns all of the batches rendered by this task. """
+        if self._gafferBatch is None:
+            return []
+        return [self._gafferBatch] + self._extraGafferBatches
+
+    def setTile(self, tile):
+        """ Sets the index of the tile rendered by this task, or None to render
+        the whole image.
+        """
+        assert tile is None or type(tile) == int
+        self._tile = tile
+
+    def getTile(self):
+        return self._tile
+
     def setFrameRange(self, startFrame, endFrame):
         if endFrame < startFrame:
             raise ValueError("End frame must be greater than start frame.")
@@ -40,5 +40,9 @@ from .GafferDeadlineTask import GafferDeadlineTask
 from .GafferDeadlineDependency import GafferDeadlineDependency
 from .DeadlineTools import *
 from .DeadlineTask import DeadlineTask
+from .DeadlineSettings import DeadlineSettings
+from .DispatchResult import DispatchResult
+from .DispatchGraph import DispatchGraph
+from . import DeadlineAlgo
 
 __import__("IECore").loadConfig("GAFFER_STARTUP_PATHS", {}, subdirectory="GafferDeadline")
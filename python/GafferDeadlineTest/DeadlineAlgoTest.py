@@ -0,0 +1,354 @@
+##########################################################################
+#
+#  Copyright (c) 2026, Hypothetical Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#      * Redistributions of source code must retain the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer.
+#
+#      * Redistributions in binary form must reproduce the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer in the documentation and/or other materials provided with
+#        the distribution.
+#
+#      * Neither the name of Hypothetical Inc. nor the names of
+#        any other contributors to this software may be used to endorse or
+#        promote products derived from this software without specific prior
+#        written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+##########################################################################
+
+import unittest
+
+import GafferTest
+
+import GafferDeadline
+
+
+class DeadlineAlgoTest(GafferTest.TestCase):
+    def testConstantFrameOffset(self):
+        tasks = [(f, f, [(f + 100, f + 100)]) for f in range(1, 51)]
+        groups = GafferDeadline.DeadlineAlgo.frameDependencyOffsetGroups(tasks)
+
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0][0], 100)
+        self.assertEqual(groups[0][1], 100)
+        self.assertEqual(groups[0][2], list(range(0, 50)))
+
+    def testMixedBatchSizes(self):
+        # Single frame tasks depending on tasks of 15 frames and a task of 50 frames
+        tasks = []
+        for f in range(1, 51):
+            start = ((f - 1) // 15) * 15 + 1
+            tasks.append((f, f, [(start, min(start + 14, 50)), (1, 50)]))
+
+        groups = GafferDeadline.DeadlineAlgo.frameDependencyOffsetGroups(tasks)
+
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0][0], 0)
+        self.assertEqual(groups[0][1], 0)
+
+    def testPiecewiseFrameOffset(self):
+        tasks = [(f, f, [(f, f)]) for f in range(1, 11)]
+        tasks += [(f, f, [(f + 100, f + 100)]) for f in range(11, 21)]
+        groups = GafferDeadline.DeadlineAlgo.frameDependencyOffsetGroups(tasks)
+
+        self.assertEqual(
+            [(g[0], g[1], g[2]) for g in groups],
+            [(0, 0, list(range(0, 10))), (100, 100, list(range(10, 20)))]
+        )
+
+    def testScaledFrameOffset(self):
+        # Every other upstream frame, with upstream tasks of 4 frames
+        tasks = []
+        for f in range(1, 9):
+            start = ((f * 2 - 1) // 4) * 4 + 1
+            tasks.append((f, f, [(start, start + 3)]))
+
+        groups = GafferDeadline.DeadlineAlgo.frameDependencyOffsetGroups(tasks)
+        self.assertEqual(len(groups), 2)
+
+        for offsetStart, offsetEnd, indices in groups:
+            for i in indices:
+                start, end, upstreamFrameRanges = tasks[i]
+                for upstreamStart, upstreamEnd in upstreamFrameRanges:
+                    self.assertLessEqual(start + offsetStart, upstreamEnd)
+                    self.assertGreaterEqual(end + offsetEnd, upstreamStart)
+
+    def testUnorderedTasks(self):
+        tasks = [(f, f, [(f + 10, f + 10)]) for f in range(10, 0, -1)]
+        groups = GafferDeadline.DeadlineAlgo.frameDependencyOffsetGroups(tasks)
+
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0][2], list(range(9, -1, -1)))
+
+    def testNoUpstreamTasks(self):
+        tasks = [(f, f, []) for f in range(1, 11)]
+        groups = GafferDeadline.DeadlineAlgo.frameDependencyOffsetGroups(tasks)
+
+        self.assertEqual(groups, [(0, 0, list(range(0, 10)))])
+
+        self.assertEqual(GafferDeadline.DeadlineAlgo.frameDependencyOffsetGroups([]), [])
+
+    def testPlanDependencyType(self):
+        #   n1   n2 (context table)
+        #   |    |
+        #   n3   n4
+        g = GafferDeadline.DispatchGraph()
+        n1 = g.addJob("n1", [(f, f) for f in range(1, 11)])
+        n2 = g.addJob("n2", [(None, None), (None, None)], useContextTable=True)
+        n3 = g.addJob("n3", [(f, f) for f in range(1, 11)])
+        n4 = g.addJob("n4", [(1, 1)])
+        for i in range(0, 10):
+            g.addDependency(n3, i, n1, i)
+        g.addDependency(n4, 0, n2, 1)
+
+        planDependencyType = GafferDeadline.DeadlineAlgo.planDependencyType
+
+        self.assertEqual(planDependencyType(g, n1), ("None", None, None))
+        self.assertEqual(planDependencyType(g, n3), ("FrameToFrame", 0, 0))
+        self.assertEqual(planDependencyType(g, n4), ("Scripted", None, None))
+
+        for mode, expected in [
+            ("None", ("None", None, None)),
+            ("Job", ("JobToJob", None, None)),
+            ("Frame", ("FrameToFrame", None, None)),
+            ("Script", ("Scripted", None, None)),
+        ]:
+            g.getJob(n3)["dependencyMode"] = mode
+            self.assertEqual(planDependencyType(g, n3), expected)
+
+        # Frame offsets that can't be handled by a single group need the script
+
+        g = GafferDeadline.DispatchGraph()
+        n1 = g.addJob("n1", [(f, f) for f in range(1, 21)])
+        n2 = g.addJob("n2", [(f, f) for f in range(1, 21)])
+        for i in range(0, 20):
+            g.addDependency(n2, i, n1, i if i < 10 else 19 - i)
+
+        self.assertEqual(planDependencyType(g, n2), ("Scripted", None, None))
+
+    def testGraphToDot(self):
+        graph = {
+            "jobs": [
+                {
+                    "id": 0,
+                    "name": "n1",
+                    "tasks": 2,
+                    "dependencyType": "None",
+                    "scriptDependencyKeys": 0,
+                    "planningTime": 0.001,
+                },
+                {
+                    "id": 1,
+                    "name": "box\"n2",
+                    "tasks": 4,
+                    "dependencyType": "Scripted",
+                    "scriptDependencyKeys": 4,
+                    "planningTime": 0.0025,
+                },
+            ],
+            "edges": [{"from": 0, "to": 1, "dependencies": 4}],
+        }
+
+        dot = GafferDeadline.DeadlineAlgo.graphToDot(graph)
+
+        self.assertTrue(dot.startswith("digraph DeadlineJobs {"))
+        self.assertTrue(dot.endswith("}\n"))
+        self.assertIn(
+            "\"0\" [label = \"n1\\nTasks : 2\\nDependencies : None\\nPlanning : 1.000 ms\"];",
+            dot
+        )
+        self.assertIn("box\\\"n2", dot)
+        self.assertIn("Scripted (4 keys)", dot)
+        self.assertIn("\"0\" -> \"1\" [label = \"4\"];", dot)
+
+    def testCriticalPathSlack(self):
+        #   0   1
+        #    \ /
+        #     2   3
+        length, slack = GafferDeadline.DeadlineAlgo.criticalPathSlack(
+            [10.0, 2.0, 5.0, 1.0],
+            [[], [], [0, 1], []]
+        )
+
+        self.assertEqual(length, 15.0)
+        self.assertEqual(slack, [0.0, 8.0, 0.0, 14.0])
+
+        self.assertEqual(
+            GafferDeadline.DeadlineAlgo.criticalPathPriorityOffsets(
+                [10.0, 2.0, 5.0, 1.0],
+                [[], [], [0, 1], []],
+                20
+            ),
+            [20, 9, 20, 1]
+        )
+
+        self.assertEqual(GafferDeadline.DeadlineAlgo.criticalPathSlack([], []), (0.0, []))
+        self.assertEqual(
+            GafferDeadline.DeadlineAlgo.criticalPathPriorityOffsets([0.0, 0.0], [[], [0]], 20),
+            [0, 0]
+        )
+
+        with self.assertRaises(ValueError):
+            GafferDeadline.DeadlineAlgo.criticalPathSlack([1.0, 1.0], [[1], [0]])
+
+    def testTaskOrder(self):
+        frameRanges = [(f, f) for f in range(1, 10)]
+
+        def frames(strategy):
+            return [
+                frameRanges[i][0]
+                for i in GafferDeadline.DeadlineAlgo.taskOrder(frameRanges, strategy)
+            ]
+
+        self.assertEqual(frames("Ascending"), [1, 2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(frames("FirstMiddleLast"), [1, 5, 9, 2, 3, 4, 6, 7, 8])
+        self.assertEqual(frames("Binary"), [1, 9, 5, 3, 7, 2, 4, 6, 8])
+
+        # Tasks are ordered by frame before applying the strategy
+        frameRanges.reverse()
+        self.assertEqual(frames("FirstMiddleLast"), [1, 5, 9, 2, 3, 4, 6, 7, 8])
+
+        self.assertEqual(
+            GafferDeadline.DeadlineAlgo.taskOrder([(1, 5), (6, 6), (7, 11)], "LongestFirst"),
+            [0, 2, 1]
+        )
+
+        for strategy in ["Ascending", "FirstMiddleLast", "Binary", "LongestFirst"]:
+            self.assertEqual(GafferDeadline.DeadlineAlgo.taskOrder([], strategy), [])
+            self.assertEqual(GafferDeadline.DeadlineAlgo.taskOrder([(1, 1)], strategy), [0])
+            self.assertEqual(
+                GafferDeadline.DeadlineAlgo.taskOrder([(2, 2), (1, 1)], strategy),
+                [1, 0]
+            )
+
+        with self.assertRaises(ValueError):
+            GafferDeadline.DeadlineAlgo.taskOrder(frameRanges, "Random")
+
+    def testAutoChunkSize(self):
+        autoChunkSize = GafferDeadline.DeadlineAlgo.autoChunkSize
+
+        # One wave of tasks across all slots
+        self.assertEqual(autoChunkSize(1000, 50, 30.0, 60.0), 20)
+        # Without startup time, all wave counts take as long, so fewer tasks are preferred
+        self.assertEqual(autoChunkSize(1000, 50, 0.0, 60.0), 20)
+        # Fewer frames than slots
+        self.assertEqual(autoChunkSize(10, 50, 30.0, 60.0), 1)
+        # A single slot runs everything in one task
+        self.assertEqual(autoChunkSize(1000, 1, 30.0, 60.0), 1000)
+        self.assertEqual(autoChunkSize(1000, 0, 30.0, 60.0), 1000)
+        self.assertEqual(autoChunkSize(0, 50, 30.0, 60.0), 1)
+
+        # 100 frames on 10 slots : 10 tasks of 10 frames take 660 seconds, while
+        # 20 tasks of 5 frames take two waves of 360 seconds.
+        self.assertEqual(autoChunkSize(100, 10, 60.0, 60.0), 10)
+
+    def testFrameListString(self):
+        frameListString = GafferDeadline.DeadlineAlgo.frameListString
+
+        self.assertEqual(frameListString([(f, f) for f in range(1, 101)]), ("1-100", 1))
+        self.assertEqual(
+            frameListString([(f, f + 9) for f in range(1, 101, 10)]),
+            ("1-100", 10)
+        )
+        self.assertEqual(frameListString([(f, f) for f in range(1, 101, 3)]), ("1-100x3", 1))
+        self.assertEqual(
+            frameListString([(1, 1), (2, 2), (4, 4), (6, 6), (8, 8), (9, 9)]),
+            ("1-2,4-8x2,9", 1)
+        )
+        # Task order is kept
+        self.assertEqual(
+            frameListString([(1, 1), (5, 5), (3, 3), (2, 2), (4, 4)]),
+            ("1,5,3,2,4", 1)
+        )
+        # Only tasks of the chunk size can be merged
+        self.assertEqual(
+            frameListString([(1, 5), (6, 10), (11, 12), (13, 17), (20, 24), (25, 25)]),
+            ("1-10,11-12,13-17,20-24,25", 5)
+        )
+        self.assertEqual(frameListString([(7, 7)]), ("7", 1))
+        self.assertEqual(frameListString([]), ("", 1))
+
+    @GafferTest.TestRunner.PerformanceTestMethod()
+    def testFrameListStringPerformance(self):
+        frameRanges = [(f, f) for f in range(1, 200000, 2)] + [(f, f) for f in range(2, 200000, 2)]
+
+        with GafferTest.TestRunner.PerformanceScope():
+            GafferDeadline.DeadlineAlgo.frameListString(frameRanges)
+
+    def testScriptDependencyKeys(self):
+        scriptDependencyKeys = GafferDeadline.DeadlineAlgo.scriptDependencyKeys
+
+        # Task to task
+        self.assertEqual(
+            scriptDependencyKeys([(i, "a", i) for i in range(0, 3)], 3, {"a": 3}),
+            [("0:a", "0"), ("1:a", "1"), ("2:a", "2")]
+        )
+
+        # Every task waiting on every upstream task collapses to one key
+        self.assertEqual(
+            scriptDependencyKeys(
+                [(i, "a", j) for i in range(0, 3) for j in range(0, 100)],
+                3,
+                {"a": 100}
+            ),
+            [("*:a", "*")]
+        )
+
+        # Fan-in for some tasks only, with a second upstream job needing task granularity
+        self.assertEqual(
+            scriptDependencyKeys(
+                [(0, "a", j) for j in range(0, 4)] + [(1, "a", 0), (1, "a", 2)] +
+                [(0, "b", 1), (1, "b", 1)],
+                2,
+                {"a": 4, "b": 2}
+            ),
+            [("0:a", "*"), ("1:a", "0,2"), ("0:b", "1"), ("1:b", "1")]
+        )
+
+        self.assertEqual(scriptDependencyKeys([], 3, {}), [])
+
+    def testTileCropWindows(self):
+        tileCropWindows = GafferDeadline.DeadlineAlgo.tileCropWindows
+
+        self.assertEqual(tileCropWindows(1, 1), [((0.0, 0.0), (1.0, 1.0))])
+        self.assertEqual(
+            tileCropWindows(2, 2),
+            [
+                ((0.0, 0.0), (0.5, 0.5)),
+                ((0.5, 0.0), (1.0, 0.5)),
+                ((0.0, 0.5), (0.5, 1.0)),
+                ((0.5, 0.5), (1.0, 1.0)),
+            ]
+        )
+
+        # Neighbouring tiles share their edges
+        windows = tileCropWindows(3, 1)
+        self.assertEqual(len(windows), 3)
+        for i in range(1, 3):
+            self.assertEqual(windows[i][0][0], windows[i - 1][1][0])
+        self.assertEqual(windows[-1][1], (1.0, 1.0))
+
+        with self.assertRaises(ValueError):
+            tileCropWindows(0, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
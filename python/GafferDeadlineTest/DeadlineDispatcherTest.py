@@ -34,9 +34,15 @@
 #
 ##########################################################################
 
+import os
+import json
+import tempfile
+import threading
 import unittest
 from unittest import mock
 
+import imath
+
 import IECore
 
 import IECore
@@ -45,6 +51,7 @@ import Gaffer
 import GafferTest
 import GafferDispatch
 import GafferDispatchTest
+import GafferScene
 
 import GafferDeadline
 
@@ -994,223 +1001,1785 @@ class DeadlineDispatcherTest(GafferTest.TestCase):
                 self.assertEqual(len(j.getDependencies()), 0)
                 self.assertEqual(len(j.getTasks()), 50)
 
-    def testControlTaskDependency(self):
-        #   n1 (LoggingTaskNode)
+    def testSplitFrameDependency(self):
+        #   n1
         #   |
-        #   m1 (FrameMask)
+        #   c1 ---- e1
         #   |
-        #   w1 (Wedge)
-
+        #   n2
         s = Gaffer.ScriptNode()
 
         s["n1"] = GafferDispatchTest.LoggingTaskNode()
         s["n1"]["frame"] = Gaffer.StringPlug(
-            defaultValue="${wedge:value}.${frame}",
+            defaultValue="${frame}",
             flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
         )
+        s["n1"]["dispatcher"]["batchSize"].setValue(1)
 
-        s["m1"] = GafferDispatch.FrameMask()
-        s["m1"]["mask"].setValue("1-10")
-        s["m1"]["preTasks"][0].setInput(s["n1"]["task"])
+        s["c1"] = GafferDispatch.TaskContextVariables()
+        s["c1"]["variables"].addChild(
+            Gaffer.NameValuePlug(
+                "frame",
+                IECore.FloatData(0.0),
+                True,
+                "member1",
+                Gaffer.Plug.Direction.In,
+                Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+            )
+        )
+        s["c1"]["dispatcher"]["batchSize"].setValue(1)
+        s["c1"]["preTasks"][0].setInput(s["n1"]["task"])
 
-        s["w1"] = GafferDispatch.Wedge()
-        s["w1"]["mode"].setValue(int(GafferDispatch.Wedge.Mode.StringList))
-        s["w1"]["strings"].setValue(IECore.StringVectorData(["a", "b", "c"]))
-        s["w1"]["preTasks"][0].setInput(s["m1"]["task"])
+        s["e"] = Gaffer.Expression()
+        s["e"].setExpression(
+            'f = context.getFrame()\n'
+            'parent["c1"]["variables"]["member1"]["value"] = f if f <= 10 else f + 100',
+            "python"
+        )
+
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["frame"] = Gaffer.StringPlug(
+            defaultValue="${frame}",
+            flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+        )
+        s["n2"]["dispatcher"]["batchSize"].setValue(1)
+        s["n2"]["preTasks"][0].setInput(s["c1"]["task"])
 
         dispatcher = self.__dispatcher()
         dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
-        dispatcher["frameRange"].setValue("1-50")
+        dispatcher["frameRange"].setValue("1-20")
 
         with mock.patch(
             "GafferDeadline.DeadlineTools.submitJob",
             return_value=("testID", "testMessage")
         ):
-            jobs = self.__job([s["w1"]], dispatcher)
+            jobs = self.__job([s["n2"]], dispatcher)
 
-        self.assertEqual(len(jobs), 3)  # A LoggingTaskNode per Wedge entry
+        self.assertEqual(len(jobs), 3)
+        n2Jobs = sorted(
+            [j for j in jobs if j.getJobProperties()["Name"] == "n2"],
+            key=lambda j: j.getTasks()[0].getStartFrame()
+        )
+        self.assertEqual(len(n2Jobs), 2)
+        for j, offset, startFrame in [(n2Jobs[0], 0, 1), (n2Jobs[1], 100, 11)]:
+            self.assertEqual(len(j.getTasks()), 10)
+            self.assertEqual(len(j.getDependencies()), 10)
+            self.assertEqual(j.getTasks()[0].getTaskNumber(), 0)
+            self.assertEqual(j.getTasks()[0].getStartFrame(), startFrame)
+            self.assertEqual(
+                j.getDependencyType(),
+                GafferDeadline.GafferDeadlineJob.DeadlineDependencyType.FrameToFrame
+            )
+            self.assertEqual(j.getJobProperties()["FrameDependencyOffsetStart"], offset)
+            self.assertEqual(j.getJobProperties()["FrameDependencyOffsetEnd"], offset)
+
+        # Disabling splitting falls back to the dependency script
+
+        dispatcher["frameDependencySplitLimit"].setValue(1)
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n2"]], dispatcher)
+
+        self.assertEqual(len(jobs), 2)
         for j in jobs:
-            if j.getJobProperties()["Name"] == "n1":
-                self.assertEqual(len(j.getDependencies()), 0)
-                self.assertEqual(len(j.getTasks()), 10)
+            if j.getJobProperties()["Name"] == "n2":
+                self.assertEqual(
+                    j.getDependencyType(),
+                    GafferDeadline.GafferDeadlineJob.DeadlineDependencyType.Scripted
+                )
+
+    def testExportGraph(self):
+        #   n1
+        #   |
+        #   n2
 
-    def testNoOpBatch(self):
-        #    n1
-        #    |
-        #    t1
-        #    |
-        #    n2
         s = Gaffer.ScriptNode()
 
         s["n1"] = GafferDispatchTest.LoggingTaskNode()
-        s["n1"]["frame"] = Gaffer.StringPlug(
-            defaultValue="${frame}",
-            flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
-        )
-
-        s["t1"] = GafferDispatch.TaskList()
-        s["t1"]["dispatcher"]["batchSize"].setValue(10)
-        s["t1"]["preTasks"][0].setInput(s["n1"]["task"])
-
+        s["n1"]["dispatcher"]["batchSize"].setValue(1)
         s["n2"] = GafferDispatchTest.LoggingTaskNode()
-        s["n2"]["frame"] = Gaffer.StringPlug(
-            defaultValue="${frame}",
-            flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
-        )
-        s["n2"]["preTasks"][0].setInput(s["t1"]["task"])
+        s["n2"]["dispatcher"]["batchSize"].setValue(1)
+        s["n2"]["dispatcher"]["deadline"]["dependencyMode"].setValue("Job")
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
 
         dispatcher = self.__dispatcher()
         dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
-        dispatcher["frameRange"].setValue("1-50")
+        dispatcher["frameRange"].setValue("1-5")
+        dispatcher["exportGraph"].setValue(True)
 
         with mock.patch(
             "GafferDeadline.DeadlineTools.submitJob",
             return_value=("testID", "testMessage")
-        ), IECore.CapturingMessageHandler() as mh:
-            dispatcher.dispatch([s["n2"]])
-            warnings = [i for i in mh.messages if i.level == IECore.Msg.Level.Warning]
-            self.assertEqual(len(warnings), 50)
-            for warning in warnings:
-                self.assertEqual(
-                    warning.message,
-                    "No-Op node t1 has a batch size greater than 1 which will be ignored."
-                )
+        ):
+            jobs = self.__job([s["n2"]], dispatcher)
 
-    def testContext(self):
-        s = Gaffer.ScriptNode()
+        self.assertEqual(len(jobs), 2)
 
-        s["n"] = GafferDispatchTest.LoggingTaskNode()
-        s["n"]["dispatcher"]["deadline"]["comment"].setValue("${wedge:value}")
-        s["n"]["dispatcher"]["deadline"]["deadlineSettings"].addChild(
-            Gaffer.NameValuePlug(
-                "Name",
-                IECore.StringData("${wedge:value}"),
-                True,
-                "member1",
-                Gaffer.Plug.Direction.In,
-                Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
-            )
-        )
-        s["n"]["dispatcher"]["deadline"]["environmentVariables"].addChild(
-            Gaffer.NameValuePlug(
-                "Index",
-                IECore.StringData("${wedge:index}"),
-                True,
-                "member2",
-                Gaffer.Plug.Direction.In,
-                Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
-            )
+        with open(
+            os.path.join(dispatcher.jobDirectory(), "deadlineGraph.json"),
+            encoding="utf-8"
+        ) as f:
+            graph = json.load(f)
+
+        graphJobs = {j["name"]: j for j in graph["jobs"]}
+        self.assertEqual(set(graphJobs.keys()), {"n1", "n2"})
+        self.assertEqual(graphJobs["n1"]["tasks"], 5)
+        self.assertEqual(graphJobs["n1"]["dependencyType"], "None")
+        self.assertEqual(graphJobs["n2"]["dependencyType"], "JobToJob")
+        self.assertEqual(graphJobs["n2"]["scriptDependencyKeys"], 0)
+        for j in graph["jobs"]:
+            self.assertGreater(j["planningTime"], 0.0)
+
+        self.assertEqual(
+            graph["edges"],
+            [{"from": graphJobs["n1"]["id"], "to": graphJobs["n2"]["id"], "dependencies": 5}]
         )
 
-        s["w"] = GafferDispatch.Wedge()
-        s["w"]["preTasks"][0].setInput(s["n"]["task"])
-        s["w"]["mode"].setValue(GafferDispatch.Wedge.Mode.StringList)
-        s["w"]["strings"].setValue(IECore.StringVectorData(["I'mAName"]))
+        with open(
+            os.path.join(dispatcher.jobDirectory(), "deadlineGraph.dot"),
+            encoding="utf-8"
+        ) as f:
+            self.assertTrue(f.read().startswith("digraph"))
 
-        s["d"] = GafferDeadline.DeadlineDispatcher()
-        s["d"]["preTasks"][0].setInput(s["w"]["task"])
+    def testDispatchResult(self):
+        #   n1
+        #   |
+        #   n2
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+
+        dispatcher = self.__dispatcher()
+        self.assertIsNone(dispatcher.dispatchResult())
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-5")
 
         with mock.patch(
             "GafferDeadline.DeadlineTools.submitJob",
             return_value=("testID", "testMessage")
         ):
-            jobs = self.__job([s["w"]])
+            self.__job([s["n2"]], dispatcher)
+
+        # The planning graph is held by the dispatch rather than the dispatcher
+        self.assertFalse(hasattr(dispatcher, "_deadlineJobs"))
+
+        result = dispatcher.dispatchResult()
+        self.assertEqual(result.getJobDirectory(), dispatcher.jobDirectory())
+        jobs = {j["name"]: j for j in result.getJobs()}
+        self.assertEqual(set(jobs.keys()), {"n1", "n2"})
+        self.assertEqual(jobs["n1"]["jobId"], "testID")
+        self.assertEqual(jobs["n1"]["tasks"], 5)
+        self.assertEqual(jobs["n1"]["dependencyType"], "None")
+        self.assertEqual(jobs["n2"]["dependencyType"], "FrameToFrame")
+        self.assertEqual(
+            set(result.getTimings().keys()),
+            {
+                "serialise", "build", "local", "plan", "scriptWrite", "scriptWait",
+                "scriptOverlap", "preSpool", "preflight", "submit", "firstSubmit", "postSubmit",
+                "total"
+            }
+        )
+        timings = result.getTimings()
+        self.assertAlmostEqual(
+            timings["scriptOverlap"],
+            max(0.0, timings["scriptWrite"] - timings["scriptWait"])
+        )
 
-        self.assertEqual(len(jobs), 1)
-        self.assertEqual(jobs[0].getJobProperties()["Name"], "I'mAName")
-        self.assertEqual(jobs[0].getEnvironmentVariables()["Index"], "0")
-        self.assertEqual(jobs[0].getJobProperties()["Comment"], "I'mAName")
+        with open(os.path.join(dispatcher.jobDirectory(), "untitled.gfr")) as f:
+            self.assertEqual(f.read(), s.serialise())
+
+    def testHookSignals(self):
+        #   n1
+        #   |
+        #   n2
 
-    def testExtra(self):
         s = Gaffer.ScriptNode()
 
-        s["n"] = GafferDispatchTest.LoggingTaskNode()
-        s["n"]["dispatcher"]["deadline"]["deadlineSettings"].addChild(
-            Gaffer.NameValuePlug(
-                "Name",
-                IECore.StringData("NotLittleDebbie"),
-                True,
-                "member1",
-                Gaffer.Plug.Direction.In,
-                Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+
+        dispatcher = self.__dispatcher()
+
+        calls = []
+
+        def preSpoolBatch(dispatcher, jobs):
+            calls.append("preSpoolBatch")
+            self.assertEqual(
+                sorted(j.getGafferNode().getName() for j in jobs),
+                ["n1", "n2"]
             )
-        )
-        s["n"]["dispatcher"]["deadline"]["environmentVariables"].addChild(
-            Gaffer.NameValuePlug(
-                "Index",
-                IECore.StringData("1000"),
-                True,
-                "member2",
-                Gaffer.Plug.Direction.In,
-                Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+            for j in jobs:
+                self.assertEqual(j.getJobID(), None)
+                j.appendEnvironmentVariable("BATCH_HOOK", "1")
+
+        def preSpool(dispatcher, job):
+            calls.append("preSpool")
+            self.assertEqual(job.getEnvironmentVariables()["BATCH_HOOK"], "1")
+
+        def postSubmit(dispatcher, jobs, dispatchResult):
+            calls.append("postSubmit")
+            self.assertEqual([j.getJobID() for j in jobs], ["testID", "testID"])
+            self.assertEqual(
+                sorted(j["name"] for j in dispatchResult.getJobs()),
+                ["n1", "n2"]
             )
+            self.assertIn("submit", dispatchResult.getTimings())
+            self.assertNotIn("total", dispatchResult.getTimings())
+
+        def dispatchComplete(dispatcher, dispatchResult):
+            calls.append("dispatchComplete")
+            self.assertIs(dispatchResult, dispatcher.dispatchResult())
+            self.assertIn("postSubmit", dispatchResult.getTimings())
+            self.assertIn("total", dispatchResult.getTimings())
+
+        preSpoolBatchConnection = GafferDeadline.DeadlineDispatcher.preSpoolBatchSignal().connect(
+            preSpoolBatch, scoped=True
         )
-        s["n"]["dispatcher"]["deadline"]["extraDeadlineSettings"].setValue(
-            {
-                "Name": IECore.StringData("LittleDebbie"),
-                "MachineName": IECore.StringData("Francis"),
-            }
+        preSpoolConnection = GafferDeadline.DeadlineDispatcher.preSpoolSignal().connect(
+            preSpool, scoped=True
         )
-        s["n"]["dispatcher"]["deadline"]["extraEnvironmentVariables"].setValue(
-            {
-                "Index": IECore.IntData(0),
-                "ARNOLD_ROOT": IECore.StringData("/arnoldRoot"),
-            }
+        postSubmitConnection = GafferDeadline.DeadlineDispatcher.postSubmitSignal().connect(
+            postSubmit, scoped=True
         )
-
-        s["d"] = GafferDeadline.DeadlineDispatcher()
-        s["d"]["preTasks"][0].setInput(s["n"]["task"])
+        dispatchCompleteSignal = GafferDeadline.DeadlineDispatcher.dispatchCompleteSignal()
+        dispatchCompleteConnection = dispatchCompleteSignal.connect(dispatchComplete, scoped=True)
 
         with mock.patch(
             "GafferDeadline.DeadlineTools.submitJob",
             return_value=("testID", "testMessage")
         ):
-            jobs = self.__job([s["n"]])
+            dispatcher.dispatch([s["n2"]])
 
-        self.assertEqual(len(jobs), 1)
-        self.assertEqual(jobs[0].getJobProperties()["Name"], "LittleDebbie")
-        self.assertEqual(jobs[0].getJobProperties()["MachineName"], "Francis")
-        self.assertEqual(jobs[0].getEnvironmentVariables()["Index"], "0")
-        self.assertEqual(jobs[0].getEnvironmentVariables()["ARNOLD_ROOT"], "/arnoldRoot")
+        self.assertEqual(
+            calls,
+            ["preSpoolBatch", "preSpool", "preSpool", "postSubmit", "dispatchComplete"]
+        )
 
-    def testName(self):
-        s = Gaffer.ScriptNode()
+        del preSpoolBatchConnection, preSpoolConnection
+        del postSubmitConnection, dispatchCompleteConnection
 
-        s["n"] = GafferDispatchTest.LoggingTaskNode()
+    def testConcurrentDispatch(self):
+        # Two scripts of
+        #   n1
+        #   |
+        #   n2
+        # dispatched from separate threads by the same dispatcher
 
-        s["d"] = GafferDeadline.DeadlineDispatcher()
-        s["d"]["jobsDirectory"].setValue(self.temporaryDirectory() / "testJobDirectory")
-        s["d"]["preTasks"][0].setInput(s["n"]["task"])
+        scripts = []
+        for name in ["a", "b"]:
+            s = Gaffer.ScriptNode()
+            s["fileName"].setValue(str(self.temporaryDirectory() / "{}.gfr".format(name)))
+            s["n1"] = GafferDispatchTest.LoggingTaskNode()
+            s["n2"] = GafferDispatchTest.LoggingTaskNode()
+            s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+            scripts.append(s)
 
-        with mock.patch(
-            "GafferDeadline.DeadlineTools.submitJob",
-            return_value=("testID", "testMessage")
-        ):
-            jobs = self.__job([s["n"]], dispatcher=s["d"])
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-50")
 
-        self.assertEqual(jobs[0].getJobProperties()["Name"], "n")
+        batches = []
 
-        s["d"]["jobName"].setValue("Harvey")
-        with mock.patch(
-            "GafferDeadline.DeadlineTools.submitJob",
-            return_value=("testID", "testMessage")
-        ):
-            jobs = self.__job([s["n"]], dispatcher=s["d"])
+        def preSpoolBatch(dispatcher, jobs):
+            batches.append(jobs)
 
-        self.assertEqual(jobs[0].getJobProperties()["Name"], "Harvey.n")
+        c = GafferDeadline.DeadlineDispatcher.preSpoolBatchSignal().connect(
+            preSpoolBatch, scoped=True
+        )
 
-        s["n"]["dispatcher"]["deadline"]["extraDeadlineSettings"].setValue(
-            {
-                "Name": IECore.StringData("LittleDebbie"),
-            }
+        results = []
+
+        def dispatchComplete(dispatcher, dispatchResult):
+            results.append(dispatchResult)
+
+        c2 = GafferDeadline.DeadlineDispatcher.dispatchCompleteSignal().connect(
+            dispatchComplete, scoped=True
         )
+
+        errors = []
+
+        def dispatch(s):
+            try:
+                dispatcher.dispatch([s["n2"]])
+            except Exception as e:
+                errors.append(e)
+
         with mock.patch(
             "GafferDeadline.DeadlineTools.submitJob",
             return_value=("testID", "testMessage")
         ):
-            jobs = self.__job([s["n"]], dispatcher=s["d"])
+            threads = [threading.Thread(target=dispatch, args=(s,)) for s in scripts]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        del c, c2
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(batches), 2)
+        for jobs in batches:
+            self.assertEqual(len(jobs), 2)
+            self.assertEqual(
+                len(set(j.getGafferNode().scriptNode()["fileName"].getValue() for j in jobs)),
+                1
+            )
+            for j in jobs:
+                self.assertEqual(len(j.getTasks()), 50)
 
-        self.assertEqual(jobs[0].getJobProperties()["Name"], "LittleDebbie")
+        fileNames = [
+            jobs[0].getGafferNode().scriptNode()["fileName"].getValue() for jobs in batches
+        ]
+        self.assertEqual(sorted(fileNames), sorted(s["fileName"].getValue() for s in scripts))
+
+        # Each dispatch writes its script to its own job directory
+        self.assertEqual(len(results), 2)
+        jobDirectories = [r.getJobDirectory() for r in results]
+        self.assertNotEqual(jobDirectories[0], jobDirectories[1])
+        self.assertEqual(
+            sorted(os.listdir(d)[0] for d in jobDirectories),
+            ["a.gfr", "b.gfr"]
+        )
+        for d in jobDirectories:
+            self.assertEqual(len(os.listdir(d)), 1)
+
+    def testStreamingSubmission(self):
+        #   n1
+        #   |
+        #   n2
+        #   |
+        #   n3
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+        s["n3"] = GafferDispatchTest.LoggingTaskNode()
+        s["n3"]["preTasks"][0].setInput(s["n2"]["task"])
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-5")
+
+        spooled = []
+        lastJobSpooled = threading.Event()
+
+        def preSpool(dispatcher, job):
+            spooled.append(job)
+            if job.getGafferNode() == s["n3"]:
+                lastJobSpooled.set()
+
+        c = GafferDeadline.DeadlineDispatcher.preSpoolSignal().connect(preSpool, scoped=True)
+
+        submitted = []
+        firstSubmissionOverlapped = []
+
+        def submitJob(jobFile, pluginFile, auxFiles):
+            # The first job is still being submitted while the last is spooled
+            if not submitted:
+                firstSubmissionOverlapped.append(lastJobSpooled.wait(10))
+            submitted.append(jobFile)
+            return ("testID{}".format(len(submitted)), "testMessage")
+
+        with mock.patch("GafferDeadline.DeadlineTools.submitJob", side_effect=submitJob):
+            dispatcher.dispatch([s["n3"]])
+
+        del c
+
+        self.assertEqual(firstSubmissionOverlapped, [True])
+        self.assertEqual(len(submitted), 3)
+        self.assertEqual([j.getGafferNode() for j in spooled], [s["n1"], s["n2"], s["n3"]])
+        self.assertEqual([j.getJobID() for j in spooled], ["testID1", "testID2", "testID3"])
+        self.assertEqual(spooled[1].getJobProperties()["JobDependencies"], "testID1")
+        self.assertEqual(spooled[2].getJobProperties()["JobDependencies"], "testID2")
+
+        self.assertIn("firstSubmit", dispatcher.dispatchResult().getTimings())
+
+    def testSubmissionFailure(self):
+        #   n1  n2
+        #    \ /
+        #     n3
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n3"] = GafferDispatchTest.LoggingTaskNode()
+        s["n3"]["preTasks"][0].setInput(s["n1"]["task"])
+        s["n3"]["preTasks"][1].setInput(s["n2"]["task"])
+
+        dispatcher = self.__dispatcher()
+
+        submitted = []
+
+        def submitJob(jobFile, pluginFile, auxFiles):
+            with open(jobFile, encoding="utf-8") as f:
+                submitted.append(f.read())
+            if len(submitted) == 1:
+                return (None, "testFailure")
+            return ("testID", "testMessage")
+
+        with mock.patch("GafferDeadline.DeadlineTools.submitJob", side_effect=submitJob):
+            with self.assertRaisesRegex(RuntimeError, "testFailure"):
+                dispatcher.dispatch([s["n3"]])
+
+        # Nothing is submitted after the first failure, so n3 never goes out
+        # without the job it depends on.
+        self.assertEqual(len(submitted), 1)
+        self.assertIsNone(dispatcher.dispatchResult())
+
+    def testSpoolDirectory(self):
+        s = Gaffer.ScriptNode()
+        s["n"] = GafferDispatchTest.LoggingTaskNode()
+
+        submissionFiles = []
+
+        def submitJob(jobFile, pluginFile, auxFiles):
+            self.assertTrue(os.path.isfile(jobFile))
+            self.assertTrue(os.path.isfile(pluginFile))
+            submissionFiles.append((jobFile, pluginFile))
+            return ("testID", "testMessage")
+
+        dispatcher = self.__dispatcher()
+        self.assertEqual(dispatcher["spoolDirectory"].getValue(), "")
+
+        with mock.patch("GafferDeadline.DeadlineTools.submitJob", side_effect=submitJob):
+            dispatcher.dispatch([s["n"]])
+
+        # Defaults to the system temporary directory
+        self.assertEqual(
+            os.path.dirname(os.path.dirname(submissionFiles[0][0])),
+            tempfile.gettempdir()
+        )
+
+        spoolDirectory = self.temporaryDirectory() / "spool"
+        dispatcher["spoolDirectory"].setValue(spoolDirectory)
+
+        with mock.patch("GafferDeadline.DeadlineTools.submitJob", side_effect=submitJob):
+            dispatcher.dispatch([s["n"]])
+
+        jobFile, pluginFile = submissionFiles[1]
+        self.assertEqual(os.path.dirname(os.path.dirname(jobFile)), str(spoolDirectory))
+        self.assertEqual(os.path.dirname(jobFile), os.path.dirname(pluginFile))
+
+        # Submission files are removed with the spool directory of each dispatch,
+        # and nothing but the script is written to the job directory.
+        for jobFile, pluginFile in submissionFiles:
+            self.assertFalse(os.path.exists(os.path.dirname(jobFile)))
+        self.assertEqual(os.listdir(spoolDirectory), [])
+        self.assertEqual(os.listdir(dispatcher.jobDirectory()), ["untitled.gfr"])
+
+    def testContentStore(self):
+        #   n1
+        #   |
+        #   n2
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+
+        contentStore = str(self.temporaryDirectory() / "contentStore")
+
+        dispatcher = self.__dispatcher()
+        dispatcher["contentStore"].setValue(contentStore)
+
+        submissions = []
+
+        def submitJob(jobFile, pluginFile, auxFiles):
+            with open(pluginFile, encoding="utf-8") as f:
+                pluginInfo = dict(line.split("=", 1) for line in f.read().split("\n"))
+            submissions.append((pluginInfo, list(auxFiles)))
+            return ("testID", "testMessage")
+
+        with mock.patch("GafferDeadline.DeadlineTools.submitJob", side_effect=submitJob):
+            dispatcher.dispatch([s["n2"]])
+
+        # The script is stored once by the hash of its contents, and read by the
+        # plugin from the store rather than being copied with each job.
+        self.assertEqual(len(submissions), 2)
+        scriptHashes = os.listdir(contentStore)
+        self.assertEqual(len(scriptHashes), 1)
+        scriptFile = os.path.join(contentStore, scriptHashes[0], "untitled.gfr")
+        with open(scriptFile, encoding="utf-8") as f:
+            self.assertEqual(f.read(), s.serialise())
+
+        for pluginInfo, auxFiles in submissions:
+            self.assertEqual(pluginInfo["ContentStore"], contentStore)
+            self.assertEqual(
+                pluginInfo["Script"],
+                os.path.join(scriptHashes[0], "untitled.gfr")
+            )
+            self.assertNotIn(scriptFile, auxFiles)
+
+        self.assertFalse(
+            os.path.exists(os.path.join(dispatcher.jobDirectory(), "untitled.gfr"))
+        )
+
+        # An unchanged script isn't written again
+
+        os.utime(scriptFile, (0, 0))
+        with mock.patch("GafferDeadline.DeadlineTools.submitJob", side_effect=submitJob):
+            dispatcher.dispatch([s["n2"]])
+
+        self.assertEqual(os.listdir(contentStore), scriptHashes)
+        self.assertEqual(os.path.getmtime(scriptFile), 0)
+
+        # A changed script is stored alongside it
+
+        s["n3"] = GafferDispatchTest.LoggingTaskNode()
+        with mock.patch("GafferDeadline.DeadlineTools.submitJob", side_effect=submitJob):
+            dispatcher.dispatch([s["n2"]])
+
+        self.assertEqual(len(os.listdir(contentStore)), 2)
+        self.assertEqual(
+            submissions[-1][0]["Script"],
+            os.path.join(
+                (set(os.listdir(contentStore)) - set(scriptHashes)).pop(),
+                "untitled.gfr"
+            )
+        )
+
+    def testContentStoreGeneratedNodes(self):
+        # Scripts with generated nodes are stored under the same paths each time
+        # an unchanged script is dispatched.
+
+        s = Gaffer.ScriptNode()
+
+        s["sphere"] = GafferScene.Sphere()
+        for name in ["render1", "render2", "render3"]:
+            s[name] = GafferScene.Render()
+            s[name]["renderer"].setValue("testRenderer")
+            s[name]["in"].setInput(s["sphere"]["out"])
+            GafferDeadline.DeadlineSettings.overrideSetting(s[name], "tiles").setValue(
+                imath.V2i(2, 1)
+            )
+
+        contentStore = str(self.temporaryDirectory() / "contentStore")
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1")
+        dispatcher["contentStore"].setValue(contentStore)
+
+        def dispatch():
+            scripts = {}
+
+            def submitJob(jobFile, pluginFile, auxFiles):
+                with open(jobFile, encoding="utf-8") as f:
+                    jobInfo = dict(line.split("=", 1) for line in f.read().split("\n"))
+                with open(pluginFile, encoding="utf-8") as f:
+                    pluginInfo = dict(line.split("=", 1) for line in f.read().split("\n"))
+                scripts[jobInfo["Name"]] = pluginInfo["Script"]
+                return ("testID", "testMessage")
+
+            with mock.patch("GafferDeadline.DeadlineTools.submitJob", side_effect=submitJob):
+                with IECore.CapturingMessageHandler():
+                    dispatcher.dispatch([s["render1"], s["render2"], s["render3"]])
+
+            return scripts
+
+        scripts = dispatch()
+        self.assertEqual(set(scripts.keys()), {"render1", "render2", "render3"})
+        self.assertEqual(len(set(scripts.values())), 3)
+
+        for i in range(0, 3):
+            self.assertEqual(dispatch(), scripts)
+
+        self.assertEqual(len(os.listdir(contentStore)), 3)
+
+    def testPreflightChecks(self):
+        #   n1
+        #   |
+        #   n2
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n1"]["dispatcher"]["deadline"]["auxFiles"].setValue(
+            IECore.StringVectorData([str(self.temporaryDirectory() / "missing.txt")])
+        )
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+
+        dispatcher = self.__dispatcher()
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ) as submitJob:
+            with self.assertRaisesRegex(RuntimeError, "missing.txt does not exist"):
+                self.__job([s["n2"]], dispatcher)
+
+        # No jobs are submitted when the checks fail
+        submitJob.assert_not_called()
+
+        auxFile = self.temporaryDirectory() / "present.txt"
+        with open(auxFile, "w", encoding="utf-8") as f:
+            f.write("test")
+        s["n1"]["dispatcher"]["deadline"]["auxFiles"].setValue(
+            IECore.StringVectorData([str(auxFile)])
+        )
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ) as submitJob:
+            jobs = self.__job([s["n2"]], dispatcher)
+
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(submitJob.call_count, 2)
+
+    def testFuseTaskChains(self):
+        #   n1
+        #   |
+        #   n2  n4
+        #    \  /
+        #     n3
+
+        s = Gaffer.ScriptNode()
+
+        for name in ["n1", "n2", "n3", "n4"]:
+            s[name] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+        s["n3"]["preTasks"][0].setInput(s["n2"]["task"])
+        s["n3"]["preTasks"][1].setInput(s["n4"]["task"])
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-5")
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n3"]], dispatcher)
+
+        self.assertEqual(len(jobs), 4)
+
+        dispatcher["fuseTaskChains"].setValue(True)
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n3"]], dispatcher)
+
+        self.assertEqual(len(jobs), 3)
+        jobs = {j.getJobProperties()["Name"]: j for j in jobs}
+        self.assertEqual(set(jobs.keys()), {"n2", "n3", "n4"})
+
+        self.assertEqual(jobs["n2"].getPluginProperties()["Nodes"], "n1 n2")
+        self.assertEqual(jobs["n2"].getGafferNodes(), [s["n1"], s["n2"]])
+        self.assertEqual(jobs["n2"].getParentJobs(), [])
+        self.assertEqual(len(jobs["n2"].getTasks()), 5)
+        self.assertEqual(
+            jobs["n2"].getDependencyType(),
+            GafferDeadline.GafferDeadlineJob.DeadlineDependencyType._None
+        )
+
+        self.assertEqual(jobs["n3"].getPluginProperties()["Nodes"], "n3")
+        self.assertEqual(len(jobs["n3"].getDependencies()), 10)
+        self.assertEqual(
+            jobs["n3"].getDependencyType(),
+            GafferDeadline.GafferDeadlineJob.DeadlineDependencyType.FrameToFrame
+        )
+
+        # Differing Deadline settings prevent fusion
+
+        s["n1"]["dispatcher"]["deadline"]["priority"].setValue(60)
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n3"]], dispatcher)
+
+        self.assertEqual(len(jobs), 4)
+
+    def testPruneScripts(self):
+        #   n1  n3
+        #   |
+        #   n2
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+        s["n3"] = GafferDispatchTest.LoggingTaskNode()
+
+        s["frameNode"] = GafferTest.AddNode()
+        s["n2"]["frame"] = Gaffer.StringPlug(
+            flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+        )
+        s["e"] = Gaffer.Expression()
+        s["e"].setExpression(
+            'parent["n2"]["frame"] = str(parent["frameNode"]["sum"])',
+            "python"
+        )
+
+        dispatcher = self.__dispatcher()
+        dispatcher["pruneScripts"].setValue(True)
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n2"], s["n3"]], dispatcher)
+
+        self.assertEqual(len(jobs), 3)
+
+        for job in jobs:
+            scriptFiles = [f for f in job.getAuxFiles() if f.endswith(".gfr")]
+            self.assertEqual(len(scriptFiles), 1)
+            self.assertEqual(
+                os.path.basename(scriptFiles[0]),
+                job.getPluginProperties()["Script"]
+            )
+            self.assertNotEqual(os.path.dirname(scriptFiles[0]), dispatcher.jobDirectory())
+
+            name = job.getJobProperties()["Name"]
+            script = Gaffer.ScriptNode()
+            script.executeFile(scriptFiles[0])
+            self.assertIn(name, script)
+            for other in {"n1", "n2", "n3"} - {name}:
+                self.assertNotIn(other, script)
+            if name == "n2":
+                self.assertIn("frameNode", script)
+                self.assertIn("e", script)
+            else:
+                self.assertNotIn("frameNode", script)
+                self.assertNotIn("e", script)
+
+    def testScriptDependencyFanIn(self):
+        #   n1
+        #   |
+        #   n2
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n1"]["dispatcher"]["batchSize"].setValue(1)
+
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["dispatcher"]["deadline"]["dependencyMode"].setValue("Script")
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-5")
+
+        def scriptKeys():
+            with mock.patch(
+                "GafferDeadline.DeadlineTools.submitJob",
+                return_value=("testID", "testMessage")
+            ), mock.patch.dict(
+                os.environ,
+                {"DEADLINE_DEPENDENCY_SCRIPT_PATH": str(self.temporaryDirectory() / "dep.py")}
+            ):
+                jobs = self.__job([s["n2"]], dispatcher)
+
+            jobProperties = {
+                j.getJobProperties()["Name"]: j.getJobProperties() for j in jobs
+            }["n2"]
+            return sorted(v for k, v in jobProperties.items() if k.startswith("ExtraInfoKeyValue"))
+
+        # One task waiting on every upstream task needs a single key
+        s["n2"]["dispatcher"]["batchSize"].setValue(5)
+        self.assertEqual(scriptKeys(), ["*:testID=*"])
+
+        # Task to task dependencies keep a key for each task
+        s["n2"]["dispatcher"]["batchSize"].setValue(1)
+        self.assertEqual(scriptKeys(), ["{0}:testID={0}".format(i) for i in range(0, 5)])
+
+    def testAutoChunk(self):
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n1"]["dispatcher"]["batchSize"].setValue(1)
+        s["n1"]["dispatcher"]["deadline"]["pool"].setValue("renderPool")
+        GafferDeadline.DeadlineSettings.overrideSetting(s["n1"], "frameTime").setValue(60.0)
+
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["dispatcher"]["batchSize"].setValue(1)
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-10")
+        dispatcher["taskStartupTime"].setValue(30.0)
+
+        def dispatch():
+            with mock.patch(
+                "GafferDeadline.DeadlineTools.submitJob",
+                return_value=("testID", "testMessage")
+            ), mock.patch(
+                "GafferDeadline.DeadlineTools.getWorkerCount",
+                return_value=2
+            ) as getWorkerCount:
+                jobs = self.__job([s["n2"]], dispatcher)
+
+            return {j.getJobProperties()["Name"]: j for j in jobs}, getWorkerCount
+
+        jobs, getWorkerCount = dispatch()
+        self.assertEqual(len(jobs["n1"].getTasks()), 10)
+        getWorkerCount.assert_not_called()
+
+        # Two Workers render 10 frames quickest as two tasks of 5 frames.
+        GafferDeadline.DeadlineSettings.overrideSetting(s["n1"], "autoChunk").setValue(True)
+        jobs, getWorkerCount = dispatch()
+        getWorkerCount.assert_called_with("renderPool", "")
+
+        self.assertEqual(
+            [(t.getStartFrame(), t.getEndFrame()) for t in jobs["n1"].getTasks()],
+            [(1, 5), (6, 10)]
+        )
+        self.assertEqual(jobs["n1"].getJobProperties()["Frames"], "1-10")
+        self.assertEqual(jobs["n1"].getJobProperties()["ChunkSize"], 5)
+        self.assertEqual(len(jobs["n2"].getTasks()), 10)
+
+        dependencies = jobs["n2"].getDependencies().values()
+        self.assertEqual(len(dependencies), 10)
+        for d in dependencies:
+            upstreamTask = d.getUpstreamDeadlineTask()
+            self.assertLessEqual(upstreamTask.getStartFrame(), d.getDeadlineTask().getStartFrame())
+            self.assertGreaterEqual(upstreamTask.getEndFrame(), d.getDeadlineTask().getEndFrame())
+
+        # Concurrent tasks add slots.
+        s["n1"]["dispatcher"]["deadline"]["concurrentTasks"].setValue(5)
+        jobs, getWorkerCount = dispatch()
+        self.assertEqual(len(jobs["n1"].getTasks()), 10)
+
+        # A failed query for one pool doesn't stop jobs in other pools being chunked,
+        # and isn't repeated for each job in the same pool.
+        s["n1"]["dispatcher"]["deadline"]["concurrentTasks"].setValue(1)
+        s["n2"]["dispatcher"]["deadline"]["pool"].setValue("otherPool")
+        GafferDeadline.DeadlineSettings.overrideSetting(s["n2"], "autoChunk").setValue(True)
+        s["n3"] = GafferDispatchTest.LoggingTaskNode()
+        s["n3"]["dispatcher"]["batchSize"].setValue(1)
+        s["n3"]["dispatcher"]["deadline"]["pool"].setValue("otherPool")
+        GafferDeadline.DeadlineSettings.overrideSetting(s["n3"], "autoChunk").setValue(True)
+
+        def getWorkerCount(pool, group):
+            if pool == "otherPool":
+                raise RuntimeError("testFailure")
+            return 2
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ), mock.patch(
+            "GafferDeadline.DeadlineTools.getWorkerCount",
+            side_effect=getWorkerCount
+        ) as getWorkerCountMock, IECore.CapturingMessageHandler() as mh:
+            jobs = self.__job([s["n3"], s["n2"]], dispatcher)
+
+        self.assertEqual(
+            [m.message for m in mh.messages if m.level == IECore.Msg.Level.Warning],
+            ["Unable to query Workers for automatic chunking : testFailure"]
+        )
+
+        jobs = {j.getJobProperties()["Name"]: j for j in jobs}
+        self.assertEqual(len(jobs["n1"].getTasks()), 2)
+        self.assertEqual(len(jobs["n2"].getTasks()), 10)
+        self.assertEqual(len(jobs["n3"].getTasks()), 10)
+        self.assertEqual(
+            [c.args for c in getWorkerCountMock.call_args_list].count(("otherPool", "")),
+            1
+        )
+
+    def testFrameOrder(self):
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n1"]["dispatcher"]["batchSize"].setValue(1)
+
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["dispatcher"]["batchSize"].setValue(1)
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-5")
+
+        for frameOrder, frames, frameString in [
+            ("Ascending", [1, 2, 3, 4, 5], "1-5"),
+            ("FirstMiddleLast", [1, 3, 5, 2, 4], "1-5x2,2,4"),
+            ("Binary", [1, 5, 3, 2, 4], "1,5,3,2,4"),
+        ]:
+            with self.subTest(frameOrder=frameOrder):
+                GafferDeadline.DeadlineSettings.overrideSetting(s["n2"], "frameOrder").setValue(
+                    frameOrder
+                )
+
+                with mock.patch(
+                    "GafferDeadline.DeadlineTools.submitJob",
+                    return_value=("testID", "testMessage")
+                ):
+                    jobs = self.__job([s["n2"]], dispatcher)
+
+                jobs = {j.getJobProperties()["Name"]: j for j in jobs}
+                self.assertEqual(jobs["n1"].getJobProperties()["Frames"], "1-5")
+                self.assertEqual(jobs["n2"].getJobProperties()["Frames"], frameString)
+
+                tasks = jobs["n2"].getTasks()
+                self.assertEqual([t.getStartFrame() for t in tasks], frames)
+                self.assertEqual([t.getTaskNumber() for t in tasks], list(range(0, 5)))
+
+                self.assertEqual(
+                    jobs["n2"].getDependencyType(),
+                    GafferDeadline.GafferDeadlineJob.DeadlineDependencyType.FrameToFrame
+                )
+
+                dependencies = jobs["n2"].getDependencies().values()
+                self.assertEqual(len(dependencies), 5)
+                for d in dependencies:
+                    self.assertIs(tasks[d.getDeadlineTask().getTaskNumber()], d.getDeadlineTask())
+                    self.assertEqual(
+                        d.getDeadlineTask().getStartFrame(),
+                        d.getUpstreamDeadlineTask().getStartFrame()
+                    )
+
+    def testSceneCache(self):
+        #     sphere
+        #    /      \
+        #   w1      w2
+
+        s = Gaffer.ScriptNode()
+
+        s["sphere"] = GafferScene.Sphere()
+        for name in ["w1", "w2"]:
+            s[name] = GafferScene.SceneWriter()
+            s[name]["in"].setInput(s["sphere"]["out"])
+            s[name]["fileName"].setValue(
+                str(self.temporaryDirectory() / "{}.####.scc".format(name))
+            )
+            s[name]["dispatcher"]["deadline"]["pool"].setValue("renderPool")
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-3")
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["w1"], s["w2"]], dispatcher)
+
+        self.assertEqual(len(jobs), 2)
+
+        GafferDeadline.DeadlineSettings.overrideSetting(s["w1"], "sceneCache").setValue(True)
+        GafferDeadline.DeadlineSettings.overrideSetting(s["w2"], "sceneCache").setValue(True)
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["w1"], s["w2"]], dispatcher)
+
+        self.assertEqual(len(jobs), 3)
+        jobs = {j.getJobProperties()["Name"]: j for j in jobs}
+        self.assertEqual(set(jobs.keys()), {"w1", "w2", "__deadlineSceneCache0"})
+
+        cacheJob = jobs["__deadlineSceneCache0"]
+        self.assertEqual(len(cacheJob.getTasks()), 3)
+        self.assertEqual(cacheJob.getJobProperties()["Pool"], "renderPool")
+        self.assertEqual(cacheJob.getPluginProperties()["Nodes"], "__deadlineSceneCache0")
+        cacheFile = os.path.join(
+            dispatcher.jobDirectory(),
+            "sceneCaches",
+            "__deadlineSceneCache0.####.scc"
+        )
+        self.assertEqual(cacheJob.getOutputs(), [cacheFile])
+
+        cacheScript = Gaffer.ScriptNode()
+        cacheScript.executeFile(cacheJob.getAuxFiles()[0])
+        self.assertTrue(
+            cacheScript["__deadlineSceneCache0"]["in"].getInput().isSame(
+                cacheScript["sphere"]["out"]
+            )
+        )
+        self.assertEqual(cacheScript["__deadlineSceneCache0"]["fileName"].getValue(), cacheFile)
+
+        for name in ["w1", "w2"]:
+            self.assertIn(cacheJob, jobs[name].getParentJobs())
+            self.assertEqual(len(jobs[name].getDependencies()), 3)
+            self.assertEqual(
+                jobs[name].getDependencyType(),
+                GafferDeadline.GafferDeadlineJob.DeadlineDependencyType.FrameToFrame
+            )
+
+            script = Gaffer.ScriptNode()
+            script.executeFile(jobs[name].getAuxFiles()[0])
+            self.assertTrue(
+                script[name]["in"].getInput().isSame(
+                    script["__deadlineSceneCacheReader0"]["out"]
+                )
+            )
+            self.assertEqual(
+                script["__deadlineSceneCacheReader0"]["fileName"].getValue(),
+                cacheFile
+            )
+
+        # A single task per frame doesn't need a cache
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["w1"]], dispatcher)
+
+        self.assertEqual(len(jobs), 1)
+
+    def testTiles(self):
+        #   n1
+        #   |
+        #   n2
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-2")
+
+        s["n1"]["dispatcher"]["deadline"]["pool"].setValue("renderPool")
+        GafferDeadline.DeadlineSettings.overrideSetting(s["n1"], "tiles").setValue(imath.V2i(2, 2))
+
+        # Nodes that don't crop to each tile would render the whole image for every tile
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ) as submitJob:
+            self.assertRaisesRegex(
+                RuntimeError,
+                "deadline:tileCropWindow",
+                dispatcher.dispatch,
+                [s["n2"]]
+            )
+        submitJob.assert_not_called()
+
+        s["n1"]["cropWindow"] = Gaffer.StringPlug(
+            defaultValue="${deadline:tileCropWindow}",
+            flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+        )
+
+        # Without file names, the tiles are rendered but not assembled
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            with IECore.CapturingMessageHandler() as mh:
+                jobs = self.__job([s["n2"]], dispatcher)
+
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(len([m for m in mh.messages if "tile assembly" in m.message]), 1)
+        jobs = {j.getJobProperties()["Name"]: j for j in jobs}
+        self.assertEqual(len(jobs["n1"].getTasks()), 8)
+        self.assertEqual(len(jobs["n2"].getTasks()), 2)
+
+        GafferDeadline.DeadlineSettings.overrideSetting(s["n1"], "tileFileName").setValue(
+            str(self.temporaryDirectory() / "tile${deadline:tile}.####.exr")
+        )
+        GafferDeadline.DeadlineSettings.overrideSetting(s["n1"], "tileAssemblyFileName").setValue(
+            str(self.temporaryDirectory() / "image.####.exr")
+        )
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n2"]], dispatcher)
+
+        self.assertEqual(len(jobs), 3)
+        jobs = {j.getJobProperties()["Name"]: j for j in jobs}
+        self.assertEqual(set(jobs.keys()), {"n1", "n2", "__deadlineTileAssembly0"})
+
+        tileJob = jobs["n1"]
+        self.assertTrue(tileJob.getUseContextTable())
+        self.assertEqual(tileJob.getJobProperties()["Frames"], "0-7")
+
+        tableFile = [
+            f for f in tileJob.getAuxFiles() if (
+                os.path.basename(f) == tileJob.getPluginProperties()["ContextTable"]
+            )
+        ][0]
+        with open(tableFile, encoding="utf-8") as f:
+            rows = json.load(f)["rows"]
+
+        self.assertEqual([r["frames"] for r in rows], ["1-1"] * 4 + ["2-2"] * 4)
+        for i, row in enumerate(rows):
+            self.assertIn("\"-deadline:tile\" \"{}\"".format(i % 4), row["context"])
+            self.assertIn("\"-deadline:tileCropWindow\"", row["context"])
+
+        assemblyJob = jobs["__deadlineTileAssembly0"]
+        self.assertEqual(len(assemblyJob.getTasks()), 2)
+        self.assertEqual(assemblyJob.getJobProperties()["Pool"], "renderPool")
+        self.assertEqual(
+            assemblyJob.getPluginProperties()["Nodes"],
+            "__deadlineTileAssembly0"
+        )
+        self.assertIn(tileJob, assemblyJob.getParentJobs())
+        self.assertEqual(len(assemblyJob.getDependencies()), 8)
+
+        # The downstream job waits for the assembled image
+        self.assertIn(assemblyJob, jobs["n2"].getParentJobs())
+
+        assemblyScript = Gaffer.ScriptNode()
+        assemblyScript.executeFile(assemblyJob.getAuxFiles()[0])
+        self.assertTrue(
+            assemblyScript["__deadlineTileAssembly0"]["fileName"].getInput().isSame(
+                assemblyScript["n1"]["dispatcher"]["deadline"]["tileAssemblyFileName"]
+            )
+        )
+        for tile in range(0, 4):
+            tileVariables = assemblyScript["__deadlineTile0_{}".format(tile)]
+            self.assertTrue(
+                assemblyScript["__deadlineTileMerge0"]["in"][tile].getInput().isSame(
+                    tileVariables["out"]
+                )
+            )
+            self.assertEqual(tileVariables["variables"][0]["value"].getValue(), tile)
+
+    def testTilesFromProfile(self):
+        s = Gaffer.ScriptNode()
+
+        s["p"] = GafferDeadline.DeadlineSettings()
+        s["p"]["deadline"]["tiles"].setValue(imath.V2i(2, 1))
+        s["p"]["deadline"]["tileFileName"].setValue(
+            str(self.temporaryDirectory() / "tile${deadline:tile}.####.exr")
+        )
+        s["p"]["deadline"]["tileAssemblyFileName"].setValue(
+            str(self.temporaryDirectory() / "image.####.exr")
+        )
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n1"]["cropWindow"] = Gaffer.StringPlug(
+            defaultValue="${deadline:tileCropWindow}",
+            flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+        )
+        s["n1"]["dispatcher"]["deadline"]["profile"].setInput(s["p"]["out"])
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1")
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n1"]], dispatcher)
+
+        jobs = {j.getJobProperties()["Name"]: j for j in jobs}
+        self.assertEqual(set(jobs.keys()), {"n1", "__deadlineTileAssembly0"})
+        self.assertEqual(len(jobs["n1"].getTasks()), 2)
+
+        # The assembly job reads and writes the files named by the profile
+
+        assemblyScript = Gaffer.ScriptNode()
+        assemblyScript.executeFile(jobs["__deadlineTileAssembly0"].getAuxFiles()[0])
+        self.assertTrue(
+            assemblyScript["__deadlineTileReader0"]["fileName"].getInput().isSame(
+                assemblyScript["p"]["deadline"]["tileFileName"]
+            )
+        )
+        self.assertTrue(
+            assemblyScript["__deadlineTileAssembly0"]["fileName"].getInput().isSame(
+                assemblyScript["p"]["deadline"]["tileAssemblyFileName"]
+            )
+        )
+        with Gaffer.Context(assemblyScript.context()) as c:
+            c["deadline:tile"] = 1
+            self.assertEqual(
+                assemblyScript["__deadlineTileReader0"]["fileName"].getValue(),
+                str(self.temporaryDirectory() / "tile1.####.exr")
+            )
+
+    def testTileCropWindow(self):
+        s = Gaffer.ScriptNode()
+
+        s["sphere"] = GafferScene.Sphere()
+        s["render"] = GafferScene.Render()
+        s["render"]["renderer"].setValue("testRenderer")
+        s["render"]["in"].setInput(s["sphere"]["out"])
+        GafferDeadline.DeadlineSettings.overrideSetting(s["render"], "tiles").setValue(
+            imath.V2i(2, 2)
+        )
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1")
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            with IECore.CapturingMessageHandler() as mh:
+                jobs = self.__job([s["render"]], dispatcher)
+
+        self.assertEqual(len([m for m in mh.messages if "tile assembly" in m.message]), 1)
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(len(jobs[0].getTasks()), 4)
+
+        # The job script crops the rendered scene to the tile of each task
+
+        scriptFiles = [f for f in jobs[0].getAuxFiles() if f.endswith(".gfr")]
+        self.assertEqual(len(scriptFiles), 1)
+        script = Gaffer.ScriptNode()
+        script.executeFile(scriptFiles[0])
+
+        crop = script["__deadlineTileCrop0"]
+        self.assertTrue(script["render"]["in"].getInput().isSame(crop["out"]))
+        self.assertTrue(crop["in"].getInput().isSame(script["sphere"]["out"]))
+        self.assertTrue(crop["options"]["renderCropWindow"]["enabled"].getValue())
+
+        for minimum, maximum in GafferDeadline.DeadlineAlgo.tileCropWindows(2, 2):
+            cropWindow = imath.Box2f(imath.V2f(*minimum), imath.V2f(*maximum))
+            with Gaffer.Context(script.context()) as c:
+                c["deadline:tileCropWindow"] = cropWindow
+                self.assertEqual(
+                    crop["options"]["renderCropWindow"]["value"].getValue(),
+                    cropWindow
+                )
+
+    def testFarmDispatch(self):
+        #   n1
+        #   |
+        #   n2
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+        s["n2"]["dispatcher"]["deadline"]["pool"].setValue("dispatchPool")
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-100")
+        dispatcher["farmDispatch"].setValue(True)
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n2"]], dispatcher)
+
+        self.assertEqual(len(jobs), 1)
+        bootstrapJob = jobs[0]
+        self.assertEqual(len(bootstrapJob.getTasks()), 1)
+        self.assertEqual(bootstrapJob.getJobProperties()["Pool"], "dispatchPool")
+        self.assertEqual(bootstrapJob.getPluginProperties()["Nodes"], "__deadlineBootstrap")
+        self.assertEqual(
+            [j["name"] for j in dispatcher.dispatchResult().getJobs()],
+            [bootstrapJob.getJobProperties()["Name"]]
+        )
+
+        bootstrapScript = Gaffer.ScriptNode()
+        bootstrapScript.executeFile(bootstrapJob.getAuxFiles()[0])
+        self.assertIn("n1", bootstrapScript)
+        self.assertIn("n2", bootstrapScript)
+
+        # Running the bootstrap job dispatches the nodes with our settings
+
+        farmJobs = []
+        farmDispatchers = []
+
+        def f(dispatcher, job):
+            farmJobs.append(job)
+            farmDispatchers.append(dispatcher)
+
+        c = GafferDeadline.DeadlineDispatcher.preSpoolSignal().connect(f, scoped=True)
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            bootstrapScript["__deadlineBootstrap"]["task"].execute()
+
+        del c
+
+        self.assertEqual(
+            sorted(j.getJobProperties()["Name"] for j in farmJobs),
+            ["n1", "n2"]
+        )
+        self.assertFalse(farmDispatchers[0]["farmDispatch"].getValue())
+        self.assertEqual(farmDispatchers[0]["frameRange"].getValue(), "1-100")
+        self.assertEqual(
+            farmDispatchers[0]["jobsDirectory"].getValue(),
+            dispatcher["jobsDirectory"].getValue()
+        )
+
+    def testRunLocally(self):
+        #   n1  n3
+        #   |   |
+        #   n2  n4
+        #    \ /
+        #     l
+
+        s = Gaffer.ScriptNode()
+
+        for name in ["n1", "n2", "n3", "n4"]:
+            s[name] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+        s["n4"]["preTasks"][0].setInput(s["n3"]["task"])
+        s["l"] = GafferDispatch.TaskList()
+        s["l"]["preTasks"][0].setInput(s["n2"]["task"])
+        s["l"]["preTasks"][1].setInput(s["n4"]["task"])
+
+        # n1 and n2 run locally. n3 is on the farm, so n4 can't run locally.
+        for name in ["n1", "n2", "n4"]:
+            GafferDeadline.DeadlineSettings.overrideSetting(s[name], "runLocally").setValue(True)
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-3")
+
+        # Nothing is executed locally when the pre-flight checks fail
+
+        s["n3"]["dispatcher"]["deadline"]["auxFiles"].setValue(
+            IECore.StringVectorData([str(self.temporaryDirectory() / "missing.txt")])
+        )
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ) as submitJob:
+            with IECore.CapturingMessageHandler():
+                with self.assertRaisesRegex(RuntimeError, "missing.txt does not exist"):
+                    dispatcher.dispatch([s["l"]])
+
+        submitJob.assert_not_called()
+        self.assertEqual(len(s["n1"].log), 0)
+        self.assertEqual(len(s["n2"].log), 0)
+
+        s["n3"]["dispatcher"]["deadline"]["auxFiles"].setToDefault()
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            with IECore.CapturingMessageHandler() as mh:
+                jobs = self.__job([s["l"]], dispatcher)
+
+        self.assertEqual(
+            [m.message for m in mh.messages if "run locally" in m.message],
+            ["n4 depends on jobs submitted to Deadline, so can't run locally."]
+        )
+
+        self.assertEqual(len(s["n1"].log), 3)
+        self.assertEqual(len(s["n2"].log), 3)
+        self.assertEqual(len(s["n3"].log), 0)
+        self.assertEqual(len(s["n4"].log), 0)
+
+        jobs = {j.getJobProperties()["Name"]: j for j in jobs}
+        self.assertEqual(set(jobs.keys()), {"n3", "n4"})
+        self.assertEqual(jobs["n4"].getParentJobs(), [jobs["n3"]])
+
+    def testEnvironmentProfiles(self):
+        #   n1  n3
+        #   |
+        #   n2
+
+        s = Gaffer.ScriptNode()
+
+        environment = IECore.CompoundData({"STUDIO_ROOT": "/studio", "SHOW": "test"})
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n1"]["dispatcher"]["deadline"]["extraEnvironmentVariables"].setValue(environment)
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["dispatcher"]["deadline"]["extraEnvironmentVariables"].setValue(environment)
+        s["n2"]["preTasks"][0].setInput(s["n1"]["task"])
+        s["n3"] = GafferDispatchTest.LoggingTaskNode()
+        s["n3"]["dispatcher"]["deadline"]["extraEnvironmentVariables"].setValue(
+            IECore.CompoundData({"SHOW": "other"})
+        )
+        s["n3"]["dispatcher"]["deadline"]["logLevel"].setValue("DEBUG")
+
+        contentStore = str(self.temporaryDirectory() / "contentStore")
+
+        dispatcher = self.__dispatcher()
+        dispatcher["environmentProfiles"].setValue(True)
+        dispatcher["contentStore"].setValue(contentStore)
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n2"], s["n3"]], dispatcher)
+
+        self.assertEqual(len(jobs), 3)
+        jobs = {j.getJobProperties()["Name"]: j for j in jobs}
+
+        profiles = {n: j.getPluginProperties()["EnvironmentProfile"] for n, j in jobs.items()}
+        self.assertEqual(profiles["n1"], profiles["n2"])
+        self.assertNotEqual(profiles["n1"], profiles["n3"])
+
+        # The log level is included in the profile, since the job record has no
+        # environment variables of its own.
+        for name, variables in [
+            ("n2", {"STUDIO_ROOT": "/studio", "SHOW": "test", "IECORE_LOG_LEVEL": "INFO"}),
+            ("n3", {"SHOW": "other", "IECORE_LOG_LEVEL": "DEBUG"}),
+        ]:
+            profileFile = jobs[name].getEnvironmentProfile()
+            self.assertEqual(os.path.relpath(profileFile, contentStore), profiles[name])
+            self.assertNotIn(profileFile, jobs[name].getAuxFiles())
+            with open(profileFile, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["environment"], variables)
+
+        # Profiles are only shared through a content store. Without one, the
+        # environment stays in the job.
+
+        dispatcher["contentStore"].setValue("")
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            with IECore.CapturingMessageHandler() as mh:
+                jobs = self.__job([s["n3"]], dispatcher)
+
+        self.assertEqual(len(mh.messages), 1)
+        self.assertIn("require a content store", mh.messages[0].message)
+        self.assertEqual(len(jobs), 1)
+        self.assertNotIn("EnvironmentProfile", jobs[0].getPluginProperties())
+        self.assertIsNone(jobs[0].getEnvironmentProfile())
+
+        # Without profiles the environment stays in the job
+
+        dispatcher["environmentProfiles"].setValue(False)
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n3"]], dispatcher)
+
+        self.assertEqual(len(jobs), 1)
+        self.assertNotIn("EnvironmentProfile", jobs[0].getPluginProperties())
+        self.assertIsNone(jobs[0].getEnvironmentProfile())
+
+    def testCriticalPathPriority(self):
+        #   n1  n2
+        #    \  /
+        #     n3
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        GafferDeadline.DeadlineSettings.overrideSetting(s["n2"], "costHint").setValue(0.1)
+        s["n3"] = GafferDispatchTest.LoggingTaskNode()
+        s["n3"]["dispatcher"]["deadline"]["priority"].setValue(90)
+        s["n3"]["preTasks"][0].setInput(s["n1"]["task"])
+        s["n3"]["preTasks"][1].setInput(s["n2"]["task"])
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-10")
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n3"]], dispatcher)
+
+        priorities = {j.getJobProperties()["Name"]: j.getJobProperties()["Priority"] for j in jobs}
+        self.assertEqual(priorities, {"n1": 50, "n2": 50, "n3": 90})
+
+        dispatcher["criticalPathPriority"].setValue(True)
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n3"]], dispatcher)
+
+        # The critical path n1 -> n3 costs 20 frames, and n2 -> n3 is
+        # 9 frames shorter.
+        priorities = {j.getJobProperties()["Name"]: j.getJobProperties()["Priority"] for j in jobs}
+        self.assertEqual(priorities, {"n1": 70, "n2": 61, "n3": 100})
+
+    def testControlTaskDependency(self):
+        #   n1 (LoggingTaskNode)
+        #   |
+        #   m1 (FrameMask)
+        #   |
+        #   w1 (Wedge)
+
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n1"]["frame"] = Gaffer.StringPlug(
+            defaultValue="${wedge:value}.${frame}",
+            flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+        )
+
+        s["m1"] = GafferDispatch.FrameMask()
+        s["m1"]["mask"].setValue("1-10")
+        s["m1"]["preTasks"][0].setInput(s["n1"]["task"])
+
+        s["w1"] = GafferDispatch.Wedge()
+        s["w1"]["mode"].setValue(int(GafferDispatch.Wedge.Mode.StringList))
+        s["w1"]["strings"].setValue(IECore.StringVectorData(["a", "b", "c"]))
+        s["w1"]["preTasks"][0].setInput(s["m1"]["task"])
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-50")
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["w1"]], dispatcher)
+
+        self.assertEqual(len(jobs), 3)  # A LoggingTaskNode per Wedge entry
+        for j in jobs:
+            if j.getJobProperties()["Name"] == "n1":
+                self.assertEqual(len(j.getDependencies()), 0)
+                self.assertEqual(len(j.getTasks()), 10)
+
+    def testNoOpBatch(self):
+        #    n1
+        #    |
+        #    t1
+        #    |
+        #    n2
+        s = Gaffer.ScriptNode()
+
+        s["n1"] = GafferDispatchTest.LoggingTaskNode()
+        s["n1"]["frame"] = Gaffer.StringPlug(
+            defaultValue="${frame}",
+            flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+        )
+
+        s["t1"] = GafferDispatch.TaskList()
+        s["t1"]["dispatcher"]["batchSize"].setValue(10)
+        s["t1"]["preTasks"][0].setInput(s["n1"]["task"])
+
+        s["n2"] = GafferDispatchTest.LoggingTaskNode()
+        s["n2"]["frame"] = Gaffer.StringPlug(
+            defaultValue="${frame}",
+            flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+        )
+        s["n2"]["preTasks"][0].setInput(s["t1"]["task"])
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-50")
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ), IECore.CapturingMessageHandler() as mh:
+            dispatcher.dispatch([s["n2"]])
+            warnings = [i for i in mh.messages if i.level == IECore.Msg.Level.Warning]
+            self.assertEqual(len(warnings), 50)
+            for warning in warnings:
+                self.assertEqual(
+                    warning.message,
+                    "No-Op node t1 has a batch size greater than 1 which will be ignored."
+                )
+
+    def testContext(self):
+        s = Gaffer.ScriptNode()
+
+        s["n"] = GafferDispatchTest.LoggingTaskNode()
+        s["n"]["dispatcher"]["deadline"]["comment"].setValue("${wedge:value}")
+        s["n"]["dispatcher"]["deadline"]["deadlineSettings"].addChild(
+            Gaffer.NameValuePlug(
+                "Name",
+                IECore.StringData("${wedge:value}"),
+                True,
+                "member1",
+                Gaffer.Plug.Direction.In,
+                Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+            )
+        )
+        s["n"]["dispatcher"]["deadline"]["environmentVariables"].addChild(
+            Gaffer.NameValuePlug(
+                "Index",
+                IECore.StringData("${wedge:index}"),
+                True,
+                "member2",
+                Gaffer.Plug.Direction.In,
+                Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+            )
+        )
+
+        s["w"] = GafferDispatch.Wedge()
+        s["w"]["preTasks"][0].setInput(s["n"]["task"])
+        s["w"]["mode"].setValue(GafferDispatch.Wedge.Mode.StringList)
+        s["w"]["strings"].setValue(IECore.StringVectorData(["I'mAName"]))
+
+        s["d"] = GafferDeadline.DeadlineDispatcher()
+        s["d"]["preTasks"][0].setInput(s["w"]["task"])
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["w"]])
+
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0].getJobProperties()["Name"], "I'mAName")
+        self.assertEqual(jobs[0].getEnvironmentVariables()["Index"], "0")
+        self.assertEqual(jobs[0].getJobProperties()["Comment"], "I'mAName")
+
+    def testExtra(self):
+        s = Gaffer.ScriptNode()
+
+        s["n"] = GafferDispatchTest.LoggingTaskNode()
+        s["n"]["dispatcher"]["deadline"]["deadlineSettings"].addChild(
+            Gaffer.NameValuePlug(
+                "Name",
+                IECore.StringData("NotLittleDebbie"),
+                True,
+                "member1",
+                Gaffer.Plug.Direction.In,
+                Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+            )
+        )
+        s["n"]["dispatcher"]["deadline"]["environmentVariables"].addChild(
+            Gaffer.NameValuePlug(
+                "Index",
+                IECore.StringData("1000"),
+                True,
+                "member2",
+                Gaffer.Plug.Direction.In,
+                Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+            )
+        )
+        s["n"]["dispatcher"]["deadline"]["extraDeadlineSettings"].setValue(
+            {
+                "Name": IECore.StringData("LittleDebbie"),
+                "MachineName": IECore.StringData("Francis"),
+            }
+        )
+        s["n"]["dispatcher"]["deadline"]["extraEnvironmentVariables"].setValue(
+            {
+                "Index": IECore.IntData(0),
+                "ARNOLD_ROOT": IECore.StringData("/arnoldRoot"),
+            }
+        )
+
+        s["d"] = GafferDeadline.DeadlineDispatcher()
+        s["d"]["preTasks"][0].setInput(s["n"]["task"])
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n"]])
+
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0].getJobProperties()["Name"], "LittleDebbie")
+        self.assertEqual(jobs[0].getJobProperties()["MachineName"], "Francis")
+        self.assertEqual(jobs[0].getEnvironmentVariables()["Index"], "0")
+        self.assertEqual(jobs[0].getEnvironmentVariables()["ARNOLD_ROOT"], "/arnoldRoot")
+
+    def testName(self):
+        s = Gaffer.ScriptNode()
+
+        s["n"] = GafferDispatchTest.LoggingTaskNode()
+
+        s["d"] = GafferDeadline.DeadlineDispatcher()
+        s["d"]["jobsDirectory"].setValue(self.temporaryDirectory() / "testJobDirectory")
+        s["d"]["preTasks"][0].setInput(s["n"]["task"])
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n"]], dispatcher=s["d"])
+
+        self.assertEqual(jobs[0].getJobProperties()["Name"], "n")
+
+        s["d"]["jobName"].setValue("Harvey")
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n"]], dispatcher=s["d"])
+
+        self.assertEqual(jobs[0].getJobProperties()["Name"], "Harvey.n")
+
+        s["n"]["dispatcher"]["deadline"]["extraDeadlineSettings"].setValue(
+            {
+                "Name": IECore.StringData("LittleDebbie"),
+            }
+        )
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["n"]], dispatcher=s["d"])
+
+        self.assertEqual(jobs[0].getJobProperties()["Name"], "LittleDebbie")
+
+    def testContextTable(self):
+        #   n (LoggingTaskNode)
+        #   |
+        #   w (Wedge)
+
+        s = Gaffer.ScriptNode()
+
+        s["n"] = GafferDispatchTest.LoggingTaskNode()
+        s["n"]["frame"] = Gaffer.StringPlug(
+            defaultValue="${frame}",
+            flags=Gaffer.Plug.Flags.Default | Gaffer.Plug.Flags.Dynamic
+        )
+        s["n"]["dispatcher"]["batchSize"].setValue(5)
+        GafferDeadline.DeadlineSettings.overrideSetting(s["n"], "contextTable").setValue(True)
+
+        s["w"] = GafferDispatch.Wedge()
+        s["w"]["preTasks"][0].setInput(s["n"]["task"])
+        s["w"]["mode"].setValue(int(GafferDispatch.Wedge.Mode.StringList))
+        s["w"]["strings"].setValue(IECore.StringVectorData(["a", "b", "c"]))
+
+        dispatcher = self.__dispatcher()
+        dispatcher["framesMode"].setValue(dispatcher.FramesMode.CustomRange)
+        dispatcher["frameRange"].setValue("1-10")
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            jobs = self.__job([s["w"]], dispatcher)
+
+        self.assertEqual(len(jobs), 1)
+        self.assertTrue(jobs[0].getUseContextTable())
+        self.assertEqual(len(jobs[0].getTasks()), 6)
+        self.assertEqual(jobs[0].getJobProperties()["Frames"], "0-5")
+        self.assertEqual(jobs[0].getJobProperties()["ChunkSize"], 1)
+        self.assertNotIn("Context", jobs[0].getPluginProperties())
+
+        tableFile = [
+            f for f in jobs[0].getAuxFiles() if (
+                os.path.basename(f) == jobs[0].getPluginProperties()["ContextTable"]
+            )
+        ][0]
+        with open(tableFile, encoding="utf-8") as f:
+            rows = json.load(f)["rows"]
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(
+            sorted([r["frames"] for r in rows]),
+            ["1-5", "1-5", "1-5", "6-10", "6-10", "6-10"]
+        )
+        for value in ["a", "b", "c"]:
+            valueArgs = "\"-wedge:value\" \"'{}'\"".format(value)
+            self.assertEqual(len([r for r in rows if valueArgs in r["context"]]), 2)
 
 
 if __name__ == "__main__":
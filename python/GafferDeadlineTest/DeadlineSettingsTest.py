@@ -0,0 +1,221 @@
+##########################################################################
+#
+#  Copyright (c) 2026, Hypothetical Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#      * Redistributions of source code must retain the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer.
+#
+#      * Redistributions in binary form must reproduce the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer in the documentation and/or other materials provided with
+#        the distribution.
+#
+#      * Neither the name of Hypothetical Inc. nor the names of
+#        any other contributors to this software may be used to endorse or
+#        promote products derived from this software without specific prior
+#        written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+##########################################################################
+
+import unittest
+from unittest import mock
+
+import IECore
+
+import Gaffer
+import GafferTest
+import GafferDispatchTest
+
+import GafferDeadline
+
+
+class DeadlineSettingsTest(GafferTest.TestCase):
+    def testPlugs(self):
+        p = GafferDeadline.DeadlineSettings()
+        n = GafferDispatchTest.LoggingTaskNode()
+
+        # Task nodes don't hold the optional settings until they override them
+        optionalSettings = [s[0] for s in GafferDeadline.DeadlineDispatcher._optionalSettings]
+        self.assertEqual(
+            [k for k in p["deadline"].keys() if k not in optionalSettings],
+            n["dispatcher"]["deadline"].keys()
+        )
+        for name in optionalSettings:
+            self.assertIn(name, p["deadline"])
+            self.assertNotIn(name, n["dispatcher"]["deadline"])
+        self.assertEqual(p["out"].direction(), Gaffer.Plug.Direction.Out)
+
+    def testTaskSettings(self):
+        s = Gaffer.ScriptNode()
+
+        s["p"] = GafferDeadline.DeadlineSettings()
+        s["p"]["deadline"]["pool"].setValue("profilePool")
+        s["p"]["deadline"]["priority"].setValue(80)
+
+        s["n"] = GafferDispatchTest.LoggingTaskNode()
+        deadlinePlug = s["n"]["dispatcher"]["deadline"]
+        deadlinePlug["priority"].setValue(20)
+
+        settings = GafferDeadline.DeadlineSettings.taskSettings(s["n"])
+        self.assertEqual(settings["pool"].getValue(), "")
+        self.assertIsNone(GafferDeadline.DeadlineSettings.profile(deadlinePlug))
+
+        deadlinePlug["profile"].setInput(s["p"]["out"])
+        self.assertTrue(GafferDeadline.DeadlineSettings.profile(deadlinePlug).isSame(s["p"]))
+
+        # Settings at their default are taken from the profile, others are overrides
+        self.assertTrue(settings["pool"].isSame(s["p"]["deadline"]["pool"]))
+        self.assertTrue(settings["priority"].isSame(deadlinePlug["priority"]))
+        self.assertEqual(settings["priority"].getValue(), 20)
+        self.assertTrue(settings["group"].isSame(deadlinePlug["group"]))
+
+        # Settings with an input are overrides even when their value is the default
+        deadlinePlug["pool"].setInput(deadlinePlug["group"])
+        self.assertTrue(settings["pool"].isSame(deadlinePlug["pool"]))
+        deadlinePlug["pool"].setInput(None)
+
+        # As are settings named by `profileOverrides`
+        deadlinePlug["priority"].setToDefault()
+        self.assertEqual(settings["priority"].getValue(), 80)
+        GafferDeadline.DeadlineSettings.overrideSetting(s["n"], "profileOverrides").setValue(
+            IECore.StringVectorData(["priority", "pool"])
+        )
+        self.assertTrue(settings["priority"].isSame(deadlinePlug["priority"]))
+        self.assertEqual(settings["priority"].getValue(), 50)
+        self.assertEqual(settings["pool"].getValue(), "")
+        deadlinePlug["profileOverrides"].setToDefault()
+        deadlinePlug["priority"].setValue(20)
+
+        # Profiles can take settings from other profiles
+
+        s["p2"] = GafferDeadline.DeadlineSettings()
+        s["p2"]["deadline"]["group"].setValue("profileGroup")
+        s["p"]["deadline"]["profile"].setInput(s["p2"]["out"])
+        self.assertEqual(settings["group"].getValue(), "profileGroup")
+        self.assertEqual(settings["pool"].getValue(), "profilePool")
+
+        # Cycles are followed once
+
+        s["p2"]["deadline"]["profile"].setInput(s["p"]["out"])
+        self.assertTrue(settings["comment"].isSame(s["p2"]["deadline"]["comment"]))
+
+    def testOptionalSettings(self):
+        s = Gaffer.ScriptNode()
+
+        s["n"] = GafferDispatchTest.LoggingTaskNode()
+        deadlinePlug = s["n"]["dispatcher"]["deadline"]
+        settings = GafferDeadline.DeadlineSettings.taskSettings(s["n"])
+
+        # Without a profile, settings the node doesn't hold have their default value
+        self.assertNotIn("frameTime", deadlinePlug)
+        self.assertEqual(settings["frameTime"].getValue(), 60.0)
+        self.assertIn("frameTime", [p.getName() for p in settings.plugs()])
+        self.assertRaises(KeyError, settings.__getitem__, "notASetting")
+
+        # Or are taken from the profile
+        s["p"] = GafferDeadline.DeadlineSettings()
+        s["p"]["deadline"]["frameTime"].setValue(10.0)
+        deadlinePlug["profile"].setInput(s["p"]["out"])
+        self.assertTrue(settings["frameTime"].isSame(s["p"]["deadline"]["frameTime"]))
+
+        # Overriding a setting adds it to the node
+        frameTimePlug = GafferDeadline.DeadlineSettings.overrideSetting(s["n"], "frameTime")
+        self.assertTrue(frameTimePlug.isSame(deadlinePlug["frameTime"]))
+        self.assertTrue(frameTimePlug.getFlags(Gaffer.Plug.Flags.Dynamic))
+        self.assertTrue(
+            GafferDeadline.DeadlineSettings.overrideSetting(s["n"], "frameTime").isSame(
+                frameTimePlug
+            )
+        )
+        self.assertTrue(settings["frameTime"].isSame(s["p"]["deadline"]["frameTime"]))
+        frameTimePlug.setValue(20.0)
+        self.assertTrue(settings["frameTime"].isSame(frameTimePlug))
+        self.assertRaises(
+            KeyError,
+            GafferDeadline.DeadlineSettings.overrideSetting,
+            s["n"],
+            "notASetting"
+        )
+
+        s2 = Gaffer.ScriptNode()
+        s2.execute(s.serialise())
+        self.assertEqual(
+            GafferDeadline.DeadlineSettings.taskSettings(s2["n"])["frameTime"].getValue(),
+            20.0
+        )
+
+    def testDispatch(self):
+        s = Gaffer.ScriptNode()
+
+        s["p"] = GafferDeadline.DeadlineSettings()
+        s["p"]["deadline"]["pool"].setValue("profilePool")
+        s["p"]["deadline"]["extraEnvironmentVariables"].setValue(
+            IECore.CompoundData({"SHOW": "test"})
+        )
+
+        s["n"] = GafferDispatchTest.LoggingTaskNode()
+        s["n"]["dispatcher"]["deadline"]["profile"].setInput(s["p"]["out"])
+        s["n"]["dispatcher"]["deadline"]["group"].setValue("nodeGroup")
+
+        dispatcher = GafferDeadline.DeadlineDispatcher()
+        dispatcher["jobsDirectory"].setValue(self.temporaryDirectory() / "testJobDirectory")
+
+        jobs = []
+
+        def f(dispatcher, job):
+            jobs.append(job)
+
+        c = GafferDeadline.DeadlineDispatcher.preSpoolSignal().connect(f, scoped=True)
+
+        with mock.patch(
+            "GafferDeadline.DeadlineTools.submitJob",
+            return_value=("testID", "testMessage")
+        ):
+            dispatcher.dispatch([s["n"]])
+
+        del c
+
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0].getJobProperties()["Pool"], "profilePool")
+        self.assertEqual(jobs[0].getJobProperties()["Group"], "nodeGroup")
+        self.assertEqual(jobs[0].getEnvironmentVariables()["SHOW"], "test")
+
+    def testSerialisation(self):
+        s = Gaffer.ScriptNode()
+
+        s["p"] = GafferDeadline.DeadlineSettings()
+        s["p"]["deadline"]["pool"].setValue("profilePool")
+        s["n"] = GafferDispatchTest.LoggingTaskNode()
+        s["n"]["dispatcher"]["deadline"]["profile"].setInput(s["p"]["out"])
+
+        s2 = Gaffer.ScriptNode()
+        s2.execute(s.serialise())
+
+        self.assertTrue(
+            s2["n"]["dispatcher"]["deadline"]["profile"].getInput().isSame(s2["p"]["out"])
+        )
+        self.assertEqual(
+            GafferDeadline.DeadlineSettings.taskSettings(s2["n"])["pool"].getValue(),
+            "profilePool"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -53,12 +53,27 @@ class DeadlineTaskTest(GafferTest.TestCase):
 
         return dispatcher
 
-    def __assertSettings(self, fileName, settings):
+    @staticmethod
+    def __readSettings(fileName):
         with open(fileName) as file:
-            fileSettings = {
+            return {
                 i.split("=", 1)[0]: i.strip().split("=", 1)[1] for i in file.readlines()
             }
-        self.assertEqual(fileSettings, settings)
+
+    def __dispatch(self, dispatcher, nodes):
+        # The job and plugin files are removed once dispatch is done, so they are
+        # read as the job is submitted.
+        submitted = {}
+
+        def submitJob(jobFile, pluginFile, auxFiles):
+            submitted["job"] = self.__readSettings(jobFile)
+            submitted["plugin"] = self.__readSettings(pluginFile)
+            return ("testID", "testMessage")
+
+        with mock.patch("GafferDeadline.DeadlineTools.submitJob", side_effect=submitJob):
+            dispatcher.dispatch(nodes)
+
+        return submitted["job"], submitted["plugin"]
 
     def test(self):
         s = Gaffer.ScriptNode()
@@ -71,38 +86,20 @@ class DeadlineTaskTest(GafferTest.TestCase):
         s["n"]["parameters"].addChild(Gaffer.NameValuePlug("boolSetting", IECore.BoolData(True)))
 
         dispatcher = self.__dispatcher()
-        with mock.patch(
-            "GafferDeadline.DeadlineTools.submitJob",
-            return_value=("testID", "testMessage")
-        ):
-            dispatcher.dispatch([s["n"]])
+        jobFileSettings, pluginFileSettings = self.__dispatch(dispatcher, [s["n"]])
 
+        # Settings left at the values Deadline assumes are not written to the job file
         jobSettings = {
             "Name": "n",
-            "Frames": ",1",
-            "ChunkSize": "1",
+            "Frames": "1",
             "Plugin": "customPlugin",
             "BatchName": "untitled",
-            "Comment": "",
-            "Department": "",
-            "Pool": "",
-            "SecondaryPool": "",
-            "Group": "",
-            "Priority": "50",
-            "TaskTimeoutMinutes": "0",
-            "EnableAutoTimeout": "False",
-            "ConcurrentTasks": "1",
-            "MachineLimit": "0",
-            "Whitelist": "",
-            "LimitGroups": "",
-            "OnJobComplete": "Nothing",
-            "InitialStatus": "Active",
             "EnvironmentKeyValue0": "IECORE_LOG_LEVEL=INFO",
         }
 
-        self.__assertSettings(dispatcher.jobDirectory() / "n.job", jobSettings)
-        self.__assertSettings(
-            dispatcher.jobDirectory() / "n.plugin",
+        self.assertEqual(jobFileSettings, jobSettings)
+        self.assertEqual(
+            pluginFileSettings,
             {
                 "stringSetting": "value1",
                 "intSetting": "50",
@@ -113,28 +110,20 @@ class DeadlineTaskTest(GafferTest.TestCase):
         dispatcher["framesMode"].setValue(GafferDispatch.Dispatcher.FramesMode.FullRange)
         dispatcher["frameRange"].setValue("1-100")
 
-        with mock.patch(
-            "GafferDeadline.DeadlineTools.submitJob",
-            return_value=("testID", "testMessage")
-        ):
-            dispatcher.dispatch([s["n"]])
+        jobFileSettings, pluginFileSettings = self.__dispatch(dispatcher, [s["n"]])
 
-        jobSettings["Frames"] = "," + ",".join([str(i) for i in range(1, 101)])
+        jobSettings["Frames"] = "1-100"
 
-        self.__assertSettings(dispatcher.jobDirectory() / "n.job", jobSettings)
+        self.assertEqual(jobFileSettings, jobSettings)
 
         s["n"]["dispatcher"]["batchSize"].setValue(10)
 
-        with mock.patch(
-            "GafferDeadline.DeadlineTools.submitJob",
-            return_value=("testID", "testMessage")
-        ):
-            dispatcher.dispatch([s["n"]])
+        jobFileSettings, pluginFileSettings = self.__dispatch(dispatcher, [s["n"]])
 
         jobSettings["ChunkSize"] = "10"
-        jobSettings["Frames"] = ",1-10,11-20,21-30,31-40,41-50,51-60,61-70,71-80,81-90,91-100"
+        jobSettings["Frames"] = "1-100"
 
-        self.__assertSettings(dispatcher.jobDirectory() / "n.job", jobSettings)
+        self.assertEqual(jobFileSettings, jobSettings)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+##########################################################################
+#
+#  Copyright (c) 2026, Hypothetical Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#      * Redistributions of source code must retain the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer.
+#
+#      * Redistributions in binary form must reproduce the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer in the documentation and/or other materials provided with
+#        the distribution.
+#
+#      * Neither the name of Hypothetical Inc. nor the names of
+#        any other contributors to this software may be used to endorse or
+#        promote products derived from this software without specific prior
+#        written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+##########################################################################
+
+import json
+import pickle
+import unittest
+
+import GafferTest
+
+import GafferDeadline
+
+
+class DispatchGraphTest(GafferTest.TestCase):
+    def __graph(self):
+        #   n1
+        #   |
+        #   n2
+        g = GafferDeadline.DispatchGraph()
+        n1 = g.addJob("n1", [(f, f) for f in range(1, 6)])
+        n2 = g.addJob("n2", [(1, 5)], dependencyMode="Job", costHint=2.0)
+        for i in range(0, 5):
+            g.addDependency(n2, 0, n1, i)
+
+        return g
+
+    def testJobs(self):
+        g = self.__graph()
+
+        self.assertEqual(len(g.getJobs()), 2)
+        self.assertEqual(
+            g.getJob(1),
+            {
+                "name": "n2",
+                "dependencyMode": "Job",
+                "useContextTable": False,
+                "costHint": 2.0,
+                "dependencyType": "None",
+                "priorityOffset": 0,
+                "settings": None,
+                "tasks": [[1, 5]],
+                "taskOrder": [0],
+            }
+        )
+        self.assertEqual(g.getDependencies(0), [])
+        self.assertEqual(g.getDependencies(1), [(0, 0, i) for i in range(0, 5)])
+        self.assertEqual(g.getParentJobs(0), [])
+        self.assertEqual(g.getParentJobs(1), [0])
+
+        g.setDependencyType(1, "JobToJob")
+        self.assertEqual(g.getDependencyType(1), "JobToJob")
+
+        self.assertEqual(g.getTaskOrder(0), [0, 1, 2, 3, 4])
+        g.setTaskOrder(0, [4, 3, 2, 1, 0])
+        self.assertEqual(g.getTaskOrder(0), [4, 3, 2, 1, 0])
+        self.assertRaises(ValueError, g.setTaskOrder, 0, [0, 0, 1, 2, 3])
+
+    def __settings(self, **kwargs):
+        settings = {
+            "batchName": "batch",
+            "comment": "",
+            "department": "",
+            "pool": "pool",
+            "secondaryPool": "",
+            "group": "",
+            "priority": 90,
+            "taskTimeout": 0,
+            "enableAutoTimeout": False,
+            "concurrentTasks": 1,
+            "machineLimit": 0,
+            "machineList": "",
+            "isBlackList": False,
+            "limits": "",
+            "onJobComplete": "Nothing",
+            "submitSuspended": False,
+            "threads": 0,
+            "jobName": "n1",
+            "plugin": "Gaffer",
+            "pluginParameters": None,
+            "script": "untitled.gfr",
+            "nodes": "n1",
+            "version": "1.0.0.0",
+            "context": "",
+            "contextTable": "",
+            "environmentProfile": "",
+            "contentStore": "",
+        }
+        settings.update(kwargs)
+
+        return settings
+
+    def testEncoding(self):
+        g = self.__graph()
+
+        g.setJobSettings(0, self.__settings(context="-frameNode 1"))
+        g.setTaskOrder(0, [4, 3, 2, 1, 0])
+        g.setPriorityOffset(0, 20)
+
+        jobInfo = g.jobInfo(0)
+        self.assertEqual(jobInfo["Name"], "n1")
+        self.assertEqual(jobInfo["Plugin"], "Gaffer")
+        self.assertEqual(jobInfo["Frames"], "5,4,3,2,1")
+        self.assertEqual(jobInfo["ChunkSize"], 1)
+        self.assertEqual(jobInfo["Pool"], "pool")
+        self.assertEqual(jobInfo["Priority"], 100)
+        self.assertEqual(jobInfo["Whitelist"], "")
+        self.assertEqual(jobInfo["InitialStatus"], "Active")
+
+        self.assertEqual(
+            g.pluginInfo(0),
+            {
+                "Script": "untitled.gfr",
+                "Version": "1.0.0.0",
+                "IgnoreScriptLoadErrors": False,
+                "Nodes": "n1",
+                "Frames": "<STARTFRAME>-<ENDFRAME>",
+                "Threads": 0,
+                "Context": "-frameNode 1",
+            }
+        )
+
+        # Tasks of jobs with a context table are numbered by their row
+
+        g2 = GafferDeadline.DispatchGraph()
+        g2.addJob("n1", [(1, 1), (1, 1), (2, 2)], useContextTable=True)
+        g2.setJobSettings(
+            0,
+            self.__settings(
+                contextTable="contextTable.json",
+                contentStore="/store",
+                environmentProfile="abc/environment.json",
+                submitSuspended=True,
+                isBlackList=True,
+                machineList="badMachine"
+            )
+        )
+
+        jobInfo = g2.jobInfo(0)
+        self.assertEqual(jobInfo["Frames"], "0-2")
+        self.assertEqual(jobInfo["ChunkSize"], 1)
+        self.assertEqual(jobInfo["Blacklist"], "badMachine")
+        self.assertNotIn("Whitelist", jobInfo)
+        self.assertEqual(jobInfo["InitialStatus"], "Suspended")
+
+        pluginInfo = g2.pluginInfo(0)
+        self.assertEqual(pluginInfo["ContextTable"], "contextTable.json")
+        self.assertNotIn("Context", pluginInfo)
+        self.assertEqual(pluginInfo["EnvironmentProfile"], "abc/environment.json")
+        self.assertEqual(pluginInfo["ContentStore"], "/store")
+
+        # Jobs for other plugins take their plugin info from their parameters
+
+        g.setJobSettings(
+            1,
+            self.__settings(
+                jobName="n2",
+                plugin="customPlugin",
+                pluginParameters={"setting": "value"},
+                contentStore="/store"
+            )
+        )
+        self.assertEqual(g.jobInfo(1)["Plugin"], "customPlugin")
+        self.assertEqual(g.jobInfo(1)["Frames"], "1-5")
+        self.assertEqual(g.jobInfo(1)["ChunkSize"], 5)
+        self.assertEqual(g.pluginInfo(1), {"setting": "value"})
+
+    def testSerialisation(self):
+        g = self.__graph()
+        g.setDependencyType(1, "JobToJob")
+        g.setTaskOrder(0, [4, 3, 2, 1, 0])
+        g.setJobSettings(0, self.__settings())
+
+        for g2 in [
+            GafferDeadline.DispatchGraph.fromDict(json.loads(json.dumps(g.toDict()))),
+            pickle.loads(pickle.dumps(g)),
+        ]:
+            self.assertEqual(g2.toDict(), g.toDict())
+            self.assertEqual(g2.getDependencies(1), g.getDependencies(1))
+            self.assertEqual(g2.jobInfo(0), g.jobInfo(0))
+            self.assertEqual(g2.pluginInfo(0), g.pluginInfo(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+##########################################################################
+#
+#  Copyright (c) 2026, Hypothetical Inc. All rights reserved.
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#      * Redistributions of source code must retain the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer.
+#
+#      * Redistributions in binary form must reproduce the above
+#        copyright notice, this list of conditions and the following
+#        disclaimer in the documentation and/or other materials provided with
+#        the distribution.
+#
+#      * Neither the name of Hypothetical Inc. nor the names of
+#        any other contributors to this software may be used to endorse or
+#        promote products derived from this software without specific prior
+#        written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+##########################################################################
+
+import json
+import unittest
+
+import GafferTest
+
+import GafferDeadline
+
+
+class DispatchResultTest(GafferTest.TestCase):
+    def testJobs(self):
+        r = GafferDeadline.DispatchResult("/jobs/test")
+        self.assertEqual(r.getJobDirectory(), "/jobs/test")
+        self.assertEqual(r.getJobs(), [])
+
+        r.addJob("n1", "id1", 10, "None", 0.5)
+        r.addJob("n2", "id2", 5, "FrameToFrame", 0.25)
+        self.assertEqual(r.getJobIds(), ["id1", "id2"])
+        self.assertEqual(
+            r.getJobs()[1],
+            {
+                "name": "n2",
+                "jobId": "id2",
+                "tasks": 5,
+                "dependencyType": "FrameToFrame",
+                "planningTime": 0.25,
+            }
+        )
+
+        # Returned jobs are copies
+        r.getJobs()[0]["name"] = "changed"
+        self.assertEqual(r.getJobs()[0]["name"], "n1")
+
+    def testSerialisation(self):
+        r = GafferDeadline.DispatchResult("/jobs/test")
+        r.addJob("n1", "id1", 10, "Scripted", 0.5)
+        r.setTiming("submit", 1.5)
+
+        r2 = GafferDeadline.DispatchResult.fromDict(json.loads(json.dumps(r.toDict())))
+        self.assertEqual(r2.getJobDirectory(), "/jobs/test")
+        self.assertEqual(r2.getJobs(), r.getJobs())
+        self.assertEqual(r2.getTimings(), {"submit": 1.5})
+
+
+if __name__ == "__main__":
+    unittest.main()
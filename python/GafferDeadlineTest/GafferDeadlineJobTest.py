@@ -36,6 +36,7 @@
 
 import os
 import unittest
+from unittest import mock
 
 import Gaffer
 import GafferTest
@@ -118,6 +119,45 @@ class GafferDeadlineJobTest(GafferTest.TestCase):
         self.assertEqual(dj._tasks[2].getStartFrame(), 100)
         self.assertEqual(dj._tasks[2].getEndFrame(), 102)
 
+    def testChunkTasks(self):
+        dj = GafferDeadline.GafferDeadlineJob(GafferDispatchTest.LoggingTaskNode())
+        for f in [1, 2, 3, 4, 5, 6, 7, 10, 11]:
+            dj.addBatch(None, [f])
+        dj.addBatch(None, [20, 21, 22, 23])
+
+        dj.chunkTasks(3)
+        self.assertEqual(
+            [(t.getStartFrame(), t.getEndFrame()) for t in dj.getTasks()],
+            [(1, 3), (4, 6), (7, 7), (10, 11), (20, 23)]
+        )
+        self.assertEqual([t.getTaskNumber() for t in dj.getTasks()], [0, 1, 2, 3, 4])
+
+    def testTileTasks(self):
+        dj = GafferDeadline.GafferDeadlineJob(GafferDispatchTest.LoggingTaskNode())
+        dj.addBatch(None, [1, 2, 5])
+
+        dj.tileTasks(3)
+        self.assertTrue(dj.getUseContextTable())
+        self.assertEqual(
+            [(t.getStartFrame(), t.getEndFrame(), t.getTile()) for t in dj.getTasks()],
+            [(1, 2, 0), (1, 2, 1), (1, 2, 2), (5, 5, 0), (5, 5, 1), (5, 5, 2)]
+        )
+        self.assertEqual([t.getTaskNumber() for t in dj.getTasks()], list(range(0, 6)))
+        self.assertEqual(len(set(hash(t) for t in dj.getTasks())), 6)
+
+    def testReorderTasks(self):
+        dj = GafferDeadline.GafferDeadlineJob(GafferDispatchTest.LoggingTaskNode())
+        dj.addBatch(None, [1, 2, 3, 7, 8, 9, 100, 101, 102])
+        tasks = list(dj.getTasks())
+
+        dj.reorderTasks([2, 0, 1])
+        self.assertEqual(dj.getTasks(), [tasks[2], tasks[0], tasks[1]])
+        self.assertEqual([t.getTaskNumber() for t in dj.getTasks()], [0, 1, 2])
+        self.assertEqual(dj.getTasks()[0].getStartFrame(), 100)
+
+        with self.assertRaises(ValueError):
+            dj.reorderTasks([0, 0, 1])
+
     def testContext(self):
         dj = GafferDeadline.GafferDeadlineJob(GafferDispatchTest.LoggingTaskNode())
         self.assertEqual(dj.getContext(), Gaffer.Context())
@@ -157,6 +197,42 @@ class GafferDeadlineJobTest(GafferTest.TestCase):
         dj.clearOutputs()
         self.assertEqual(len(dj.getOutputs()), 0)
 
+    def testSubmitJobPayload(self):
+        dj = GafferDeadline.GafferDeadlineJob(
+            GafferDispatchTest.LoggingTaskNode(),
+            jobProperties={
+                "Name": "test",
+                "Priority": 50,
+                "ConcurrentTasks": 2,
+                "EnableAutoTimeout": False,
+                "Comment": "",
+            },
+            environmentVariables={"SHOW": "test"},
+        )
+
+        def readJobFile():
+            with mock.patch(
+                "GafferDeadline.DeadlineTools.submitJob",
+                return_value=("testID", "testMessage")
+            ) as submitJob:
+                dj.submitJob(self.temporaryDirectory())
+
+            with open(submitJob.call_args[0][0], encoding="utf-8") as f:
+                return f.read().split("\n")
+
+        jobLines = readJobFile()
+        self.assertIn("Plugin=Gaffer", jobLines)
+        self.assertIn("Name=test", jobLines)
+        self.assertIn("ConcurrentTasks=2", jobLines)
+        self.assertIn("EnvironmentKeyValue0=SHOW=test", jobLines)
+        for prefix in ["Priority=", "EnableAutoTimeout=", "Comment="]:
+            self.assertEqual([line for line in jobLines if line.startswith(prefix)], [])
+
+        dj.setEnvironmentProfile("environment.json")
+        self.assertEqual(dj.getEnvironmentProfile(), "environment.json")
+        jobLines = readJobFile()
+        self.assertEqual([line for line in jobLines if line.startswith("EnvironmentKeyValue")], [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -38,6 +38,11 @@ import unittest
 
 from .DeadlineDispatcherTest import DeadlineDispatcherTest
 from .GafferDeadlineJobTest import GafferDeadlineJobTest
+from .DeadlineAlgoTest import DeadlineAlgoTest
+from .DispatchResultTest import DispatchResultTest
+from .DispatchGraphTest import DispatchGraphTest
+from .DeadlineSettingsTest import DeadlineSettingsTest
+from .DeadlineTaskTest import DeadlineTaskTest
 
 if __name__ == "__main__":
     unittest.main()
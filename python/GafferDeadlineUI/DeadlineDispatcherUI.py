@@ -37,7 +37,10 @@
 # TODO: figure out how to get the secondary pool list from Deadline API
 
 
+import functools
+
 import Gaffer
+import GafferUI
 import GafferDispatch
 import GafferDeadline
 
@@ -48,279 +51,661 @@ Gaffer.Metadata.registerNode(
     "description",
     """
     Dispatches tasks to Deadline.
-    """
-
-)
-
-Gaffer.Metadata.registerNode(
-
-    GafferDispatch.TaskNode,
+    """,
 
     plugs={
 
-        "dispatcher.deadline": [
+        "frameDependencySplitLimit": [
 
             "description",
             """
-            Settings that control how tasks are
-            dispatched to Deadline.
+            The maximum number of Deadline jobs a single job may be split
+            into so that each can use Deadline's native frame dependencies,
+            which release tasks much sooner than the dependency script. Jobs
+            whose tasks depend on upstream frames through differing offsets,
+            such as retimes or mixed batch sizes, are split into runs of tasks
+            that share the same offsets. A value of 1 disables splitting.
             """,
-            "layout:section", "Deadline",
-            "plugValueWidget:type", "GafferUI.LayoutPlugValueWidget",
 
         ],
 
-        "dispatcher.deadline.batchName": [
-            "description",
-            """
-            The name of the Deadline batch for this job.
-            """
-        ],
+        "exportGraph": [
 
-        "dispatcher.deadline.comment": [
             "description",
             """
-            A simple description of your job. This is optional and can be left blank.
+            Writes the planned graph of Deadline jobs to the job directory
+            before submission, as `deadlineGraph.json` and as Graphviz
+            `deadlineGraph.dot`. Each job lists its task count, dependency
+            type, number of dependency script keys and the time spent
+            planning it, and each edge the number of task dependencies it
+            carries. Useful for finding graphs that need large numbers of
+            scripted dependencies.
             """,
-        ],
 
-        "dispatcher.deadline.department": [
-            "description",
-            """
-            The department you belong to. This is optional and can be left blank.
-            """,
         ],
 
-        "dispatcher.deadline.pool": [
-            "description",
-            """
-            The pool that the job will be submitted to.
-            """,
-            "plugValueWidget:type", "GafferDeadlineUI.DeadlineListPlugValueWidget",
-            "deadlineListPlugValueWidget:type", "pools",
-            "deadlineListPlugValueWidget:multiSelect", False,
-            "userDefault", "none",
-        ],
+        "preflightChecks": [
 
-        "dispatcher.deadline.secondaryPool": [
             "description",
             """
-            The secondary pool that the job will be submitted to.
+            Checks the files and settings needed by all jobs before any
+            job is submitted, so that a problem doesn't leave a partially
+            submitted set of jobs. Auxiliary files, the dependency script,
+            output directories and the Gaffer executables registered with
+            the Deadline plugin are checked. Missing auxiliary files and
+            an unregistered Gaffer version stop the dispatch, while other
+            problems are reported as warnings.
             """,
-            "plugValueWidget:type", "GafferDeadlineUI.DeadlineListPlugValueWidget",
-            "deadlineListPlugValueWidget:type", "pools",
-            "deadlineListPlugValueWidget:multiSelect", False,
-            "userDefault", "none",
-        ],
 
-        "dispatcher.deadline.group": [
-            "description",
-            """
-            The group that your job will be submitted to.
-            """,
-            "plugValueWidget:type", "GafferDeadlineUI.DeadlineListPlugValueWidget",
-            "deadlineListPlugValueWidget:type", "groups",
-            "deadlineListPlugValueWidget:multiSelect", False,
-            "userDefault", "none",
         ],
 
-        "dispatcher.deadline.priority": [
-            "description",
-            """
-            A job can have a numeric priority ranging from 0 to 100, where 0 is the lowest
-            priority and 100 is the highest.
-            """,
-        ],
-        "dispatcher.deadline.taskTimeout": [
-            "description",
-            """
-            The number of minutes a slave has to render a task for this job before it requeues it.
-            Specify 0 for no timeout.
-            """,
-        ],
-        "dispatcher.deadline.enableAutoTimeout": [
-            "description",
-            """
-            If the Auto Task Timeout is properly configured in the repository options then
-            enabling this will allow a task timeout to be automatically calculated based on render
-            times for previous frames of the job.
-            """,
-        ],
-        "dispatcher.deadline.concurrentTasks": [
+        "fuseTaskChains": [
+
             "description",
             """
-            The number of tasks that can render concurrently on a single Slave. This is useful if
-            the rendering application only
-            uses one thread to render and your Slaves have multiple CPUs.
+            Submits linear chains of task nodes as a single Deadline job,
+            with each task executing all the nodes of the chain in turn.
+            This avoids waiting for Deadline to release dependencies and
+            starting Gaffer once per node. A node is fused with its upstream
+            node when that is its only upstream node, nothing else depends
+            on the upstream node, and both have the same context, frames,
+            batching and Deadline settings.
             """,
+
         ],
-        "dispatcher.deadline.threads": [
-            "description",
-            """
-            The number of threads Gaffer will use. Note that renderers and subprocesses launched
-            by Gaffer may or may not respect this parameter.
 
-            The actual value passed to Gaffer will be the lesser of this value and the number of
-            CPU cores enabled by the Deadline Worker's CPU Affinity setting.
+        "pruneScripts": [
 
-            If set to 0, this parameter is ignored.
-            """
-        ],
-        "dispatcher.deadline.limitToSlaveLimit": [
             "description",
             """
-            If you limit the tasks to a Slave's task limit, then by default, the Slave won't
-            dequeue more tasks then it has CPUs.
-            This task limit can be overridden for individual Slaves by an administrator.
+            Submits each job with a script holding only the nodes needed
+            to execute its task node, rather than the whole script. This
+            reduces the time and memory used to load the script on the
+            farm. Nodes inside a Box are submitted with the whole Box.
+            Identical scripts are shared between jobs.
             """,
+
         ],
-        "dispatcher.deadline.machineLimit": [
+
+        "sceneCacheDirectory": [
+
             "description",
             """
-            Use the Machine Limit to specify the maximum number of machines that can render your
-            job at one time.
-            Specify 0 for no limit.
+            The directory scene caches are written to for nodes with
+            `sceneCache` enabled. It must be accessible from the farm.
+            Defaults to a `sceneCaches` directory within the job directory.
             """,
+
         ],
-        "dispatcher.deadline.machineList": [
+
+        "taskStartupTime": [
+
             "description",
             """
-            The whitelisted or blacklisted list of machines.
+            The estimated number of seconds taken to start each Deadline
+            task, including launching Gaffer and loading the script. Used
+            to choose task sizes for nodes with `autoChunk` enabled.
             """,
-            "plugValueWidget:type", "GafferDeadlineUI.DeadlineListPlugValueWidget",
-            "deadlineListPlugValueWidget:type", "slaves",
-            "deadlineListPlugValueWidget:multiSelect", True
+
         ],
-        "dispatcher.deadline.isBlackList": [
+
+        "environmentProfiles": [
+
             "description",
             """
-            You can force the job to render on specific machines by using a whitelist,
-            or you can avoid specific machines by using a blacklist.
+            Writes the environment variables of each job to a shared profile
+            file in the `contentStore` instead of the job record. Jobs with
+            identical environments share a single profile, which the Gaffer
+            Deadline plugin applies before rendering. This keeps the job
+            records small when large numbers of environment variables are
+            used. Requires `contentStore` to be set, as a profile included
+            with each job would be copied for every job. Jobs for
+            `DeadlineTask` nodes always store their environment in the job
+            record.
             """,
+
         ],
-        "dispatcher.deadline.limits": [
+
+        "farmDispatch": [
+
             "description",
             """
-            The Limits that your job requires.
+            Submits a single bootstrap job instead of planning and submitting
+            every job from this session. The bootstrap job runs on a Worker
+            and dispatches the same nodes with the same settings from there,
+            so large dispatches return almost immediately. The bootstrap job
+            takes its Deadline settings from the first dispatched node, and
+            GafferDeadline must be available to Gaffer on the Worker.
             """,
-            "plugValueWidget:type", "GafferDeadlineUI.DeadlineListPlugValueWidget",
-            "deadlineListPlugValueWidget:type", "limits",
-            "deadlineListPlugValueWidget:multiSelect", True
+
         ],
-        "dispatcher.deadline.onJobComplete": [
-            "description",
-            """
-            If desired, you can automatically archive or delete the job when it completes.
-            """,
-            "preset:Nothing", "Nothing",
-            "preset:Archive", "Archive",
-            "preset:Delete", "Delete",
 
-            "userDefault", "Nothing",
+        "spoolDirectory": [
 
-            "plugValueWidget:type", "GafferUI.PresetsPlugValueWidget",
-        ],
-        "dispatcher.deadline.submitSuspended": [
             "description",
             """
-            If enabled, the job will submit in the suspended state. This is useful if you
-            don't want the job to start rendering right away. Just resume it from the Monitor
-            when you want it to render.
+            The local directory the job and plugin files sent to Deadline
+            are written to while jobs are submitted, rather than the job
+            directory, which is often on network storage. Each dispatch uses
+            its own directory within it, which is removed once dispatch is
+            done. Defaults to the system temporary directory.
             """,
+
         ],
-        "dispatcher.deadline.dependencyMode": [
-            "description",
-            """
-            Determine how downstream nodes that depend on this node will be handled. If set to
-            auto, the dispatcher will attempt to determine the best mode, falling back to scripted
-            dependency checking.
-            """,
-            "preset:Auto", "Auto",
-            "preset:Full Job", "Job",
-            "preset:Per Frame", "Frame",
-            "preset:Scripted", "Script",
-            "preset:Scripted", "None",
 
-            "userDefault", "Auto",
+        "contentStore": [
 
-            "plugValueWidget:type", "GafferUI.PresetsPlugValueWidget",
-        ],
-        "dispatcher.deadline.logLevel": [
             "description",
             """
-            The value to use for the environment variable `IECORE_LOG_LEVEL`. Note that some
-            renderers require a particular log level to updated render progress in the Gaffer
-            Deadline plugin.
+            A shared directory storing scripts and environment profiles by
+            the hash of their contents. Files already in the store from an
+            earlier dispatch are used as they are rather than being written
+            again, and jobs read them from the store instead of having them
+            copied to Deadline. It must be accessible from the farm, and the
+            updated Gaffer Deadline plugin must be installed. When empty,
+            files are written to the job directory.
             """,
-            "preset:Error", "ERROR",
-            "preset:Warning", "WARNING",
-            "preset:Info", "INFO",
-            "preset:Debug", "DEBUG",
-            "plugValueWidget:type", "GafferUI.PresetsPlugValueWidget",
-        ],
-        "dispatcher.deadline.outputs": [
-            "description",
-            """
-            The outputs to pass to the Deadline job. Frame substitutions will not be made in
-            order to allow Deadline to substitute frame numbers. All other substitutions are made.
-            """
+
         ],
-        "dispatcher.deadline.auxFiles": [
+
+        "criticalPathPriority": [
+
             "description",
             """
-            A list of additional files to be included with the Deadline submission as auxiliary
-            files. The submitter will upload them to the Deadline repository and Workers will
-            download the files to their local job directory. An environment variable
-            AUXFILEDIRECTORY is set by Deadline and can be referenced in Gaffer scripts using
-            standard environment variable substitution such as ${AUXFILEDIRECTORY}/file.exr
+            Raises the priority of jobs on or near the critical path of the
+            job graph, so that long chains of dependent jobs aren't held up
+            by short side branches. The cost of each job is estimated as its
+            frame count multiplied by the `costHint` of its node.
             """,
-            "plugValueWidget:type", "GafferUI.FileSystemPathVectorDataPlugValueWidget",
+
         ],
-        "dispatcher.deadline.deadlineSettings": [
+
+        "criticalPathPriorityBand": [
+
             "description",
             """
-            A list of additional Deadline settings for the dispatched job. These variables are set
-            after all other settings. Adding a variable here of "Name", for example, will override
-            the default job name. A list of available settings can be found on the Manual
-            Submission page of the Deadline documentation.
+            The largest amount `criticalPathPriority` may add to the priority
+            of a job. Jobs on the critical path get the full amount and other
+            jobs less, in proportion to how much shorter the longest chain of
+            jobs through them is. Priorities are limited to 100.
             """,
-            "layout:section", "Deadline Settings",
+
         ],
-        "dispatcher.deadline.environmentVariables": [
+
+    }
+
+)
+
+# Deadline settings are held by task nodes under `dispatcher.deadline`, and
+# by `DeadlineSettings` profiles under `deadline`.
+__deadlinePlugs = {
+
+    "deadline": [
+
+        "description",
+        """
+        Settings that control how tasks are
+        dispatched to Deadline.
+        """,
+        "layout:section", "Deadline",
+        "plugValueWidget:type", "GafferUI.LayoutPlugValueWidget",
+
+    ],
+
+    "deadline.profile": [
+        "description",
+        """
+        The `DeadlineSettings` profile to take settings from. Each setting
+        left at its default value, without an input connection, is taken
+        from the profile instead. Rarely used settings are only held by task
+        nodes once they are overridden from the context menu of the node's
+        Deadline settings, and are taken from the profile until then.
+        """,
+    ],
+
+    "deadline.profileOverrides": [
+        "description",
+        """
+        The names of settings which always use the value on this node, even
+        when it is the default value, rather than taking it from the profile.
+        """,
+    ],
+
+    "deadline.batchName": [
+        "description",
+        """
+        The name of the Deadline batch for this job.
+        """
+    ],
+
+    "deadline.comment": [
+        "description",
+        """
+        A simple description of your job. This is optional and can be left blank.
+        """,
+    ],
+
+    "deadline.department": [
+        "description",
+        """
+        The department you belong to. This is optional and can be left blank.
+        """,
+    ],
+
+    "deadline.pool": [
+        "description",
+        """
+        The pool that the job will be submitted to.
+        """,
+        "plugValueWidget:type", "GafferDeadlineUI.DeadlineListPlugValueWidget",
+        "deadlineListPlugValueWidget:type", "pools",
+        "deadlineListPlugValueWidget:multiSelect", False,
+        "userDefault", "none",
+    ],
+
+    "deadline.secondaryPool": [
+        "description",
+        """
+        The secondary pool that the job will be submitted to.
+        """,
+        "plugValueWidget:type", "GafferDeadlineUI.DeadlineListPlugValueWidget",
+        "deadlineListPlugValueWidget:type", "pools",
+        "deadlineListPlugValueWidget:multiSelect", False,
+        "userDefault", "none",
+    ],
+
+    "deadline.group": [
+        "description",
+        """
+        The group that your job will be submitted to.
+        """,
+        "plugValueWidget:type", "GafferDeadlineUI.DeadlineListPlugValueWidget",
+        "deadlineListPlugValueWidget:type", "groups",
+        "deadlineListPlugValueWidget:multiSelect", False,
+        "userDefault", "none",
+    ],
+
+    "deadline.priority": [
+        "description",
+        """
+        A job can have a numeric priority ranging from 0 to 100, where 0 is the lowest
+        priority and 100 is the highest.
+        """,
+    ],
+    "deadline.costHint": [
+        "description",
+        """
+        The estimated cost of rendering one frame of this node, relative to other nodes.
+        Used by the dispatcher's `criticalPathPriority` option to find the critical path.
+        """,
+    ],
+    "deadline.autoChunk": [
+        "description",
+        """
+        Merges the batches of this node into Deadline tasks sized for the number of
+        Workers available in the job's pool and group. Fewer, longer tasks save on
+        the dispatcher's `taskStartupTime` for each task, while more tasks render
+        more frames in parallel. Tasks are never smaller than the batch size, so
+        `batchSize` should be set to 1 to give the most choice.
+        """,
+    ],
+    "deadline.frameTime": [
+        "description",
+        """
+        The estimated number of seconds taken to render one frame of this node.
+        Used to choose task sizes when `autoChunk` is enabled.
+        """,
+    ],
+    "deadline.runLocally": [
+        "description",
+        """
+        Executes this node in the dispatching process instead of submitting it to
+        Deadline. This avoids the queueing and Gaffer startup time of a Deadline job
+        for cheap tasks such as copying files or sending notifications. The node is
+        only executed once the pre-flight checks have passed, just before jobs are
+        submitted. Downstream jobs are submitted without a dependency on it. Nodes
+        waiting on jobs that are submitted to Deadline are submitted as usual.
+        """,
+    ],
+    "deadline.taskTimeout": [
+        "description",
+        """
+        The number of minutes a slave has to render a task for this job before it requeues it.
+        Specify 0 for no timeout.
+        """,
+    ],
+    "deadline.enableAutoTimeout": [
+        "description",
+        """
+        If the Auto Task Timeout is properly configured in the repository options then
+        enabling this will allow a task timeout to be automatically calculated based on render
+        times for previous frames of the job.
+        """,
+    ],
+    "deadline.concurrentTasks": [
+        "description",
+        """
+        The number of tasks that can render concurrently on a single Slave. This is useful if
+        the rendering application only
+        uses one thread to render and your Slaves have multiple CPUs.
+        """,
+    ],
+    "deadline.threads": [
+        "description",
+        """
+        The number of threads Gaffer will use. Note that renderers and subprocesses launched
+        by Gaffer may or may not respect this parameter.
+
+        The actual value passed to Gaffer will be the lesser of this value and the number of
+        CPU cores enabled by the Deadline Worker's CPU Affinity setting.
+
+        If set to 0, this parameter is ignored.
+        """
+    ],
+    "deadline.limitToSlaveLimit": [
+        "description",
+        """
+        If you limit the tasks to a Slave's task limit, then by default, the Slave won't
+        dequeue more tasks then it has CPUs.
+        This task limit can be overridden for individual Slaves by an administrator.
+        """,
+    ],
+    "deadline.machineLimit": [
+        "description",
+        """
+        Use the Machine Limit to specify the maximum number of machines that can render your
+        job at one time.
+        Specify 0 for no limit.
+        """,
+    ],
+    "deadline.machineList": [
+        "description",
+        """
+        The whitelisted or blacklisted list of machines.
+        """,
+        "plugValueWidget:type", "GafferDeadlineUI.DeadlineListPlugValueWidget",
+        "deadlineListPlugValueWidget:type", "slaves",
+        "deadlineListPlugValueWidget:multiSelect", True
+    ],
+    "deadline.isBlackList": [
+        "description",
+        """
+        You can force the job to render on specific machines by using a whitelist,
+        or you can avoid specific machines by using a blacklist.
+        """,
+    ],
+    "deadline.limits": [
+        "description",
+        """
+        The Limits that your job requires.
+        """,
+        "plugValueWidget:type", "GafferDeadlineUI.DeadlineListPlugValueWidget",
+        "deadlineListPlugValueWidget:type", "limits",
+        "deadlineListPlugValueWidget:multiSelect", True
+    ],
+    "deadline.onJobComplete": [
+        "description",
+        """
+        If desired, you can automatically archive or delete the job when it completes.
+        """,
+        "preset:Nothing", "Nothing",
+        "preset:Archive", "Archive",
+        "preset:Delete", "Delete",
+
+        "userDefault", "Nothing",
+
+        "plugValueWidget:type", "GafferUI.PresetsPlugValueWidget",
+    ],
+    "deadline.submitSuspended": [
+        "description",
+        """
+        If enabled, the job will submit in the suspended state. This is useful if you
+        don't want the job to start rendering right away. Just resume it from the Monitor
+        when you want it to render.
+        """,
+    ],
+    "deadline.dependencyMode": [
+        "description",
+        """
+        Determine how downstream nodes that depend on this node will be handled. If set to
+        auto, the dispatcher will attempt to determine the best mode, falling back to scripted
+        dependency checking.
+        """,
+        "preset:Auto", "Auto",
+        "preset:Full Job", "Job",
+        "preset:Per Frame", "Frame",
+        "preset:Scripted", "Script",
+        "preset:Scripted", "None",
+
+        "userDefault", "Auto",
+
+        "plugValueWidget:type", "GafferUI.PresetsPlugValueWidget",
+    ],
+    "deadline.frameOrder": [
+        "description",
+        """
+        The order in which the tasks of the job are queued in Deadline.
+        Rendering frames from across the frame range first gives earlier
+        feedback on a whole shot than rendering them in order.
+
+        - Ascending : In frame order.
+        - First, Middle, Last : The first, middle and last frames, then the
+          rest in frame order.
+        - Binary : The first and last frames, then repeatedly the frames
+          halfway between those already queued.
+        - Longest First : Tasks with the most frames first, so that the
+          longest tasks don't hold up the end of the job.
+        """,
+        "preset:Ascending", "Ascending",
+        "preset:First, Middle, Last", "FirstMiddleLast",
+        "preset:Binary", "Binary",
+        "preset:Longest First", "LongestFirst",
+
+        "plugValueWidget:type", "GafferUI.PresetsPlugValueWidget",
+    ],
+    "deadline.contextTable": [
+        "description",
+        """
+        Submits the batches for every context of this node, such as those
+        created by a `Wedge` or `RenderPassWedge`, as a single Deadline job
+        instead of one job per context. Each task is submitted as a frame
+        numbered by its row in a table of frames and contexts, which is
+        included as an auxiliary file and read by the Gaffer plugin.
+
+        Job settings such as the name and pool are evaluated in the context
+        of the first batch. Jobs using a context table, and jobs depending on
+        them, can't use frame dependencies and will use scripted dependencies
+        instead.
+        """,
+    ],
+    "deadline.sceneCache": [
+        "description",
+        """
+        Marks the scene at the `in` plug of this node as expensive to compute
+        and shared with other jobs. When several tasks need the same frame of a
+        marked scene, such as the renders for each context of a `Wedge`, the
+        dispatcher adds a job writing the scene to a cache once per frame and
+        these tasks read the cache instead of computing the scene themselves.
+
+        The cache is computed in the context of the first job reading it, so
+        the upstream scene must not depend on context variables that differ
+        between the jobs.
+        """,
+    ],
+    "deadline.tiles": [
+        "description",
+        """
+        The number of tiles to split each frame into, horizontally and vertically.
+        When there is more than one tile, each task is replaced by a task for each
+        tile. Tile tasks are executed with the `deadline:tile` context variable set
+        to the index of their tile, and `deadline:tileCropWindow` set to the tile's
+        crop window. Tiles are numbered by row from the top left of the image.
+
+        The crop window is applied to the scene rendered by Render nodes
+        automatically. Other nodes must use `${deadline:tileCropWindow}` to crop
+        what they render, for instance with an expression setting the
+        `render:cropWindow` option upstream, otherwise the dispatch fails.
+        """,
+    ],
+    "deadline.tileFileName": [
+        "description",
+        """
+        The file written for each tile, which must include `${deadline:tile}`.
+        When this and `tileAssemblyFileName` are set, a job is added to merge the
+        tiles of each frame once they have all been rendered, and any downstream
+        jobs wait for it.
+        """,
+    ],
+    "deadline.tileAssemblyFileName": [
+        "description",
+        """
+        The file the merged tiles of each frame are written to.
+        """,
+    ],
+    "deadline.logLevel": [
+        "description",
+        """
+        The value to use for the environment variable `IECORE_LOG_LEVEL`. Note that some
+        renderers require a particular log level to updated render progress in the Gaffer
+        Deadline plugin.
+        """,
+        "preset:Error", "ERROR",
+        "preset:Warning", "WARNING",
+        "preset:Info", "INFO",
+        "preset:Debug", "DEBUG",
+        "plugValueWidget:type", "GafferUI.PresetsPlugValueWidget",
+    ],
+    "deadline.outputs": [
+        "description",
+        """
+        The outputs to pass to the Deadline job. Frame substitutions will not be made in
+        order to allow Deadline to substitute frame numbers. All other substitutions are made.
+        """
+    ],
+    "deadline.auxFiles": [
+        "description",
+        """
+        A list of additional files to be included with the Deadline submission as auxiliary
+        files. The submitter will upload them to the Deadline repository and Workers will
+        download the files to their local job directory. An environment variable
+        AUXFILEDIRECTORY is set by Deadline and can be referenced in Gaffer scripts using
+        standard environment variable substitution such as ${AUXFILEDIRECTORY}/file.exr
+        """,
+        "plugValueWidget:type", "GafferUI.FileSystemPathVectorDataPlugValueWidget",
+    ],
+    "deadline.deadlineSettings": [
+        "description",
+        """
+        A list of additional Deadline settings for the dispatched job. These variables are set
+        after all other settings. Adding a variable here of "Name", for example, will override
+        the default job name. A list of available settings can be found on the Manual
+        Submission page of the Deadline documentation.
+        """,
+        "layout:section", "Deadline Settings",
+    ],
+    "deadline.environmentVariables": [
+        "description",
+        """
+        A list of additional environment variables for Deadline to set before starting the job.
+        """,
+        "layout:section", "Environment Variables",
+    ],
+    "deadline.extraDeadlineSettings": [
+        "description",
+        """
+        An additional set of Deadline settings for the job. Arbitrary numbers
+        of settings may be specified within a single `IECore.CompoundObject`,
+        where each key/value pair in the object defines a setting.
+        This is convenient when using an expression to define the settings
+        and the setting count might be dynamic.
+
+        If the same setting is defined by both the settings and the
+        extraSettings plugs, then the value from the extraSettings
+        is taken.
+        """
+    ],
+    "deadline.extraEnvironmentVariables": [
+        "description",
+        """
+        An additional set of environment variables for the job. Arbitrary numbers
+        of variables may be specified within a single `IECore.CompoundObject`,
+        where each key/value pair in the object defines a variable.
+        This is convenient when using an expression to define the variables
+        and the setting count might be dynamic.
+
+        If the same variable is defined by both the variables and the
+        extraEnvironmentVariables plugs, then the value from the
+        extraEnvironmentVariables is taken.
+        """
+    ],
+}
+
+Gaffer.Metadata.registerNode(
+
+    GafferDispatch.TaskNode,
+
+    plugs={"dispatcher." + k: v for k, v in __deadlinePlugs.items()}
+
+)
+
+Gaffer.Metadata.registerNode(
+
+    GafferDeadline.DeadlineSettings,
+
+    "description",
+    """
+    Holds Deadline settings shared by many task nodes. Connect the
+    `out` plug to the `dispatcher.deadline.profile` plug of a task
+    node, and the task node takes each Deadline setting it leaves at
+    its default value from this node.
+    """,
+
+    plugs=dict(
+        __deadlinePlugs,
+        out=[
             "description",
             """
-            A list of additional environment variables for Deadline to set before starting the job.
+            The profile, to be connected to the `dispatcher.deadline.profile`
+            plug of task nodes.
             """,
-            "layout:section", "Environment Variables",
-        ],
-        "dispatcher.deadline.extraDeadlineSettings": [
-            "description",
-            """
-            An additional set of Deadline settings for the job. Arbitrary numbers
-            of settings may be specified within a single `IECore.CompoundObject`,
-            where each key/value pair in the object defines a setting.
-            This is convenient when using an expression to define the settings
-            and the setting count might be dynamic.
-
-            If the same setting is defined by both the settings and the
-            extraSettings plugs, then the value from the extraSettings
-            is taken.
-            """
+            "nodule:type", "GafferUI::StandardNodule",
         ],
-        "dispatcher.deadline.extraEnvironmentVariables": [
-            "description",
-            """
-            An additional set of environment variables for the job. Arbitrary numbers
-            of variables may be specified within a single `IECore.CompoundObject`,
-            where each key/value pair in the object defines a variable.
-            This is convenient when using an expression to define the variables
-            and the setting count might be dynamic.
-
-            If the same variable is defined by both the variables and the
-            extraEnvironmentVariables plugs, then the value from the
-            extraEnvironmentVariables is taken.
-            """
-        ],
-    }
+    )
 
 )
+
+# Rarely used settings are only added to task nodes once they are overridden,
+# from the context menu of the node's other Deadline settings.
+
+
+def __overrideSetting(node, name):
+    with Gaffer.UndoScope(node.ancestor(Gaffer.ScriptNode)):
+        GafferDeadline.DeadlineSettings.overrideSetting(node, name)
+
+
+def __plugPopupMenu(menuDefinition, plugValueWidget):
+    plug = plugValueWidget.getPlug()
+    if plug is None:
+        return
+
+    node = plug.node()
+    if not isinstance(node, GafferDispatch.TaskNode):
+        return
+
+    deadlinePlug = node["dispatcher"].getChild("deadline")
+    if deadlinePlug is None or not deadlinePlug.isAncestorOf(plug):
+        return
+
+    readOnly = Gaffer.MetadataAlgo.readOnly(deadlinePlug)
+    menuDefinition.append("/DeadlineSettingsDivider", {"divider": True})
+    for name, plugType, kwargs in GafferDeadline.DeadlineDispatcher._optionalSettings:
+        menuDefinition.append(
+            "/Override Deadline Setting/{}".format(name),
+            {
+                "command": functools.partial(__overrideSetting, node, name),
+                "active": name not in deadlinePlug and not readOnly,
+            }
+        )
+
+
+GafferUI.PlugValueWidget.popupMenuSignal().connect(__plugPopupMenu, scoped=False)
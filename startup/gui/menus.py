@@ -8,3 +8,8 @@ nodeMenu = GafferUI.NodeMenu.acquire(application)
 
 nodeMenu.append("/Dispatch/Deadline Dispatcher", GafferDeadline.DeadlineDispatcher, searchText="DeadlineDispatcher")
 nodeMenu.append("/Deadline/DeadlineTask", GafferDeadline.DeadlineTask, searchText="DeadlineTask")
+nodeMenu.append(
+    "/Deadline/DeadlineSettings",
+    GafferDeadline.DeadlineSettings,
+    searchText="DeadlineSettings"
+)